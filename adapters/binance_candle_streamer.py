@@ -1,85 +1,125 @@
 import asyncio
-from typing import Optional
+import time
+from typing import Optional, Union
 
-import pandas as pd
 from datetime import datetime, timedelta
-from binance import BinanceSocketManager, AsyncClient
 
+from adapters.binance_market_data_hub import BinanceMarketDataHub
+from adapters.binance_price_feed import BinancePriceFeed
 from core.hedge_state_machine_with_execution import HedgeStateMachineWithExecution
+from infrastructure.broadcaster import broadcaster
 from infrastructure.logger_config import logger
-from infrastructure.settings import settings
 from entities.hedge_result_entity import HedgeResult
 
 
 class BinanceCandleStreamer:
+    """
+    Consumidor de uma pool: lê o slot LatestPrice do símbolo no feed
+    (BinancePriceFeed ou BinanceMarketDataHub) e, quando o intervalo de
+    hedge vence, executa a máquina de estados com o preço mais recente.
+
+    Ticks que chegam enquanto a pool espera são coalescidos no slot:
+    • dropped ....  sobrescritos enquanto o intervalo não vencia
+    • coalesced ..  sobrescritos enquanto uma execução (ordem) estava em voo
+    """
+
     def __init__(
         self,
         symbol: str,
         hedge_simulator: HedgeStateMachineWithExecution,
         rebalance_threshold_usd: float,
-        hedge_interval_seconds: int = 10
+        hub: Union[BinancePriceFeed, BinanceMarketDataHub],
+        hedge_interval_seconds: float = 10
     ):
         self.symbol = symbol.lower()
-        self.client = None
-        self.bm = None
+        self.hub = hub
         self.hedge = hedge_simulator
         self.rebalance_threshold_usd = rebalance_threshold_usd
         self._last_hedge_time: Optional[datetime] = None
         self.hedge_interval = hedge_interval_seconds
-        self.df = pd.DataFrame(columns=[
-            "time", "close",
-            "quantity_token1", "quantity_token2",
-            "value_token1_usd", "value_token2_usd",
-            "total_value_usd", "delta_total", "accumulated_fee",
-            "short_action", "short_value_usd",
-            "short_pnl_usd", "total_accumulated",
-            "total_accumulated_with_fee", "short_blocks"
-        ])
+        self._stopped = asyncio.Event()
+        self._slot = None
+        self.last_result: Optional[HedgeResult] = None
 
-    async def start(self):
-        self.client = await AsyncClient.create(settings.BINANCE_KEY, settings.BINANCE_SECRET)
-        self.bm = BinanceSocketManager(self.client)
+        # contadores
+        self.executions = 0
+        self.dropped = 0
+        self.coalesced = 0
 
-        # Inicia stream da Binance
+    async def start(self):
+        slot = self._slot = await self.hub.subscribe(self.symbol)
+        logger.info(f"Iniciando stream de preços para {self.symbol.upper()}...")
+        interval = timedelta(seconds=self.hedge_interval)
+        seen = slot.seq          # último seq consumido
+        seen_after_exec = seen   # seq no fim da última execução
         try:
-            async with self.bm.futures_multiplex_socket([f"{self.symbol}@kline_1m"]) as stream:
-                logger.info(f"Iniciando stream de 1m para {self.symbol.upper()}...")
-                while True:
+            while not self._stopped.is_set():
+                if slot.seq == seen:
+                    await slot.wait()
+                    continue
+
+                # Executa hedge a cada `hedge_interval` segundos
+                now = datetime.utcnow()
+                if self._last_hedge_time is not None and now - self._last_hedge_time < interval:
+                    remaining = (self._last_hedge_time + interval - now).total_seconds()
                     try:
-                        msg = await stream.recv()
-                        kline = msg.get("data", {}).get("k")
-                        if not kline:
-                            continue
-                        close = float(kline["c"])
-                        now = datetime.utcnow()
+                        await asyncio.wait_for(self._stopped.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
 
-                        # Executa hedge a cada 5 segundos
-                        if (
-                            self._last_hedge_time is None or
-                            (now - self._last_hedge_time) >= timedelta(seconds=self.hedge_interval)
-                        ):
-                            self._last_hedge_time = now
-                            await self._execute_hedge(close, now)
+                seq, close, received_at = slot.seq, slot.price, slot.received_at
+                self.hedge.timers.observe("dispatch", time.perf_counter() - received_at)
+                busy, idle = seen_after_exec - seen, seq - seen_after_exec
+                if idle >= 1:
+                    self.coalesced += busy
+                    self.dropped += idle - 1
+                else:
+                    self.coalesced += busy - 1
+                seen = seq
 
-                    except Exception as e:
-                        logger.error(f"Erro no stream: {e}")
-                        break
+                self._last_hedge_time = now
+                await self._execute_hedge(close, now, received_at)
+                self.executions += 1
+                seen_after_exec = slot.seq
         except asyncio.CancelledError:
             logger.info("Cancelamento detectado. Finalizando stream...")
         finally:
-            await self.stop()
+            await self.hub.unsubscribe(self.symbol)
 
-    async def _execute_hedge(self, close_price: float, timestamp: datetime):
+    async def _execute_hedge(
+        self,
+        close_price: float,
+        timestamp: datetime,
+        received_at: Optional[float] = None,
+    ):
         """Executa hedge com o último preço disponível."""
-        result: HedgeResult = await self.hedge.on_new_price_and_execute(
-            close_price=close_price,
-            timestamp=timestamp,
-            rebalance_threshold_usd=self.rebalance_threshold_usd,
-            hedge_interval=self.hedge_interval
-        )
-        self.df.loc[len(self.df)] = result.dict()
-        logger.info("Hedge result", extra=result.dict())
+        try:
+            result: HedgeResult = await self.hedge.on_new_price_and_execute(
+                close_price=close_price,
+                timestamp=timestamp,
+                rebalance_threshold_usd=self.rebalance_threshold_usd,
+                hedge_interval=self.hedge_interval,
+                received_at=received_at,
+            )
+        except Exception as e:
+            logger.error(f"Erro no hedge de {self.symbol.upper()}: {e}")
+            return
+        # o histórico fica em self.hedge.results (HedgeResultStore)
+        self.last_result = result
+        data = result.to_dict()
+        # pool_id / symbol separam as pools no hedge.log (replay de incidentes)
+        logger.info("Hedge result", extra={"pool_id": self.hedge.pool_id, "symbol": self.hedge.symbol, **data})
+        broadcaster.publish(self.hedge.pool_id, "result", data)
+
+    def stats(self) -> dict:
+        return {
+            "executions": self.executions,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
 
     async def stop(self):
-        if self.client:
-            await self.client.close_connection()
+        self._stopped.set()
+        if self._slot is not None:
+            self._slot.wake()
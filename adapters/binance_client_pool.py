@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Optional
+
+from infrastructure.logger_config import logger
+
+if TYPE_CHECKING:  # python-binance só é importado no primeiro acquire
+    from binance.async_client import AsyncClient
+
+
+class BinanceClientPool:
+    """
+    Um único AsyncClient (uma sessão aiohttp) compartilhado pelo hub de
+    market data e pelo BinanceShortManager de todas as pools.
+
+    • acquire / release ..  contagem de referências; o primeiro acquire cria
+                            o client, o último release fecha a sessão
+    • aquecimento ........  `warm_connections` futures_ping em paralelo logo
+                            na criação → conexões TLS com o host de futures
+                            já abertas antes da primeira ordem
+    • keep-alive .........  repete o aquecimento a cada `keepalive_interval`
+                            s para o pool do aiohttp não fechar as conexões
+    • relógio ............  timestamp_offset do client = serverTime − ponto
+                            médio do RTT de futures_time, refeito a cada
+                            `time_sync_interval` s; as ordens assinadas usam
+                            o offset em cache, sem resync no caminho crítico
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        api_secret: Optional[str],
+        tld: str = "com",
+        warm_connections: int = 2,
+        keepalive_interval: float = 10.0,
+        time_sync_interval: float = 300.0,
+    ) -> None:
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._tld = tld
+        self.warm_connections = warm_connections
+        self.keepalive_interval = keepalive_interval
+        self.time_sync_interval = time_sync_interval
+
+        self.client: Optional["AsyncClient"] = None
+        self._refs = 0
+        self._lock = asyncio.Lock()
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._last_sync = 0.0
+
+        # métricas
+        self.time_offset_ms = 0.0
+        self.last_rtt = 0.0            # s, último futures_time
+        self.keepalive_errors = 0
+
+    # ---------------- ciclo de vida ------------------------------
+    async def acquire(self) -> "AsyncClient":
+        async with self._lock:
+            if self.client is None:
+                await self._open()
+            self._refs += 1
+            return self.client
+
+    async def release(self) -> None:
+        async with self._lock:
+            self._refs = max(self._refs - 1, 0)
+            if self._refs == 0 and self.client is not None:
+                await self._close()
+
+    async def _open(self) -> None:
+        import aiohttp
+        from binance.async_client import AsyncClient
+        from adapters.binance_endpoints import apply_endpoint_overrides
+
+        apply_endpoint_overrides()
+        self.client = await AsyncClient.create(
+            self._api_key,
+            self._api_secret,
+            tld=self._tld,
+            session_params={
+                "connector": aiohttp.TCPConnector(
+                    limit=100,
+                    keepalive_timeout=max(self.keepalive_interval * 3, 30.0),
+                    ttl_dns_cache=300,
+                ),
+            },
+        )
+        await self.sync_time()
+        await self._warm()
+        self._keepalive_task = asyncio.create_task(self._keepalive())
+        logger.info({
+            "message": "Cliente Binance compartilhado pronto",
+            "time_offset_ms": round(self.time_offset_ms, 3),
+            "rtt_ms": round(self.last_rtt * 1000, 3),
+        })
+
+    async def _close(self) -> None:
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            await asyncio.gather(self._keepalive_task, return_exceptions=True)
+            self._keepalive_task = None
+        await self.client.close_connection()
+        self.client = None
+
+    # ---------------- aquecimento / relógio ----------------------
+    async def _warm(self) -> None:
+        await asyncio.gather(*(self.client.futures_ping() for _ in range(self.warm_connections)))
+
+    async def sync_time(self) -> float:
+        """Atualiza o offset (ms) usado nas requisições assinadas."""
+        sent = time.time()
+        res = await self.client.futures_time()
+        received = time.time()
+        self.last_rtt = received - sent
+        self.time_offset_ms = res["serverTime"] - (sent + received) / 2 * 1000
+        self.client.timestamp_offset = self.time_offset_ms
+        self._last_sync = time.monotonic()
+        return self.time_offset_ms
+
+    async def _keepalive(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                if time.monotonic() - self._last_sync >= self.time_sync_interval:
+                    await self.sync_time()
+                await self._warm()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.keepalive_errors += 1
+                logger.error(f"Erro no keep-alive do cliente Binance: {e}")
@@ -0,0 +1,25 @@
+from binance import AsyncClient, BinanceSocketManager
+
+from infrastructure.settings import settings
+
+
+def apply_endpoint_overrides() -> None:
+    """
+    Redireciona o python-binance para outra exchange quando
+    BINANCE_BASE_URL / BINANCE_STREAM_URL estão definidos (ex.: a fake
+    local de loadtest/fake_exchange.py). Sem as variáveis, nada muda.
+
+    • BINANCE_BASE_URL ....  http://host:port → /api (ping/time) e /fapi
+    • BINANCE_STREAM_URL ..  ws://host:port   → streams de futures
+
+    Idempotente; chamada antes de cada AsyncClient.create.
+    """
+    base = settings.BINANCE_BASE_URL
+    if base:
+        base = base.rstrip("/")
+        AsyncClient.API_URL = f"{base}/api"
+        AsyncClient.FUTURES_URL = f"{base}/fapi"
+
+    stream = settings.BINANCE_STREAM_URL
+    if stream:
+        BinanceSocketManager.FSTREAM_URL = stream.rstrip("/") + "/"
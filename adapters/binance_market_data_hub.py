@@ -0,0 +1,195 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from infrastructure.logger_config import logger
+from infrastructure.metrics import StageTimers, metrics
+from infrastructure.settings import settings
+
+if TYPE_CHECKING:  # python-binance só é importado na primeira assinatura
+    from binance import AsyncClient, BinanceSocketManager
+    from adapters.binance_client_pool import BinanceClientPool
+
+# limite de streams por conexão combinada aceito pela Binance Futures
+MAX_STREAMS_PER_SOCKET = 200
+
+
+class LatestPrice:
+    """
+    Slot "último valor" de um símbolo: o produtor só sobrescreve, nunca
+    enfileira. `seq` conta as publicações, então quem consome sabe quantos
+    ticks foram coalescidos entre duas leituras.
+    """
+
+    __slots__ = ("price", "time", "received_at", "seq", "_waiter")
+
+    def __init__(self):
+        self.price: Optional[float] = None
+        self.time: Optional[datetime] = None
+        self.received_at = 0.0          # perf_counter() na recepção
+        self.seq = 0
+        self._waiter: Optional[asyncio.Future] = None
+
+    def publish(self, price: float, ts: datetime, received_at: float) -> None:
+        self.price = price
+        self.time = ts
+        self.received_at = received_at
+        self.seq += 1
+        self.wake()
+
+    def wake(self) -> None:
+        if self._waiter is not None:
+            if not self._waiter.done():
+                self._waiter.set_result(None)
+            self._waiter = None
+
+    async def wait(self) -> None:
+        """Aguarda a próxima publicação (ou um `wake`)."""
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self._waiter)
+
+
+class BinanceMarketDataHub:
+    """
+    Um único cliente / multiplex socket de klines para todas as pools.
+
+    Cada símbolo assinado vira um stream `<symbol>@kline_1m` na conexão
+    combinada. O loop de recepção só decodifica e publica o preço no
+    LatestPrice do símbolo — nunca espera execução de hedge — então o
+    socket é sempre drenado; cada pool consome o slot no seu ritmo.
+    Quando o conjunto de símbolos muda, a conexão é reaberta com a nova
+    lista (em lotes de MAX_STREAMS_PER_SOCKET).
+    """
+
+    def __init__(
+        self,
+        kline_interval: str = "1m",
+        reconnect_delay: float = 1.0,
+        client_pool: Optional["BinanceClientPool"] = None,
+    ):
+        self.kline_interval = kline_interval
+        self.reconnect_delay = reconnect_delay
+        self.client_pool = client_pool
+        self.client: Optional["AsyncClient"] = None
+        self.bm: Optional["BinanceSocketManager"] = None
+        self._subscribers: Dict[str, int] = {}
+        self._slots: Dict[str, LatestPrice] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._lock = asyncio.Lock()
+        self._closing = asyncio.Event()
+        self._stage_timers: Dict[str, StageTimers] = {}
+
+        # contadores do produtor
+        self.received = 0      # klines recebidas
+        self.unrouted = 0      # mensagens sem kline ou sem assinante
+
+    # ---------------- assinaturas --------------------------------
+    async def subscribe(self, symbol: str) -> LatestPrice:
+        symbol = symbol.lower()
+        async with self._lock:
+            is_new = symbol not in self._subscribers
+            self._subscribers[symbol] = self._subscribers.get(symbol, 0) + 1
+            slot = self._slots.setdefault(symbol, LatestPrice())
+            if is_new:
+                await self._restart()
+            return slot
+
+    async def unsubscribe(self, symbol: str) -> None:
+        symbol = symbol.lower()
+        async with self._lock:
+            count = self._subscribers.get(symbol)
+            if not count:
+                return
+            if count > 1:
+                self._subscribers[symbol] = count - 1
+                return
+            del self._subscribers[symbol]
+            self._slots.pop(symbol).wake()
+            await self._restart()
+
+    def _timers(self, symbol: str) -> StageTimers:
+        timers = self._stage_timers.get(symbol)
+        if timers is None:
+            timers = self._stage_timers[symbol] = metrics.timers("*", symbol)
+        return timers
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self._subscribers)
+
+    # ---------------- conexão ------------------------------------
+    async def _restart(self) -> None:
+        # o cancel sozinho não basta: o wait_for do recv() do python-binance
+        # pode engolir o CancelledError quando chega mensagem no mesmo
+        # instante (frequente sob carga), então o loop também olha o evento
+        self._closing.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._closing = asyncio.Event()
+
+        if not self._subscribers:
+            return
+        if self.client is None:
+            from binance import AsyncClient, BinanceSocketManager
+            from adapters.binance_endpoints import apply_endpoint_overrides
+
+            apply_endpoint_overrides()
+            if self.client_pool is not None:
+                self.client = await self.client_pool.acquire()
+            else:
+                self.client = await AsyncClient.create(settings.BINANCE_KEY, settings.BINANCE_SECRET)
+            self.bm = BinanceSocketManager(self.client)
+
+        streams = [f"{s}@kline_{self.kline_interval}" for s in self.symbols]
+        for i in range(0, len(streams), MAX_STREAMS_PER_SOCKET):
+            batch = streams[i:i + MAX_STREAMS_PER_SOCKET]
+            self._tasks.append(asyncio.create_task(self._run(batch, self._closing)))
+
+    async def _run(self, streams: List[str], closing: asyncio.Event) -> None:
+        while not closing.is_set():
+            try:
+                async with self.bm.futures_multiplex_socket(streams) as stream:
+                    logger.info(f"Stream multiplex iniciado: {len(streams)} símbolos")
+                    while not closing.is_set():
+                        msg = await stream.recv()
+                        received_at = time.perf_counter()
+                        data = msg.get("data", {})
+                        kline = data.get("k")
+                        if not kline:
+                            self.unrouted += 1
+                            continue
+                        self.received += 1
+                        slot = self._slots.get(kline["s"].lower())
+                        if slot is None:
+                            self.unrouted += 1
+                            continue
+                        slot.publish(float(kline["c"]), datetime.utcnow(), received_at)
+
+                        timers = self._timers(kline["s"])
+                        timers.observe("decode", time.perf_counter() - received_at)
+                        if "E" in data:
+                            timers.observe("feed_lag", max(time.time() - data["E"] / 1000, 0.0))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no stream multiplex: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def stop(self) -> None:
+        async with self._lock:
+            self._subscribers.clear()
+            for slot in self._slots.values():
+                slot.wake()
+            self._slots.clear()
+            await self._restart()
+            if self.client:
+                if self.client_pool is not None:
+                    await self.client_pool.release()
+                else:
+                    await self.client.close_connection()
+                self.client = None
+                self.bm = None
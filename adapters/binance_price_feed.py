@@ -0,0 +1,233 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from adapters.binance_market_data_hub import MAX_STREAMS_PER_SOCKET, LatestPrice
+from infrastructure.logger_config import logger
+from infrastructure.metrics import StageTimers, metrics
+from infrastructure.settings import settings
+
+DEFAULT_STREAM_URL = "wss://fstream.binance.com"
+
+
+# ---------------- extratores por tipo de stream ------------------------
+# cada um lê só o campo de preço do payload (`data`) do stream combinado
+def _kline_price(data: dict) -> float:
+    return float(data["k"]["c"])
+
+
+def _mark_price(data: dict) -> float:
+    return float(data["p"])
+
+
+def _agg_trade_price(data: dict) -> float:
+    return float(data["p"])
+
+
+def _book_mid_price(data: dict) -> float:
+    return (float(data["b"]) + float(data["a"])) * 0.5
+
+
+# tipo → (extrator, categoria da URL de futures)
+STREAM_KINDS: Dict[str, Tuple[Callable[[dict], float], str]] = {
+    "kline": (_kline_price, "market"),              # kline_1m: ~250 ms, fechamento parcial
+    "markPrice": (_mark_price, "market"),           # markPrice (3 s) / markPrice@1s
+    "aggTrade": (_agg_trade_price, "market"),       # cada trade agregado
+    "bookTicker": (_book_mid_price, "public"),      # mid do topo do book, tempo real
+}
+
+
+def _stream_kind(stream: str) -> str:
+    kind = stream.split("@")[0].split("_")[0]
+    if kind not in STREAM_KINDS:
+        raise ValueError(f"stream de preço não suportado: {stream!r} (use {', '.join(STREAM_KINDS)})")
+    return kind
+
+
+class BinancePriceFeed:
+    """
+    Feed de preços enxuto, alternativa ao BinanceMarketDataHub com a mesma
+    interface (subscribe / unsubscribe / stop, slots LatestPrice), então o
+    BinanceCandleStreamer e a máquina de estados não mudam com o stream.
+
+    • conexão .....  WebSocket direto (aiohttp) no stream combinado de
+                     futures, sem o python-binance: sem a fila interna de
+                     100 mensagens (que estoura e reconecta sob carga) nem
+                     o wait_for por mensagem
+    • decode ......  orjson + extrator do tipo de stream, que lê só o campo
+                     de preço; o roteamento é um dict lookup pelo nome do
+                     stream, sem normalizar o símbolo
+    • streams .....  `stream` = kline_<intervalo>, markPrice, markPrice@1s,
+                     aggTrade ou bookTicker (mid) — os três últimos
+                     permitem hedge bem abaixo de 1 minuto
+    • micro-batch ..  com `batch_ms` > 0, publica no slot só o último
+                     preço de cada símbolo a cada janela (menos wake-ups
+                     dos consumidores em streams de alta frequência)
+    """
+
+    def __init__(
+        self,
+        stream: str = "kline_1m",
+        batch_ms: float = 0.0,
+        url: Optional[str] = None,
+        reconnect_delay: float = 1.0,
+    ):
+        self.stream = stream
+        self._extract, category = STREAM_KINDS[_stream_kind(stream)]
+        self.batch_seconds = batch_ms / 1000
+        base = (url or settings.BINANCE_STREAM_URL or DEFAULT_STREAM_URL).rstrip("/")
+        self.url = f"{base}/{category}/stream"
+        self.reconnect_delay = reconnect_delay
+
+        self._subscribers: Dict[str, int] = {}
+        # nome do stream ("btcusdt@markPrice@1s") → slot do símbolo
+        self._routes: Dict[str, LatestPrice] = {}
+        self._stage_timers: Dict[str, StageTimers] = {}
+        self._pending: Dict[str, Tuple[LatestPrice, float, int, float]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._session = None
+        self._tasks: List[asyncio.Task] = []
+        self._lock = asyncio.Lock()
+        self._closing = asyncio.Event()
+
+        # contadores do produtor
+        self.received = 0      # mensagens de preço recebidas
+        self.unrouted = 0      # mensagens sem preço ou sem assinante
+        self.batched = 0       # preços sobrescritos dentro de uma janela
+
+    # ---------------- assinaturas --------------------------------
+    def _stream_name(self, symbol: str) -> str:
+        return f"{symbol}@{self.stream}"
+
+    async def subscribe(self, symbol: str) -> LatestPrice:
+        symbol = symbol.lower()
+        name = self._stream_name(symbol)
+        async with self._lock:
+            is_new = symbol not in self._subscribers
+            self._subscribers[symbol] = self._subscribers.get(symbol, 0) + 1
+            slot = self._routes.setdefault(name, LatestPrice())
+            if is_new:
+                await self._restart()
+            return slot
+
+    async def unsubscribe(self, symbol: str) -> None:
+        symbol = symbol.lower()
+        async with self._lock:
+            count = self._subscribers.get(symbol)
+            if not count:
+                return
+            if count > 1:
+                self._subscribers[symbol] = count - 1
+                return
+            del self._subscribers[symbol]
+            self._routes.pop(self._stream_name(symbol)).wake()
+            await self._restart()
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self._subscribers)
+
+    def _timers(self, stream: str) -> StageTimers:
+        timers = self._stage_timers.get(stream)
+        if timers is None:
+            symbol = stream.split("@", 1)[0].upper()
+            timers = self._stage_timers[stream] = metrics.timers("*", symbol)
+        return timers
+
+    # ---------------- conexão ------------------------------------
+    async def _restart(self) -> None:
+        self._closing.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._closing = asyncio.Event()
+        self._flush()
+
+        if not self._subscribers:
+            return
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession()
+
+        streams = [self._stream_name(s) for s in self.symbols]
+        for i in range(0, len(streams), MAX_STREAMS_PER_SOCKET):
+            batch = streams[i:i + MAX_STREAMS_PER_SOCKET]
+            self._tasks.append(asyncio.create_task(self._run(batch, self._closing)))
+
+    async def _run(self, streams: List[str], closing: asyncio.Event) -> None:
+        import aiohttp
+
+        url = f"{self.url}?streams={'/'.join(streams)}"
+        while not closing.is_set():
+            try:
+                async with self._session.ws_connect(url, autoping=True, max_msg_size=0) as ws:
+                    logger.info(f"Feed de preços iniciado: {len(streams)} símbolos ({self.stream})")
+                    async for msg in ws:
+                        if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                            self._on_message(msg.data)
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            raise ws.exception() or ConnectionError("erro no WebSocket")
+                    if not closing.is_set():
+                        raise ConnectionError("WebSocket fechado pela exchange")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no feed de preços: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _on_message(self, raw) -> None:
+        received_at = time.perf_counter()
+        msg = orjson.loads(raw)
+        stream = msg.get("stream")
+        slot = self._routes.get(stream)
+        if slot is None:
+            self.unrouted += 1
+            return
+        data = msg["data"]
+        try:
+            price = self._extract(data)
+        except (KeyError, TypeError, ValueError):
+            self.unrouted += 1
+            return
+        self.received += 1
+        event_ms = data.get("E", 0)
+        self._timers(stream).observe("decode", time.perf_counter() - received_at)
+
+        if self.batch_seconds > 0:
+            if stream in self._pending:
+                self.batched += 1
+            self._pending[stream] = (slot, price, event_ms, received_at)
+            if self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.batch_seconds, self._flush)
+            return
+        self._publish(stream, slot, price, event_ms, received_at)
+
+    def _publish(self, stream: str, slot: LatestPrice, price: float, event_ms: int, received_at: float) -> None:
+        slot.publish(price, datetime.utcnow(), received_at)
+        if event_ms:
+            self._timers(stream).observe("feed_lag", max(time.time() - event_ms / 1000, 0.0))
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for stream, (slot, price, event_ms, received_at) in pending.items():
+            if self._routes.get(stream) is slot:
+                self._publish(stream, slot, price, event_ms, received_at)
+
+    async def stop(self) -> None:
+        async with self._lock:
+            self._subscribers.clear()
+            for slot in self._routes.values():
+                slot.wake()
+            self._routes.clear()
+            await self._restart()
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
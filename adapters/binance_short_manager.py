@@ -1,13 +1,18 @@
 # hedge_binance.py
-import math
-import copy
-from typing import List, Dict, Any, Optional
-
-import pandas as pd
-from binance.async_client import AsyncClient
-from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET
+import time
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
 from infrastructure.logger_config import trade_logger
+from infrastructure.metrics import metrics
+
+if TYPE_CHECKING:  # python-binance só é importado no __aenter__
+    from binance.async_client import AsyncClient
+    from adapters.binance_client_pool import BinanceClientPool
+
+# mesmos valores de binance.enums (evita carregar o pacote no import)
+SIDE_BUY = "BUY"
+SIDE_SELL = "SELL"
+ORDER_TYPE_MARKET = "MARKET"
 
 
 # -----------------------------------------------------------------------------
@@ -23,6 +28,10 @@ class BinanceShortManager:
 
     All order‐tracking (orderId, entryPrice) is returned so the caller can
     compute PnL independently if desired.
+
+    With a `client_pool`, the client (and its warm HTTP session / cached
+    clock offset) is borrowed from the shared BinanceClientPool instead of
+    created here.
     """
 
     def __init__(
@@ -30,16 +39,26 @@ class BinanceShortManager:
         api_key: str,
         api_secret: str,
         tld: str = "com",
+        client_pool: Optional["BinanceClientPool"] = None,
     ) -> None:
         self._api_key = api_key
         self._api_secret = api_secret
-        self._client: Optional[AsyncClient] = None
+        self._client: Optional["AsyncClient"] = None
         self._tld = tld
+        self._client_pool = client_pool
 
     # ----------------------------------------------------------------------
     # LIFECYCLE
     # ----------------------------------------------------------------------
     async def __aenter__(self) -> "BinanceShortManager":
+        if self._client_pool is not None:
+            self._client = await self._client_pool.acquire()
+            return self
+
+        from binance.async_client import AsyncClient
+        from adapters.binance_endpoints import apply_endpoint_overrides
+
+        apply_endpoint_overrides()
         self._client = await AsyncClient.create(
             self._api_key,
             self._api_secret,
@@ -48,8 +67,35 @@ class BinanceShortManager:
         return self
 
     async def __aexit__(self, *exc) -> None:
-        if self._client:
+        if self._client_pool is not None:
+            await self._client_pool.release()
+        elif self._client:
             await self._client.close_connection()
+        self._client = None
+
+    # ----------------------------------------------------------------------
+    # RATE LIMITS
+    # ----------------------------------------------------------------------
+    def rate_limit_usage(self) -> Dict[str, int]:
+        """
+        X-MBX-USED-WEIGHT-* / X-MBX-ORDER-COUNT-* headers of the client's
+        last response (success or error), upper-cased → used count.
+
+        The client is shared, so it may be another caller's response; the
+        counters are per account / IP either way.
+        """
+        response = getattr(self._client, "response", None)
+        if response is None:
+            return {}
+        usage = {}
+        for name, value in response.headers.items():
+            name = name.upper()
+            if name.startswith(("X-MBX-USED-WEIGHT-", "X-MBX-ORDER-COUNT-")):
+                try:
+                    usage[name] = int(value)
+                except ValueError:
+                    pass
+        return usage
 
     # ----------------------------------------------------------------------
     # PUBLIC ACTIONS
@@ -62,13 +108,16 @@ class BinanceShortManager:
 
         Returns the raw Binance order payload (for orderId, price, etc.).
         """
+        started = time.perf_counter()
         order = await self._client.futures_create_order(
             symbol=symbol,
             side=SIDE_SELL,
             type=ORDER_TYPE_MARKET,
             quantity=quantity,
             positionSide="SHORT",
+            newOrderRespType="RESULT",
         )
+        metrics.timers("*", symbol).observe("exchange_roundtrip", time.perf_counter() - started)
         trade_logger.info("open-order", extra=order)
         return order
 
@@ -78,13 +127,16 @@ class BinanceShortManager:
         """
         Market-buys quantity contracts → reduces (or completely closes) shorts.
         """
+        started = time.perf_counter()
         order = await self._client.futures_create_order(
             symbol=symbol,
             side=SIDE_BUY,
             type=ORDER_TYPE_MARKET,
             quantity=quantity,
             positionSide="SHORT",
+            newOrderRespType="RESULT",
         )
+        metrics.timers("*", symbol).observe("exchange_roundtrip", time.perf_counter() - started)
         trade_logger.info("reduce-order", extra=order)
         return order
 
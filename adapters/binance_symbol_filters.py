@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from entities.symbol_filters_entity import SymbolFilters
+from infrastructure.logger_config import logger
+
+if TYPE_CHECKING:
+    from adapters.binance_client_pool import BinanceClientPool
+
+
+class SymbolFilterCache:
+    """
+    Cache de SymbolFilters de todos os símbolos de futures, carregado uma
+    vez do exchangeInfo (via BinanceClientPool) e atualizado em background
+    a cada `refresh_interval` s. Leitura (`get`) é um dict lookup, sem I/O
+    no caminho da ordem.
+    """
+
+    def __init__(self, client_pool: "BinanceClientPool", refresh_interval: float = 3600.0):
+        self.client_pool = client_pool
+        self.refresh_interval = refresh_interval
+        self._filters: Dict[str, SymbolFilters] = {}
+        self.rate_limits: List[dict] = []       # rateLimits do exchangeInfo
+        self._task: Optional[asyncio.Task] = None
+        self._client = None
+        self.loaded_at = 0.0
+        self.refresh_errors = 0
+
+    def get(self, symbol: str) -> Optional[SymbolFilters]:
+        return self._filters.get(symbol.upper())
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    async def start(self) -> None:
+        """Primeira carga (bloqueante) + refresh periódico."""
+        if self._task is not None:
+            return
+        self._client = await self.client_pool.acquire()
+        try:
+            await self.refresh()
+        except Exception as e:
+            # sem filtros as ordens usam a precisão padrão até o próximo refresh
+            self.refresh_errors += 1
+            logger.error(f"Erro ao carregar filtros de símbolo: {e}")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def refresh(self) -> None:
+        info = await self._client.futures_exchange_info()
+        self._filters = {
+            s["symbol"]: SymbolFilters.from_exchange_info(s)
+            for s in info.get("symbols", [])
+        }
+        self.rate_limits = info.get("rateLimits", [])
+        self.loaded_at = time.time()
+        logger.info(f"Filtros de símbolo carregados: {len(self._filters)} símbolos")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # mantém o cache anterior
+                self.refresh_errors += 1
+                logger.error(f"Erro ao atualizar filtros de símbolo: {e}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client is not None:
+            self._client = None
+            await self.client_pool.release()
@@ -0,0 +1,170 @@
+import asyncio
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+import orjson
+
+from adapters.binance_price_feed import DEFAULT_STREAM_URL
+from infrastructure.logger_config import logger
+from infrastructure.settings import settings
+
+if TYPE_CHECKING:
+    from adapters.binance_client_pool import BinanceClientPool
+
+
+class BinanceUserStream:
+    """
+    Posição real da conta por push: user-data stream da Binance Futures
+    (listenKey) em um WebSocket próprio, fora do caminho das ordens.
+
+    • posição .......  contratos em short (lado SHORT, hedge mode) por
+                       símbolo. ACCOUNT_UPDATE traz a posição absoluta;
+                       ORDER_TRADE_UPDATE soma o fill (`l`) quando é mais
+                       novo (T) que o último ACCOUNT_UPDATE do símbolo, o
+                       que evita contar o mesmo fill duas vezes
+    • snapshot ......  um positionRisk (REST) a cada (re)conexão; até ele
+                       chegar, `synced` é False e ninguém deve reconciliar
+    • listenKey .....  renovado a cada `keepalive_interval` s; um
+                       listenKeyExpired derruba a conexão e gera outra chave
+    • listeners .....  chamados com o símbolo a cada mudança de posição
+    """
+
+    def __init__(
+        self,
+        client_pool: "BinanceClientPool",
+        url: Optional[str] = None,
+        keepalive_interval: float = 1800.0,
+        reconnect_delay: float = 1.0,
+    ):
+        self.client_pool = client_pool
+        base = (url or settings.BINANCE_STREAM_URL or DEFAULT_STREAM_URL).rstrip("/")
+        self.url = f"{base}/ws"
+        self.keepalive_interval = keepalive_interval
+        self.reconnect_delay = reconnect_delay
+
+        self.positions: Dict[str, float] = {}
+        self.listeners: List[Callable[[str], None]] = []
+        self.synced = False
+        self._account_time: Dict[str, int] = {}
+        self._client = None
+        self._session = None
+        self._task: Optional[asyncio.Task] = None
+
+        # contadores
+        self.order_updates = 0
+        self.account_updates = 0
+        self.reconnects = 0
+        self.malformed = 0
+
+    # ---------------- ciclo de vida ------------------------------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        import aiohttp
+
+        self._client = await self.client_pool.acquire()
+        self._session = aiohttp.ClientSession()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self._session.close()
+        self._session = None
+        await self.client_pool.release()
+        self._client = None
+        self.synced = False
+
+    # ---------------- conexão ------------------------------------
+    async def _run(self) -> None:
+        import aiohttp
+
+        while True:
+            keepalive = None
+            try:
+                listen_key = await self._client.futures_stream_get_listen_key()
+                async with self._session.ws_connect(f"{self.url}/{listen_key}", autoping=True) as ws:
+                    # eventos que chegarem durante o snapshot ficam no buffer
+                    # do socket e são aplicados depois dele
+                    await self._snapshot()
+                    keepalive = asyncio.create_task(self._keepalive(listen_key))
+                    logger.info({"message": "User-data stream iniciado", "positions": len(self.positions)})
+                    async for msg in ws:
+                        if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                            self._on_message(msg.data)
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            raise ws.exception() or ConnectionError("erro no WebSocket")
+                    raise ConnectionError("user-data stream fechado pela exchange")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.synced = False
+                self.reconnects += 1
+                logger.error(f"Erro no user-data stream: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                if keepalive is not None:
+                    keepalive.cancel()
+
+    async def _snapshot(self) -> None:
+        rows = await self._client.futures_position_information()
+        for row in rows:
+            if row.get("positionSide") != "SHORT":
+                continue
+            symbol = row["symbol"]
+            self.positions[symbol] = abs(float(row["positionAmt"]))
+            self._account_time[symbol] = int(row.get("updateTime", 0))
+            self._notify(symbol)
+        self.synced = True
+
+    async def _keepalive(self, listen_key: str) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self._client.futures_stream_keepalive(listen_key)
+            except Exception as e:
+                logger.error(f"Erro ao renovar o listenKey: {e}")
+
+    # ---------------- eventos ------------------------------------
+    def _on_message(self, raw) -> None:
+        try:
+            msg = orjson.loads(raw)
+            event = msg.get("e")
+            if event == "ORDER_TRADE_UPDATE":
+                self._on_order(msg)
+            elif event == "ACCOUNT_UPDATE":
+                self._on_account(msg)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self.malformed += 1
+            return
+        if event == "listenKeyExpired":
+            raise ConnectionError("listenKey expirado")
+
+    def _on_order(self, msg: dict) -> None:
+        self.order_updates += 1
+        order = msg["o"]
+        last = float(order.get("l", 0))
+        symbol = order["s"]
+        if order.get("ps") != "SHORT" or not last:
+            return
+        if msg.get("T", 0) <= self._account_time.get(symbol, 0):
+            return          # já contado no ACCOUNT_UPDATE
+        position = self.positions.get(symbol, 0.0)
+        self.positions[symbol] = position + last if order["S"] == "SELL" else position - last
+        self._notify(symbol)
+
+    def _on_account(self, msg: dict) -> None:
+        self.account_updates += 1
+        for pos in msg.get("a", {}).get("P", ()):
+            if pos.get("ps") != "SHORT":
+                continue
+            symbol = pos["s"]
+            self.positions[symbol] = abs(float(pos["pa"]))
+            self._account_time[symbol] = msg.get("T", 0)
+            self._notify(symbol)
+
+    def _notify(self, symbol: str) -> None:
+        for listener in self.listeners:
+            listener(symbol)
@@ -0,0 +1,249 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+import numpy as np
+import orjson
+
+from entities.hedge_result_entity import ACTION_CODES
+
+# bytes por pedaço do arquivo: cada worker lê e decodifica um por vez
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+# linhas que interessam (filtro em bytes, antes do JSON)
+_RESULT_MARKER = b'"Hedge result"'
+_TRADE_MARKERS = (b'"open-order"', b'"reduce-order"', b'"error"', b'"reconcile"', b'"executed_qty"')
+
+T = TypeVar("T")
+
+
+@dataclass
+class ResultChunk:
+    """Linhas "Hedge result" de um pedaço do hedge.log, em colunas."""
+
+    time_ms: np.ndarray           # int64
+    close: np.ndarray             # float64
+    action: np.ndarray            # int8 (índice em ACTIONS)
+    short_value: np.ndarray       # float64 (short_value_usd registrado)
+    pool: np.ndarray              # int32 (índice em `pools`)
+    pools: List[str]              # "" = linha sem pool_id (logs antigos)
+    symbols: List[str]            # símbolo de cada pool ("" se ausente)
+    lines: int = 0
+    malformed: int = 0
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+@dataclass
+class TradeChunk:
+    """Ordens executadas e falhas de um pedaço do hedge_trades.log."""
+
+    time_ms: np.ndarray           # int64 (updateTime da exchange, ou timestamp do log)
+    qty: np.ndarray               # float64, + venda (abre short) / − compra
+    symbol: np.ndarray            # int32 (índice em `symbols`)
+    symbols: List[str]
+    errors: List[dict] = field(default_factory=list)
+    partials: List[dict] = field(default_factory=list)
+    reconciles: List[dict] = field(default_factory=list)
+    lines: int = 0
+    malformed: int = 0
+
+
+# ---------------- pedaços ----------------------------------------------
+def chunk_ranges(path: Union[str, Path], chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """Faixas [início, fim) de ~chunk_bytes, cortadas em fim de linha."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as fh:
+        pos = chunk_bytes
+        while pos < size:
+            fh.seek(pos)
+            fh.readline()           # termina a linha cortada
+            pos = fh.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+            pos += chunk_bytes
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _read(path: str, start: int, end: int) -> List[bytes]:
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        return fh.read(end - start).split(b"\n")
+
+
+def _epoch_ms(stamps: List[str]) -> np.ndarray:
+    # ISO sem fuso (UTC), com ou sem microssegundos
+    return np.array(stamps, dtype="datetime64[ms]").astype(np.int64)
+
+
+# ---------------- parsers (rodam nos workers) --------------------------
+def parse_result_chunk(path: str, start: int, end: int) -> ResultChunk:
+    times: List[str] = []
+    close: List[float] = []
+    action: List[int] = []
+    short_value: List[float] = []
+    pool: List[int] = []
+    codes: Dict[str, int] = {}
+    symbols: List[str] = []
+    lines = malformed = 0
+
+    for line in _read(path, start, end):
+        if _RESULT_MARKER not in line:
+            continue
+        lines += 1
+        try:
+            rec = orjson.loads(line)
+            t, c, a, v = rec["time"], float(rec["close"]), ACTION_CODES[rec["short_action"]], float(rec["short_value_usd"])
+            name = rec.get("pool_id") or ""
+        except (KeyError, TypeError, ValueError):
+            malformed += 1
+            continue
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(codes)
+            symbols.append(rec.get("symbol") or "")
+        times.append(t)
+        close.append(c)
+        action.append(a)
+        short_value.append(v)
+        pool.append(code)
+
+    try:
+        time_ms = _epoch_ms(times)
+    except ValueError:
+        # alguma data inválida: converte uma a uma e descarta as ruins
+        time_ms = np.array([_stamp_ms(t) for t in times], dtype=np.int64)
+    keep = time_ms >= 0
+    malformed += int((~keep).sum())
+    return ResultChunk(
+        time_ms=time_ms[keep],
+        close=np.array(close, dtype=np.float64)[keep],
+        action=np.array(action, dtype=np.int8)[keep],
+        short_value=np.array(short_value, dtype=np.float64)[keep],
+        pool=np.array(pool, dtype=np.int32)[keep],
+        pools=list(codes),
+        symbols=symbols,
+        lines=lines,
+        malformed=malformed,
+    )
+
+
+def parse_trade_chunk(path: str, start: int, end: int) -> TradeChunk:
+    times: List[Union[int, str]] = []
+    qty: List[float] = []
+    symbol: List[int] = []
+    codes: Dict[str, int] = {}
+    errors: List[dict] = []
+    partials: List[dict] = []
+    reconciles: List[dict] = []
+    lines = malformed = 0
+
+    for line in _read(path, start, end):
+        if not any(marker in line for marker in _TRADE_MARKERS):
+            continue
+        lines += 1
+        try:
+            rec = orjson.loads(line)
+            message = rec.get("message")
+            if message in ("open-order", "reduce-order"):
+                filled = float(rec["executedQty"])
+                name = rec["symbol"]
+                stamp = rec.get("updateTime") or rec["timestamp"]
+            elif "error" in rec:
+                errors.append(_event(rec))
+                continue
+            elif rec.get("action") == "reconcile":
+                reconciles.append(_event(rec))
+                continue
+            elif "executed_qty" in rec:
+                # execução parcial de uma ordem da máquina (ledger / carry ajustados)
+                partials.append(_event(rec))
+                continue
+            else:
+                continue
+        except (KeyError, TypeError, ValueError, AttributeError):
+            malformed += 1
+            continue
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(codes)
+        times.append(stamp)
+        qty.append(filled if message == "open-order" else -filled)
+        symbol.append(code)
+
+    time_ms = np.array([_stamp_ms(t) for t in times], dtype=np.int64)
+    keep = time_ms >= 0
+    malformed += int((~keep).sum())
+    return TradeChunk(
+        time_ms=time_ms[keep],
+        qty=np.array(qty, dtype=np.float64)[keep],
+        symbol=np.array(symbol, dtype=np.int32)[keep],
+        symbols=list(codes),
+        errors=errors,
+        partials=partials,
+        reconciles=reconciles,
+        lines=lines,
+        malformed=malformed,
+    )
+
+
+def _stamp_ms(stamp: Union[int, str]) -> int:
+    """epoch ms de um updateTime (int) ou de um ISO; −1 se inválido."""
+    if isinstance(stamp, int):
+        return stamp
+    try:
+        return int(np.datetime64(stamp, "ms").astype(np.int64))
+    except (TypeError, ValueError):
+        return -1
+
+
+def _event(rec: dict) -> dict:
+    """Campos de uma falha / execução parcial / reconciliação no relatório."""
+    event = {k: rec[k] for k in ("action", "symbol", "qty", "executed_qty", "drift", "price", "error") if k in rec}
+    event["time_ms"] = _stamp_ms(rec.get("timestamp") or 0)
+    return event
+
+
+# ---------------- leitura em paralelo ----------------------------------
+def iter_chunks(
+    path: Union[str, Path],
+    parser: Callable[[str, int, int], T],
+    processes: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Iterator[T]:
+    """
+    Lê um log JSON-lines em pedaços, decodificados em paralelo num pool de
+    processos, e os entrega em ordem de arquivo.
+
+    No máximo 2 × processos pedaços ficam em voo: a memória não cresce com
+    o tamanho do arquivo, e quem consome (a reexecução) nunca espera o
+    parse de mais de um pedaço por vez.
+    """
+    path = str(path)
+    ranges = chunk_ranges(path, chunk_bytes)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield parser(path, start, end)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        todo = iter(ranges)
+        pending = deque(pool.submit(parser, path, a, b) for a, b in itertools.islice(todo, 2 * processes))
+        try:
+            while pending:
+                chunk = pending.popleft().result()
+                for a, b in itertools.islice(todo, 1):
+                    pending.append(pool.submit(parser, path, a, b))
+                yield chunk
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,230 @@
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+import numpy as np
+
+from entities.hedge_result_entity import ACTION_CODES, ACTIONS, HedgeResult
+
+if TYPE_CHECKING:
+    from adapters.hedge_rollup_store import HedgeRollupStore
+
+RESULT_DTYPE = np.dtype([
+    ("time", "<i8"),                  # epoch em ms (UTC)
+    ("close", "<f8"),
+    ("quantity_token1", "<f8"),
+    ("quantity_token2", "<f8"),
+    ("value_token1_usd", "<f8"),
+    ("value_token2_usd", "<f8"),
+    ("total_value_usd", "<f8"),
+    ("delta_total", "<f8"),
+    ("accumulated_fee", "<f8"),
+    ("short_action", "i1"),           # índice em ACTIONS
+    ("short_value_usd", "<f8"),
+    ("short_pnl_usd", "<f8"),
+    ("total_accumulated", "<f8"),
+    ("total_accumulated_with_fee", "<f8"),
+    ("short_blocks", "<i4"),          # quantidade de blocos abertos
+])
+
+_EPOCH = datetime(1970, 1, 1)
+_MS = timedelta(milliseconds=1)
+
+
+def to_epoch_ms(ts: datetime) -> int:
+    """datetime → ms; datetimes sem tz são tratados como UTC (utcnow)."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH) // _MS
+
+
+class HedgeResultStore:
+    """
+    Armazena o histórico de HedgeResult em colunas tipadas, com memória
+    limitada.
+
+    • buffer ....  array estruturado pré-alocado de `chunk_size` linhas
+    • segmentos .  quando o buffer enche, vira um `.npy` em `directory`
+                   (`<t_ini>_<t_fim>.npy`) lido depois via memory-map
+    • sem dir ...  o buffer funciona como ring buffer e sobrescreve as
+                   linhas mais antigas
+
+    `query` só abre os segmentos cujo intervalo cruza [start, end] e usa
+    busca binária na coluna de tempo; `page` pagina com um cursor
+    "<time_ms>-<n>" (n linhas já entregues naquele ms, que pode ter vários
+    ticks). Com `max_segments`, os segmentos mais antigos são apagados.
+    Com `rollups`, cada append também atualiza os agregados 1m / 15m / 1h
+    / 1d (adapters/hedge_rollup_store.py).
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        chunk_size: int = 65_536,
+        max_segments: Optional[int] = None,
+        rollups: Optional["HedgeRollupStore"] = None,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.chunk_size = chunk_size
+        self.max_segments = max_segments
+        self.rollups = rollups
+
+        self._buffer = np.zeros(chunk_size, dtype=RESULT_DTYPE)
+        self._size = 0          # linhas válidas no buffer
+        self._head = 0          # próxima posição de escrita
+        self._segments: List[Tuple[int, int, Path]] = []
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path in sorted(self.directory.glob("*.npy")):
+                t0, t1 = (int(x) for x in path.stem.split("_"))
+                self._segments.append((t0, t1, path))
+
+    # ---------------- escrita ------------------------------------
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, result: HedgeResult) -> None:
+        time_ms = to_epoch_ms(result.time)
+        self._buffer[self._head] = (
+            time_ms,
+            result.close,
+            result.quantity_token1,
+            result.quantity_token2,
+            result.value_token1_usd,
+            result.value_token2_usd,
+            result.total_value_usd,
+            result.delta_total,
+            result.accumulated_fee,
+            ACTION_CODES[result.short_action],
+            result.short_value_usd,
+            result.short_pnl_usd,
+            result.total_accumulated,
+            result.total_accumulated_with_fee,
+            len(result.short_blocks),
+        )
+        if self.rollups is not None:
+            self.rollups.add(time_ms, result)
+        self._head += 1
+        self._size = max(self._size, self._head)
+        if self._head == self.chunk_size:
+            if self.directory:
+                self._spill()
+            self._head = 0
+
+    def _spill(self) -> None:
+        chunk = self._buffer[: self._size]
+        t0, t1 = int(chunk["time"][0]), int(chunk["time"][-1])
+        path = self.directory / f"{t0:015d}_{t1:015d}.npy"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, chunk)
+        os.replace(tmp, path)
+        self._segments.append((t0, t1, path))
+        self._size = 0
+
+        if self.max_segments is not None:
+            while len(self._segments) > self.max_segments:
+                _, _, old = self._segments.pop(0)
+                old.unlink(missing_ok=True)
+
+    def flush(self) -> None:
+        """Força a gravação do buffer atual como segmento (ex.: no stop)."""
+        if self.directory and self._head:
+            self._spill()
+            self._head = 0
+        if self.rollups is not None:
+            self.rollups.flush()
+
+    # ---------------- leitura ------------------------------------
+    def _buffer_rows(self) -> np.ndarray:
+        if self._size < self.chunk_size or self._head == 0:
+            return self._buffer[: self._size]
+        # ring cheio: ordem cronológica começa em _head
+        return np.concatenate((self._buffer[self._head:], self._buffer[: self._head]))
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        """
+        Linhas com start <= time <= end, em ordem cronológica (cópia).
+        `after` = (time_ms, n) exclui tudo antes de time_ms e as n
+        primeiras linhas de time_ms.
+        """
+        lo = to_epoch_ms(start) if start else np.iinfo(np.int64).min
+        skip = 0
+        if after is not None:
+            after_ms, skip = after
+            lo = max(lo, after_ms)
+            if limit is not None:
+                limit += skip
+        hi = to_epoch_ms(end) if end else np.iinfo(np.int64).max
+
+        parts, count = [], 0
+        for t0, t1, path in self._segments:
+            if t1 < lo or t0 > hi:
+                continue
+            part = self._slice(np.load(path, mmap_mode="r"), lo, hi)
+            if limit is not None:
+                part = part[: limit - count]
+            parts.append(part)
+            count += len(part)
+            if limit is not None and count >= limit:
+                break
+        else:
+            parts.append(self._slice(self._buffer_rows(), lo, hi))
+
+        rows = np.concatenate(parts) if parts else np.zeros(0, dtype=RESULT_DTYPE)
+        if limit is not None:
+            rows = rows[:limit]
+        if skip:
+            same = int(np.searchsorted(rows["time"], after_ms, side="right"))
+            rows = rows[min(skip, same):]
+        return rows
+
+    def page(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Optional[str]]:
+        """
+        Uma página de `query` e o cursor da seguinte (None no fim). ValueError
+        se o cursor não for um devolvido por `page`.
+        """
+        after = None
+        if cursor is not None:
+            time_ms, _, n = cursor.partition("-")
+            after = (int(time_ms), int(n or 0))
+        rows = self.query(start=start, end=end, limit=limit, after=after)
+        if len(rows) < limit:
+            return rows, None
+        last = int(rows["time"][-1])
+        same = len(rows) - int(np.searchsorted(rows["time"], last, side="left"))
+        if after is not None and after[0] == last:
+            same += after[1]
+        return rows, f"{last}-{same}"
+
+    @staticmethod
+    def _slice(rows: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        times = rows["time"]
+        i = np.searchsorted(times, lo, side="left")
+        j = np.searchsorted(times, hi, side="right")
+        return rows[i:j]
+
+    @staticmethod
+    def to_records(rows: np.ndarray) -> List[dict]:
+        """Converte linhas do store em dicts (formato do HedgeResult)."""
+        records = []
+        for row in rows.tolist():
+            rec = dict(zip(RESULT_DTYPE.names, row))
+            rec["time"] = (_EPOCH + rec["time"] * _MS).isoformat()
+            rec["short_action"] = ACTIONS[rec["short_action"]]
+            records.append(rec)
+        return records
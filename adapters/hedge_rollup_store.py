@@ -0,0 +1,277 @@
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from entities.hedge_result_entity import HedgeResult
+
+# resolução → largura do bucket em ms (alinhado em UTC: 1d começa 00:00)
+RESOLUTIONS: Dict[str, int] = {
+    "1m": 60_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "1d": 86_400_000,
+}
+
+ROLLUP_DTYPE = np.dtype([
+    ("start", "<i8"),                 # epoch em ms do início do bucket
+    ("ticks", "<i4"),                 # ticks no bucket (holds da banda inclusive)
+    ("price_open", "<f8"),
+    ("price_high", "<f8"),
+    ("price_low", "<f8"),
+    ("price_close", "<f8"),
+    ("value_open", "<f8"),            # total_value_usd da pool
+    ("value_high", "<f8"),
+    ("value_low", "<f8"),
+    ("value_close", "<f8"),
+    ("fees", "<f8"),                  # fee acumulada dentro do bucket
+    ("accumulated_fee", "<f8"),       # valores no fim do bucket
+    ("total_accumulated_with_fee", "<f8"),
+    ("short_pnl_usd", "<f8"),
+    ("short_value_usd", "<f8"),
+    ("opens", "<i4"),                 # ordens por ação
+    ("increases", "<i4"),
+    ("decreases", "<i4"),
+    ("closes", "<i4"),
+])
+
+_ACTION_COUNTS = {"open": 0, "increase": 1, "decrease": 2, "close": 3}
+_EPOCH = datetime(1970, 1, 1)
+_MS = timedelta(milliseconds=1)
+
+
+class _Bucket:
+    __slots__ = (
+        "start", "ticks", "p_open", "p_high", "p_low", "p_close",
+        "v_open", "v_high", "v_low", "v_close", "fee_base", "fee",
+        "total", "pnl", "short_value", "orders",
+    )
+
+    def __init__(self, start: int, result: HedgeResult, fee_base: float):
+        price, value = result.close, result.total_value_usd
+        self.start = start
+        self.ticks = 0
+        self.p_open = self.p_high = self.p_low = price
+        self.v_open = self.v_high = self.v_low = value
+        self.fee_base = fee_base
+        self.orders = [0, 0, 0, 0]
+
+    @classmethod
+    def from_row(cls, row: np.void) -> "_Bucket":
+        bucket = cls.__new__(cls)
+        bucket.start = int(row["start"])
+        bucket.ticks = int(row["ticks"])
+        bucket.p_open, bucket.p_high = float(row["price_open"]), float(row["price_high"])
+        bucket.p_low, bucket.p_close = float(row["price_low"]), float(row["price_close"])
+        bucket.v_open, bucket.v_high = float(row["value_open"]), float(row["value_high"])
+        bucket.v_low, bucket.v_close = float(row["value_low"]), float(row["value_close"])
+        bucket.fee = float(row["accumulated_fee"])
+        bucket.fee_base = bucket.fee - float(row["fees"])
+        bucket.total = float(row["total_accumulated_with_fee"])
+        bucket.pnl = float(row["short_pnl_usd"])
+        bucket.short_value = float(row["short_value_usd"])
+        bucket.orders = [int(row["opens"]), int(row["increases"]), int(row["decreases"]), int(row["closes"])]
+        return bucket
+
+    def add(self, result: HedgeResult) -> None:
+        price, value = result.close, result.total_value_usd
+        self.ticks += 1
+        if price > self.p_high:
+            self.p_high = price
+        elif price < self.p_low:
+            self.p_low = price
+        if value > self.v_high:
+            self.v_high = value
+        elif value < self.v_low:
+            self.v_low = value
+        self.p_close = price
+        self.v_close = value
+        self.fee = result.accumulated_fee
+        self.total = result.total_accumulated_with_fee
+        self.pnl = result.short_pnl_usd
+        self.short_value = result.short_value_usd
+        action = _ACTION_COUNTS.get(result.short_action)
+        if action is not None:
+            self.orders[action] += 1
+
+    def record(self) -> tuple:
+        return (
+            self.start, self.ticks,
+            self.p_open, self.p_high, self.p_low, self.p_close,
+            self.v_open, self.v_high, self.v_low, self.v_close,
+            self.fee - self.fee_base, self.fee, self.total, self.pnl, self.short_value,
+            *self.orders,
+        )
+
+
+class _Series:
+    """Uma resolução: `<res>.bin` = registros ROLLUP_DTYPE em ordem de start."""
+
+    __slots__ = ("name", "width", "path", "count", "open", "index", "tail")
+
+    def __init__(self, name: str, width: int, path: Path):
+        self.name = name
+        self.width = width
+        self.path = path
+        self.count = path.stat().st_size // ROLLUP_DTYPE.itemsize if path.exists() else 0
+        self.open: Optional[_Bucket] = None
+        self.index = self.count           # posição do bucket aberto no arquivo
+        self.tail: Optional[_Bucket] = None
+        if self.count:
+            # último bucket gravado: retomado se o próximo resultado cair nele
+            row = np.fromfile(path, dtype=ROLLUP_DTYPE, count=1, offset=(self.count - 1) * ROLLUP_DTYPE.itemsize)[0]
+            self.tail = _Bucket.from_row(row)
+
+    def write(self, bucket: _Bucket, index: int) -> None:
+        data = np.array([bucket.record()], dtype=ROLLUP_DTYPE).tobytes()
+        with open(self.path, "r+b" if self.path.exists() else "wb") as fh:
+            fh.seek(index * ROLLUP_DTYPE.itemsize)
+            fh.write(data)
+        self.count = max(self.count, index + 1)
+
+
+class HedgeRollupStore:
+    """
+    Agregados por bucket de tempo (1m, 15m, 1h, 1d) do HedgeResult de uma
+    pool, atualizados a cada resultado — gráficos de semanas / meses sem
+    ler as linhas por tick.
+
+    • bucket .......  OHLC do preço e do valor da pool (total_value_usd),
+                      fee ganha no bucket, valores de fim de bucket
+                      (total_accumulated_with_fee, short_pnl_usd,
+                      short_value_usd) e ordens por ação. A máquina gera
+                      um resultado por tick, inclusive dentro da banda de
+                      gatilho, então ticks e OHLC cobrem todos os preços
+    • escrita ......  O(1) por resultado em objetos Python; o bucket que
+                      fecha é gravado no fim de `<res>.bin` (registro fixo
+                      de ROLLUP_DTYPE), o aberto é regravado no lugar a
+                      cada `sync_interval` s e no flush. Num restart, o
+                      último registro é retomado se ainda for o bucket
+                      corrente
+    • retenção .....  `max_buckets` por resolução (padrão: 1m guarda 90
+                      dias); acima de 25% de excesso o arquivo é compactado
+    • leitura ......  `query` usa memory-map + busca binária em `start`;
+                      `limit` fica com os buckets mais novos do intervalo
+    """
+
+    DEFAULT_MAX_BUCKETS = {"1m": 90 * 1440}
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        resolutions: Optional[Dict[str, int]] = None,
+        max_buckets: Optional[Dict[str, int]] = None,
+        sync_interval: float = 5.0,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_buckets = self.DEFAULT_MAX_BUCKETS if max_buckets is None else max_buckets
+        self.sync_interval = sync_interval
+        self._series = [
+            _Series(name, width, self.directory / f"{name}.bin")
+            for name, width in (resolutions or RESOLUTIONS).items()
+        ]
+        self._by_name = {s.name: s for s in self._series}
+        self._last_sync = time.monotonic()
+
+    @property
+    def resolutions(self) -> List[str]:
+        return list(self._by_name)
+
+    # ---------------- escrita ------------------------------------
+    def add(self, time_ms: int, result: HedgeResult) -> None:
+        for series in self._series:
+            start = time_ms - time_ms % series.width
+            bucket = series.open
+            if bucket is None or start > bucket.start:
+                bucket = self._roll(series, start, result)
+            bucket.add(result)
+
+        now = time.monotonic()
+        if now - self._last_sync >= self.sync_interval:
+            self.flush()
+
+    def _roll(self, series: _Series, start: int, result: HedgeResult) -> _Bucket:
+        previous = series.open or series.tail
+        if series.open is not None:
+            series.write(series.open, series.index)
+            series.index += 1
+        elif series.tail is not None and start <= series.tail.start:
+            # restart dentro do bucket gravado: continua nele
+            series.open, series.tail = series.tail, None
+            series.index = series.count - 1
+            return series.open
+        series.tail = None
+        fee_base = previous.fee if previous is not None else result.accumulated_fee
+        series.open = _Bucket(start, result, fee_base)
+        self._retain(series)
+        return series.open
+
+    def _retain(self, series: _Series) -> None:
+        limit = self.max_buckets.get(series.name)
+        if not limit or series.count <= limit * 1.25:
+            return
+        keep = np.fromfile(series.path, dtype=ROLLUP_DTYPE)[-limit:]
+        tmp = series.path.with_suffix(".tmp")
+        keep.tofile(tmp)
+        os.replace(tmp, series.path)
+        series.index -= series.count - len(keep)
+        series.count = len(keep)
+
+    def flush(self) -> None:
+        """Grava os buckets abertos (no lugar) — sync periódico e no stop."""
+        for series in self._series:
+            if series.open is not None:
+                series.write(series.open, series.index)
+        self._last_sync = time.monotonic()
+
+    # ---------------- leitura ------------------------------------
+    def query(
+        self,
+        resolution: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Buckets com start_ms <= início <= end_ms, em ordem (cópia); com
+        `limit`, os `limit` mais novos do intervalo (a ponta de um gráfico).
+        """
+        series = self._by_name.get(resolution)
+        if series is None:
+            raise ValueError(f"resolução não suportada: {resolution!r} (use {', '.join(self._by_name)})")
+        lo = np.iinfo(np.int64).min if start_ms is None else start_ms - start_ms % series.width
+        hi = np.iinfo(np.int64).max if end_ms is None else end_ms
+
+        if series.count:
+            rows = np.memmap(series.path, dtype=ROLLUP_DTYPE, mode="r", shape=(series.count,))
+            starts = rows["start"]
+            i = int(np.searchsorted(starts, lo, side="left"))
+            j = int(np.searchsorted(starts, hi, side="right"))
+            if limit is not None:
+                i = max(i, j - limit)
+            rows = np.array(rows[i:j])
+        else:
+            rows = np.zeros(0, dtype=ROLLUP_DTYPE)
+
+        # o bucket aberto em memória é mais novo que o registro do arquivo
+        bucket = series.open
+        if bucket is not None and lo <= bucket.start <= hi:
+            record = np.array([bucket.record()], dtype=ROLLUP_DTYPE)
+            if len(rows) and rows["start"][-1] == bucket.start:
+                rows[-1] = record[0]
+            else:
+                rows = np.concatenate((rows, record))
+        return rows[-limit:] if limit is not None else rows
+
+    @staticmethod
+    def to_records(rows: np.ndarray) -> List[dict]:
+        records = []
+        for row in rows.tolist():
+            rec = dict(zip(ROLLUP_DTYPE.names, row))
+            rec["start"] = (_EPOCH + rec["start"] * _MS).isoformat()
+            records.append(rec)
+        return records
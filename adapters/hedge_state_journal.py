@@ -0,0 +1,323 @@
+import logging
+import math
+import os
+import struct
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+# só o logger por nome: importar logger_config abriria os arquivos de log
+# também no backtest / sweep, que usam a máquina sem journal
+logger = logging.getLogger("hedge_logger")
+
+# ---------------- formato ---------------------------------------------
+# registro do journal: tipo (1 byte) + payload + crc32(tipo + payload)
+REC_FEE = 1         # accumulated_fee (só em journals antigos; a fee vai no REC_STATE)
+REC_ADD = 2         # ledger.add(price, value)
+REC_CLEAR = 3       # ledger.clear()
+REC_REDUCE = 4      # ledger.reduce_lifo(amount)
+REC_STATE = 5       # escalares da máquina após uma transição
+
+_PAYLOADS = {
+    REC_FEE: struct.Struct("<d"),
+    REC_ADD: struct.Struct("<dd"),
+    REC_CLEAR: struct.Struct("<"),
+    REC_REDUCE: struct.Struct("<d"),
+    # mode, price_reference, value_token1_ref, L, last_v1_for_delta,
+    # _last_decrease_usd, _pending_close_usd, accumulated_fee, initial_total,
+    # _target_qty, _position_qty (NaN na máquina sem execução)
+    REC_STATE: struct.Struct("<b10d"),
+}
+# versão 1: REC_STATE sem as posições em contratos (lida no restore)
+_PAYLOADS_V1 = {**_PAYLOADS, REC_STATE: struct.Struct("<b8d")}
+_CRC = struct.Struct("<I")
+
+# snapshot: magic, versão, geração do journal seguinte, fingerprint da pool
+_SNAP_HEADER = struct.Struct("<4sHQ4d")
+_SNAP_LEDGER = struct.Struct("<Q2d")      # n blocos, total_value, Σ v/p
+_MAGIC = b"HSJ1"
+_VERSION = 2
+
+MODES = (None, "down", "up")
+MODE_CODES = {m: i for i, m in enumerate(MODES)}
+
+
+def _opt(x: Optional[float]) -> float:
+    return math.nan if x is None else x
+
+
+def _unopt(x: float) -> Optional[float]:
+    return None if math.isnan(x) else x
+
+
+class HedgeStateJournal:
+    """
+    Journal binário append-only do estado de uma HedgeStateMachine, com
+    snapshots periódicos, para warm restart sem re-ancorar a pool.
+
+    Arquivos em `directory`:
+    • snapshot.bin ........  estado completo (escalares + arrays do ledger)
+                             e a geração do journal que o segue
+    • journal_<ger>.bin ...  registros desde o snapshot, de tamanho fixo
+                             por tipo, cada um com crc32
+
+    Registros: mutações do ledger (add / clear / reduce) ficam no buffer; o
+    estado escalar após cada transição (REC_STATE) faz flush. No restore,
+    mutações depois do último REC_STATE válido (transição interrompida)
+    são descartadas. A fee dos holds não gera registro por tick: vai no
+    REC_STATE seguinte ou, sem transição, num REC_STATE a cada
+    `fee_sync_interval` s — um crash perde no máximo esse tanto de fee.
+    `fsync=True` também protege contra queda da máquina (custo de um fsync
+    por transição).
+
+    A cada `snapshot_every` registros o estado vira um snapshot novo
+    (tmp + os.replace) e o journal recomeça numa geração nova; `restore`
+    só lê o snapshot e a cauda — sem re-resolver L nem reprocessar
+    histórico. Um registro final truncado (crash no meio da escrita) é
+    descartado.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        snapshot_every: int = 10_000,
+        fsync: bool = False,
+        fee_sync_interval: float = 60.0,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.fee_sync_interval = fee_sync_interval
+
+        self._machine = None
+        self._fh = None
+        self._generation = 0
+        self._records = 0       # registros na geração atual
+        self._committed_at = time.monotonic()
+
+        # métricas do último restore
+        self.restored_records = 0
+        self.restore_ms = 0.0
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / "snapshot.bin"
+
+    def _journal_path(self, generation: int) -> Path:
+        return self.directory / f"journal_{generation:08d}.bin"
+
+    @staticmethod
+    def _fingerprint(machine) -> Tuple[float, float, float, float]:
+        return (machine.qty_token1, machine.min_price, machine.max_price, machine.total_usd_target)
+
+    @staticmethod
+    def _state(m) -> tuple:
+        return (
+            MODE_CODES[m.mode],
+            _opt(m.price_reference),
+            _opt(m.value_token1_ref),
+            _opt(m.L),
+            _opt(m.last_v1_for_delta),
+            m._last_decrease_usd,
+            m._pending_close_usd,
+            m.accumulated_fee,
+            _opt(m.initial_total),
+            # posição alvo / executada (carry) de HedgeStateMachineWithExecution
+            _opt(getattr(m, "_target_qty", None)),
+            _opt(getattr(m, "_position_qty", None)),
+        )
+
+    # ---------------- escrita ------------------------------------
+    def _write(self, rec_type: int, *values) -> None:
+        body = bytes((rec_type,)) + _PAYLOADS[rec_type].pack(*values)
+        self._fh.write(body + _CRC.pack(zlib.crc32(body)))
+        self._records += 1
+
+    def _maybe_snapshot(self) -> None:
+        # só após commit: ledger_* são gravados antes da mutação
+        if self._records >= self.snapshot_every:
+            self.snapshot()
+
+    def fee(self, accumulated_fee: float) -> None:
+        """Fee de um hold: sai no próximo commit, no máximo a cada `fee_sync_interval` s."""
+        if time.monotonic() - self._committed_at >= self.fee_sync_interval:
+            self.commit()
+
+    def ledger_add(self, price: float, value: float) -> None:
+        self._write(REC_ADD, price, value)
+
+    def ledger_clear(self) -> None:
+        self._write(REC_CLEAR)
+
+    def ledger_reduce(self, amount: float) -> None:
+        self._write(REC_REDUCE, amount)
+
+    def commit(self) -> None:
+        """Registra os escalares da máquina e força o flush."""
+        self._write(REC_STATE, *self._state(self._machine))
+        self._committed_at = time.monotonic()
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self._maybe_snapshot()
+
+    def snapshot(self) -> None:
+        """Grava o estado completo e começa uma geração nova de journal."""
+        m = self._machine
+        prices, values, total_value, value_over_price = m.short_blocks.dump()
+        generation = self._generation + 1
+
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_SNAP_HEADER.pack(_MAGIC, _VERSION, generation, *self._fingerprint(m)))
+            fh.write(_PAYLOADS[REC_STATE].pack(*self._state(m)))
+            fh.write(_SNAP_LEDGER.pack(len(values), total_value, value_over_price))
+            fh.write(prices.tobytes())
+            fh.write(values.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.snapshot_path)
+
+        # o snapshot já cobre tudo: gerações anteriores podem sair
+        if self._fh is not None:
+            self._fh.close()
+        for old in self.directory.glob("journal_*.bin"):
+            old.unlink(missing_ok=True)
+        self._generation = generation
+        self._fh = open(self._journal_path(generation), "ab", buffering=64 * 1024)
+        self._records = 0
+
+    def close(self) -> None:
+        """Snapshot final (restart seguinte lê só o snapshot) e fecha."""
+        if self._machine is None:
+            return
+        self.snapshot()
+        self._fh.close()
+        self._fh = None
+        self._machine.journal = None
+        self._machine.short_blocks.journal = None
+        self._machine = None
+
+    # ---------------- leitura ------------------------------------
+    def attach(self, machine) -> bool:
+        """
+        Restaura `machine` a partir do disco (se houver estado compatível)
+        e passa a registrar suas transições. Devolve True se restaurou.
+        """
+        started = time.perf_counter()
+        restored = self._restore(machine)
+        self.restore_ms = (time.perf_counter() - started) * 1000
+
+        self._machine = machine
+        machine.journal = self
+        machine.short_blocks.journal = self
+        # consolida o que foi lido num snapshot novo e abre o journal
+        self.snapshot()
+        return restored
+
+    def _restore(self, machine) -> bool:
+        self.restored_records = 0
+        if not self.snapshot_path.exists():
+            # sem snapshot o journal não tem base: descarta sobras
+            for old in self.directory.glob("journal_*.bin"):
+                old.unlink(missing_ok=True)
+            return False
+
+        data = self.snapshot_path.read_bytes()
+        magic, version, generation, *fingerprint = _SNAP_HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version not in (1, _VERSION):
+            raise ValueError(f"snapshot inválido em {self.snapshot_path}")
+        # a versão 1 é lida como está; o snapshot do attach já sai na atual
+        payloads = _PAYLOADS if version == _VERSION else _PAYLOADS_V1
+        if tuple(fingerprint) != self._fingerprint(machine):
+            self._archive()
+            logger.warning(f"Estado salvo em {self.directory} é de outra configuração; iniciando do zero")
+            return False
+
+        offset = _SNAP_HEADER.size
+        state = payloads[REC_STATE].unpack_from(data, offset)
+        offset += payloads[REC_STATE].size
+        n, total_value, value_over_price = _SNAP_LEDGER.unpack_from(data, offset)
+        offset += _SNAP_LEDGER.size
+        prices = array("d", data[offset:offset + 8 * n])
+        values = array("d", data[offset + 8 * n:offset + 16 * n])
+
+        machine.short_blocks.load(prices, values, total_value, value_over_price)
+        self._apply_state(machine, state)
+        self._generation = generation
+
+        path = self._journal_path(generation)
+        if path.exists():
+            self._replay(machine, path, payloads)
+        return True
+
+    def _replay(self, machine, path: Path, payloads: dict) -> None:
+        data = path.read_bytes()
+        ledger = machine.short_blocks
+        pending = []            # mutações desde o último REC_STATE
+        offset, end = 0, len(data)
+        while offset < end:
+            rec_type = data[offset]
+            payload = payloads.get(rec_type)
+            size = 1 + (payload.size if payload else 0) + _CRC.size
+            if payload is None or offset + size > end:
+                break
+            body = data[offset:offset + size - _CRC.size]
+            (crc,) = _CRC.unpack_from(data, offset + size - _CRC.size)
+            if crc != zlib.crc32(body):
+                break
+            offset += size
+            values = payload.unpack_from(body, 1)
+            if rec_type == REC_FEE:
+                # journals antigos: fee de hold, independente de transição
+                machine.accumulated_fee = values[0]
+                self.restored_records += 1
+                continue
+            if rec_type != REC_STATE:
+                pending.append((rec_type, values))
+                continue
+
+            # a transição chegou inteira: aplica as mutações dela e o estado
+            for rec, args in pending:
+                if rec == REC_ADD:
+                    ledger.add(*args)
+                elif rec == REC_CLEAR:
+                    ledger.clear()
+                else:
+                    ledger.reduce_lifo(args[0])
+            self._apply_state(machine, values)
+            self.restored_records += len(pending) + 1
+            pending.clear()
+
+        if offset < end:
+            logger.warning(f"Journal {path.name}: {end - offset} bytes finais descartados (registro incompleto)")
+        if pending:
+            logger.warning(f"Journal {path.name}: {len(pending)} registros sem o estado da transição descartados")
+
+    @staticmethod
+    def _apply_state(machine, state) -> None:
+        (mode, price_reference, value_token1_ref, L, last_v1,
+         last_decrease, pending_close, accumulated_fee, initial_total) = state[:9]
+        # None (máquina sem execução ou versão 1): parte dos contratos do ledger
+        target_qty, position_qty = state[9:] or (math.nan, math.nan)
+        machine.mode = MODES[mode]
+        machine.price_reference = _unopt(price_reference)
+        machine.value_token1_ref = _unopt(value_token1_ref)
+        machine.L = _unopt(L)
+        machine.sqrt_P = math.sqrt(price_reference) if machine.price_reference is not None else None
+        machine.last_v1_for_delta = _unopt(last_v1)
+        machine._last_decrease_usd = last_decrease
+        machine._pending_close_usd = pending_close
+        machine.accumulated_fee = accumulated_fee
+        machine.initial_total = _unopt(initial_total)
+        machine._target_qty = _unopt(target_qty)
+        machine._position_qty = _unopt(position_qty)
+
+    def _archive(self) -> None:
+        stale = self.directory / f"stale_{int(time.time() * 1000)}"
+        stale.mkdir()
+        for path in [self.snapshot_path, *self.directory.glob("journal_*.bin")]:
+            path.rename(stale / path.name)
@@ -0,0 +1,44 @@
+from pathlib import Path
+from typing import Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Layout oficial dos dumps de klines da Binance (data.binance.vision), sem header
+BINANCE_KLINE_COLUMNS = [
+    "open_time", "open", "high", "low", "close", "volume",
+    "close_time", "quote_volume", "count",
+    "taker_buy_volume", "taker_buy_quote_volume", "ignore",
+]
+
+
+def load_klines(path: Union[str, Path]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lê um arquivo local de klines (CSV ou Parquet) e devolve dois arrays:
+
+    - close_time em ms (int64)
+    - close (float64)
+
+    Aceita tanto arquivos com header (colunas `close_time`/`open_time` e
+    `close`) quanto os CSVs crus da Binance, sem header.
+    """
+    path = Path(path)
+    if path.suffix in {".parquet", ".pq"}:
+        df = pd.read_parquet(path)
+    else:
+        with open(path) as fh:
+            first_field = fh.readline().split(",", 1)[0].strip()
+        if first_field.isdigit():
+            df = pd.read_csv(path, header=None, names=BINANCE_KLINE_COLUMNS)
+        else:
+            df = pd.read_csv(path)
+
+    time_col = "close_time" if "close_time" in df.columns else "open_time"
+    times = df[time_col].to_numpy()
+    if np.issubdtype(times.dtype, np.datetime64):
+        times = times.astype("datetime64[ms]").astype(np.int64)
+
+    return (
+        np.ascontiguousarray(times, dtype=np.int64),
+        np.ascontiguousarray(df["close"].to_numpy(), dtype=np.float64),
+    )
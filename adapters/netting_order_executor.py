@@ -0,0 +1,159 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from adapters.binance_symbol_filters import SymbolFilterCache
+from adapters.order_scheduler import OrderScheduler
+from core.ports import PRIORITY_OPEN, PRIORITY_REDUCE
+from infrastructure.logger_config import trade_logger
+
+
+@dataclass
+class _Intent:
+    qty: float                      # > 0 vende (abre short), < 0 compra (reduz)
+    future: asyncio.Future = field(repr=False)
+    priority: int = PRIORITY_OPEN
+    notional: float = 0.0
+
+
+class NettingOrderExecutor:
+    """
+    Estágio de execução entre as pools e o OrderScheduler (que fica na
+    frente do BinanceShortManager).
+
+    Expõe a mesma interface do scheduler (open_short / reduce_short), mas em
+    vez de enviar cada ordem, acumula as intenções de um símbolo durante
+    `window_seconds` (a janela de um tick do hub) e envia uma única ordem
+    com o líquido:
+
+        vendas S, compras B  →  SELL (S − B)  ou  BUY (B − S)  ou nada
+
+    O lado que "cruzou" internamente é preenchido por inteiro; o lado do
+    líquido recebe a parte cruzada + o executedQty da exchange, rateado
+    pela quantidade pedida por cada pool. Cada chamada devolve um dict no
+    formato de ordem com o `executedQty` da própria pool. A ordem líquida
+    vai para a fila com a maior prioridade e o notional somado das
+    intenções do seu lado.
+
+    Com `symbol_filters`, o líquido é truncado no step do símbolo; abaixo
+    de minQty / minNotional nenhuma ordem sai e o lado do líquido recebe
+    só a parte cruzada (o resto fica no carry das pools). Se a ordem
+    falha, o mesmo rateio vale com executedQty 0 — sem nada cruzado, todas
+    as intenções recebem a exceção.
+    """
+
+    def __init__(
+        self,
+        manager: OrderScheduler,
+        window_seconds: float = 0.005,
+        qty_decimals: int = 8,
+        symbol_filters: Optional[SymbolFilterCache] = None,
+    ) -> None:
+        self.manager = manager
+        self.symbol_filters = symbol_filters
+        self.window_seconds = window_seconds
+        self.qty_decimals = qty_decimals
+        self._pending: Dict[str, List[_Intent]] = {}
+
+    # ----------------------------------------------------------------------
+    # PUBLIC ACTIONS (mesma assinatura do OrderScheduler)
+    # ----------------------------------------------------------------------
+    async def open_short(
+        self, *, symbol: str, quantity: float, priority: int = PRIORITY_OPEN, notional: float = 0.0
+    ) -> Dict[str, Any]:
+        return await self._submit(symbol, quantity, priority, notional)
+
+    async def reduce_short(
+        self, *, symbol: str, quantity: float, priority: int = PRIORITY_REDUCE, notional: float = 0.0
+    ) -> Dict[str, Any]:
+        return await self._submit(symbol, -quantity, priority, notional)
+
+    def admits(self, priority: int) -> bool:
+        return self.manager.admits(priority)
+
+    # ----------------------------------------------------------------------
+    # NETTING
+    # ----------------------------------------------------------------------
+    async def _submit(self, symbol: str, signed_qty: float, priority: int, notional: float) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(symbol)
+        if batch is None:
+            batch = self._pending[symbol] = []
+            asyncio.get_running_loop().call_later(
+                self.window_seconds,
+                lambda: asyncio.ensure_future(self._flush(symbol)),
+            )
+        batch.append(_Intent(signed_qty, future, priority, notional))
+        return await future
+
+    async def _flush(self, symbol: str) -> None:
+        intents = self._pending.pop(symbol, [])
+        if not intents:
+            return
+
+        sells = sum(i.qty for i in intents if i.qty > 0)
+        buys = -sum(i.qty for i in intents if i.qty < 0)
+        net = round(sells - buys, self.qty_decimals)
+
+        net_side = [i for i in intents if net != 0 and (net > 0) == (i.qty > 0)]
+        priority = min((i.priority for i in net_side), default=PRIORITY_OPEN)
+        notional = sum(i.notional for i in net_side)
+        net_side_total = sells if net > 0 else buys
+        crossed = min(sells, buys)
+
+        # o líquido precisa passar nos filtros por si só: intenções
+        # negociáveis podem somar um líquido abaixo de minQty / minNotional
+        order_qty = abs(net)
+        filters = self.symbol_filters.get(symbol) if self.symbol_filters is not None else None
+        if filters is not None and order_qty:
+            price = notional / net_side_total if net_side_total else 0.0
+            order_qty = abs(filters.floor_qty(order_qty))
+            if not filters.tradable(order_qty, price, reduce=net < 0 or not price):
+                order_qty = 0.0
+
+        order: Dict[str, Any] = {}
+        filled = 0.0
+        try:
+            if order_qty and net > 0:
+                order = await self.manager.open_short(
+                    symbol=symbol, quantity=order_qty, priority=priority, notional=notional * order_qty / abs(net),
+                )
+            elif order_qty:
+                order = await self.manager.reduce_short(
+                    symbol=symbol, quantity=order_qty, priority=priority, notional=notional * order_qty / abs(net),
+                )
+            filled = float(order.get("executedQty", order_qty)) if order else 0.0
+        except Exception as e:
+            if not crossed:
+                for intent in intents:
+                    intent.future.set_exception(e)
+                return
+            # nada chegou à exchange: o lado do líquido fica só com a parte
+            # cruzada, como uma execução parcial
+            trade_logger.error({"symbol": symbol, "action": "netted-order", "qty": order_qty, "error": str(e)})
+
+        ratio = (crossed + filled) / net_side_total if net_side_total else 1.0
+        for intent in intents:
+            on_net_side = net != 0 and (net > 0) == (intent.qty > 0)
+            fill = abs(intent.qty) * ratio if on_net_side else abs(intent.qty)
+            intent.future.set_result(self._fill(symbol, intent.qty, fill, net, order))
+
+        if len(intents) > 1:
+            trade_logger.info("netted-order", extra={
+                "symbol": symbol,
+                "intents": len(intents),
+                "sells": sells,
+                "buys": buys,
+                "net": net,
+                "executedQty": filled,
+            })
+
+    def _fill(self, symbol: str, qty: float, fill: float, net: float, order=None) -> Dict[str, Any]:
+        return {
+            "symbol": symbol,
+            "side": "SELL" if qty > 0 else "BUY",
+            "origQty": abs(qty),
+            "executedQty": round(fill, self.qty_decimals),
+            "netQty": net,
+            "orderId": (order or {}).get("orderId"),
+        }
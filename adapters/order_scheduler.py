@@ -0,0 +1,284 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from adapters.binance_short_manager import BinanceShortManager
+from core.ports import PRIORITY_CLOSE, PRIORITY_OPEN, PRIORITY_REDUCE
+from infrastructure.logger_config import logger
+from infrastructure.metrics import metrics
+
+# limites padrão da Binance Futures (GET /fapi/v1/exchangeInfo → rateLimits)
+DEFAULT_RATE_LIMITS = (
+    {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": 2400},
+    {"rateLimitType": "ORDERS", "interval": "MINUTE", "intervalNum": 1, "limit": 1200},
+    {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 10, "limit": 300},
+)
+
+_INTERVAL_SECONDS = {"SECOND": 1, "MINUTE": 60, "HOUR": 3600, "DAY": 86400}
+_HEADER_PREFIX = {"REQUEST_WEIGHT": "X-MBX-USED-WEIGHT-", "ORDERS": "X-MBX-ORDER-COUNT-"}
+_THROTTLED = {429, 418}
+
+
+class _Bucket:
+    """
+    Token bucket de um limite (o nome é o header que traz o uso real) +
+    a folga na janela fixa corrente da exchange, alinhada ao relógio como
+    na Binance: o bucket espalha a taxa, a folga impede que um bucket
+    cheio estoure uma janela que já foi gasta.
+    """
+
+    __slots__ = ("header", "limit", "seconds", "capacity", "rate", "tokens", "stamp", "window", "used")
+
+    def __init__(self, header: str, limit: int, seconds: float, share: float, safety: float):
+        self.header = header
+        self.limit = limit * safety                 # teto da conta (todas as instâncias)
+        self.seconds = seconds
+        self.capacity = self.limit * share          # fatia desta instância
+        self.rate = self.capacity / seconds         # tokens / s
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self.window = 0
+        self.used = 0                               # uso da conta na janela
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        window = int(time.time() // self.seconds)
+        if window != self.window:
+            self.window, self.used = window, 0
+
+    def wait_time(self, cost: float) -> float:
+        wait = 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+        if self.used + cost > self.limit:
+            wait = max(wait, (self.window + 1) * self.seconds - time.time() + 0.001)
+        return wait
+
+    def take(self, cost: float) -> None:
+        self.tokens -= cost
+        self.used += cost
+
+    def sync(self, used: int, in_flight: int) -> None:
+        # a exchange conta a conta inteira (outros shards / processos); as
+        # requisições ainda em voo não aparecem no header
+        self.used = used + in_flight
+
+
+class _Job:
+    __slots__ = ("send", "symbol", "quantity", "future", "queued_at", "attempts")
+
+    def __init__(self, send: Callable[..., Awaitable[Dict[str, Any]]], symbol: str, quantity: float):
+        self.send = send
+        self.symbol = symbol
+        self.quantity = quantity
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.perf_counter()
+        self.attempts = 0
+
+
+class OrderScheduler:
+    """
+    Fila de ordens na frente do BinanceShortManager, dentro dos limites de
+    taxa da conta.
+
+    • limites .......  um token bucket por limite do exchangeInfo (peso de
+                       requisição / min, ordens / 10 s, ordens / min), com
+                       `safety` de margem e `share` da conta para esta
+                       instância (1 / workers no modo com shards)
+    • headers .......  a cada resposta, o uso real da janela
+                       (X-MBX-USED-WEIGHT-*, X-MBX-ORDER-COUNT-*) substitui a
+                       contagem local: o que outros processos com a mesma
+                       chave gastaram também conta
+    • prioridade ....  heap por (classe, −notional): fechamentos totais,
+                       depois recompras maiores, depois aberturas
+    • 429 / 418 .....  pausa tudo por Retry-After e recoloca a ordem na
+                       fila (até `max_retries`)
+    • backpressure ..  com a fila esperando tokens (ou `max_queue` ordens
+                       nela), `admits` recusa aberturas: a máquina de
+                       estados mantém a quantidade no carry e tenta de novo
+                       no próximo tick, e o orçamento fica para as
+                       reduções, que sempre entram
+    """
+
+    def __init__(
+        self,
+        manager: BinanceShortManager,
+        rate_limits: Iterable[dict] = DEFAULT_RATE_LIMITS,
+        share: float = 1.0,
+        safety: float = 0.9,
+        max_queue: int = 64,
+        max_in_flight: int = 32,
+        max_retries: int = 3,
+    ) -> None:
+        self.manager = manager
+        self.share = share
+        self.safety = safety
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self._buckets: List[_Bucket] = []
+        self._queue: List[Tuple[int, float, int, _Job]] = []
+        self._seq = itertools.count()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self.configure(rate_limits)
+
+        # contadores
+        self.sent = 0
+        self.throttled = 0        # respostas 429 / 418
+        self.deferred = 0         # aberturas recusadas por backpressure
+
+    def configure(self, rate_limits: Iterable[dict]) -> None:
+        """(Re)cria os buckets a partir dos rateLimits do exchangeInfo."""
+        buckets = []
+        for rl in rate_limits:
+            prefix = _HEADER_PREFIX.get(rl.get("rateLimitType"))
+            seconds = _INTERVAL_SECONDS.get(rl.get("interval"))
+            if prefix is None or seconds is None:
+                continue            # RAW_REQUESTS etc.: não afetam ordens
+            num = int(rl.get("intervalNum", 1))
+            header = f"{prefix}{num}{rl['interval'][0]}"
+            buckets.append(_Bucket(header, int(rl["limit"]), seconds * num, self.share, self.safety))
+        if buckets:
+            self._buckets = buckets
+
+    # ----------------------------------------------------------------------
+    # PUBLIC ACTIONS (mesma assinatura do BinanceShortManager + prioridade)
+    # ----------------------------------------------------------------------
+    async def open_short(
+        self, *, symbol: str, quantity: float, priority: int = PRIORITY_OPEN, notional: float = 0.0
+    ) -> Dict[str, Any]:
+        return await self._submit(self.manager.open_short, symbol, quantity, priority, notional)
+
+    async def reduce_short(
+        self, *, symbol: str, quantity: float, priority: int = PRIORITY_REDUCE, notional: float = 0.0
+    ) -> Dict[str, Any]:
+        return await self._submit(self.manager.reduce_short, symbol, quantity, priority, notional)
+
+    def admits(self, priority: int) -> bool:
+        """False quando uma ordem de `priority` deve esperar no carry."""
+        if priority < PRIORITY_OPEN:
+            return True
+        if len(self._queue) < self.max_queue and not (self._queue and self._delay() > 0):
+            return True
+        self.deferred += 1
+        return False
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def tokens(self) -> Dict[str, float]:
+        now = time.monotonic()
+        for bucket in self._buckets:
+            bucket.refill(now)
+        return {bucket.header: bucket.tokens for bucket in self._buckets}
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._sending, return_exceptions=True)
+        while self._queue:
+            job = heapq.heappop(self._queue)[3]
+            if not job.future.done():
+                job.future.set_exception(ConnectionError("agendador de ordens encerrado"))
+
+    # ----------------------------------------------------------------------
+    # FILA
+    # ----------------------------------------------------------------------
+    async def _submit(self, send, symbol: str, quantity: float, priority: int, notional: float):
+        job = _Job(send, symbol, quantity)
+        self._push(priority, notional, job)
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch())
+        return await job.future
+
+    def _push(self, priority: int, notional: float, job: _Job) -> None:
+        heapq.heappush(self._queue, (priority, -notional, next(self._seq), job))
+        self._wakeup.set()
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            await self._slots.acquire()
+            # espera tokens em todos os buckets (e o fim de uma pausa por 429)
+            delay = self._delay()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self._delay()
+
+            priority, neg_notional, _, job = heapq.heappop(self._queue)
+            for bucket in self._buckets:
+                bucket.take(1.0)
+            self._in_flight += 1
+            metrics.timers("*", job.symbol).observe("order_queue", time.perf_counter() - job.queued_at)
+            task = asyncio.create_task(self._send(priority, -neg_notional, job))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    def _delay(self) -> float:
+        """Segundos até a próxima ordem caber em todos os limites."""
+        now = time.monotonic()
+        delay = self._paused_until - now
+        for bucket in self._buckets:
+            bucket.refill(now)
+            delay = max(delay, bucket.wait_time(1.0))
+        return delay
+
+    async def _send(self, priority: int, notional: float, job: _Job) -> None:
+        job.attempts += 1
+        try:
+            order = await job.send(symbol=job.symbol, quantity=job.quantity)
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            if status in _THROTTLED:
+                self._throttle(e)
+                if job.attempts <= self.max_retries:
+                    self._push(priority, notional, job)
+                    return
+            job.future.set_exception(e)
+        else:
+            self.sent += 1
+            job.future.set_result(order)
+        finally:
+            self._in_flight -= 1
+            self._sync()
+            self._slots.release()
+
+    def _sync(self) -> None:
+        usage = self.manager.rate_limit_usage()
+        if not usage:
+            return
+        now = time.monotonic()
+        for bucket in self._buckets:
+            used = usage.get(bucket.header)
+            if used is not None:
+                bucket.refill(now)
+                bucket.sync(used, self._in_flight)
+
+    def _throttle(self, e: Exception) -> None:
+        self.throttled += 1
+        response = getattr(e, "response", None)
+        try:
+            retry_after = float(response.headers.get("Retry-After", 1.0))
+        except (AttributeError, TypeError, ValueError):
+            retry_after = 1.0
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        for bucket in self._buckets:
+            bucket.tokens = min(bucket.tokens, 0.0)
+        logger.warning({
+            "message": "Limite de taxa da exchange atingido; ordens pausadas",
+            "status": getattr(e, "status_code", None),
+            "retry_after": retry_after,
+            "queued": len(self._queue),
+        })
@@ -1,6 +1,20 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from routes import hedge_routes
+from routes import hedge_routes, metrics_routes, stream_routes
+from services import hedge_backend
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # no modo com shards sobe / derruba os workers junto com a API
+    await hedge_backend.startup()
+    yield
+    await hedge_backend.shutdown()
+
 
-app = FastAPI(title="Uniswap Hedge Strategy API")
+app = FastAPI(title="Uniswap Hedge Strategy API", lifespan=lifespan)
 
 app.include_router(hedge_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(stream_routes.router)
@@ -0,0 +1,75 @@
+"""
+Fixtures determinísticas dos benchmarks: caminhos de preço com seed fixa
+e ledgers de short com N blocos. Mudar um gerador invalida a comparação
+com resultados salvos — crie um caminho novo em vez de alterar um antigo.
+"""
+from typing import Dict
+
+import numpy as np
+
+from core.short_block_ledger import ShortBlockLedger
+from entities.hedge_config_entity import HedgeConfig
+
+# pool de referência (mesmos valores do exemplo do HedgeConfigSchema)
+BENCH_CONFIG = HedgeConfig(
+    symbol="VIRTUALUSDT",
+    qty_token1=76.9,
+    min_price=1.57,
+    max_price=1.84,
+    fee_apr_percent=600.0,
+    rebalance_threshold_usd=6.0,
+    total_usd_target=300.9,
+)
+START_PRICE = 1.70
+HEDGE_INTERVAL = 60
+
+LEDGER_SIZES = (1, 10, 100, 1000)
+
+
+def range_bound(n: int, seed: int = 11) -> np.ndarray:
+    """Ornstein-Uhlenbeck no log-preço em torno de START_PRICE (fica no range)."""
+    rng = np.random.default_rng(seed)
+    mu = np.log(START_PRICE)
+    x = np.empty(n)
+    x[0] = mu
+    shocks = rng.normal(0.0, 0.002, n)
+    for i in range(1, n):
+        x[i] = x[i - 1] + 0.01 * (mu - x[i - 1]) + shocks[i]
+    return np.exp(x)
+
+
+def trending(n: int, seed: int = 12) -> np.ndarray:
+    """GBM com drift positivo: atravessa o range e sai por cima."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.4 / n, 0.001, n)
+    steps[0] = 0.0
+    return START_PRICE * np.exp(np.cumsum(steps))
+
+
+def whipsaw(n: int, seed: int = 13) -> np.ndarray:
+    """Onda quadrada de ±2% a cada 50 ticks + ruído: cruza o threshold sem parar."""
+    rng = np.random.default_rng(seed)
+    square = np.where((np.arange(n) // 50) % 2 == 0, 1.02, 0.98)
+    return START_PRICE * square * np.exp(rng.normal(0.0, 0.0005, n))
+
+
+PRICE_PATHS = {
+    "range_bound": range_bound,
+    "trending": trending,
+    "whipsaw": whipsaw,
+}
+
+
+def price_paths(n: int) -> Dict[str, np.ndarray]:
+    return {name: gen(n) for name, gen in PRICE_PATHS.items()}
+
+
+def make_ledger(size: int, seed: int = 21) -> ShortBlockLedger:
+    """Ledger com `size` blocos (preço ~START_PRICE, notional 1–10 USD)."""
+    rng = np.random.default_rng(seed + size)
+    ledger = ShortBlockLedger()
+    prices = START_PRICE * np.exp(rng.normal(0.0, 0.02, size))
+    values = rng.uniform(1.0, 10.0, size)
+    for p, v in zip(prices.tolist(), values.tolist()):
+        ledger.add(p, v)
+    return ledger
@@ -0,0 +1,97 @@
+"""
+Relatório do custo de import da API (cold start do container).
+
+Roda `python -X importtime` num interpretador novo, `--runs` vezes, e
+reporta a execução mais rápida:
+
+• total ms e RSS máximo após o import
+• módulos com maior tempo acumulado / próprio
+• dependências pesadas carregadas no startup (numpy, pandas, python-binance,
+  ...) — elas só devem entrar quando a primeira pool é iniciada
+
+Sai com status 1 se algum módulo de `--forbid` foi carregado ou se o total
+passou de `--budget-ms`.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --module api.main --budget-ms 1500 --top 15
+"""
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# não devem ser carregados só por subir a API
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "pyarrow", "binance", "dateparser")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_PROBE = (
+    "import importlib, resource, sys; "
+    "importlib.import_module(sys.argv[1]); "
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss); "
+    "print(' '.join(sorted(sys.modules)))"
+)
+
+
+@dataclass
+class ImportProfile:
+    total_us: int
+    maxrss_kib: int
+    entries: List[Tuple[str, int, int, int]]     # (módulo, self µs, cumulativo µs, nível)
+    modules: List[str]
+
+
+def profile(module: str) -> ImportProfile:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, module],
+        capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+
+    maxrss, loaded = proc.stdout.splitlines()[-2:]
+    total = sum(cum for _, _, cum, level in entries if level == 0)
+    return ImportProfile(total, int(maxrss), entries, loaded.split())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo de import do processo da API")
+    parser.add_argument("--module", default="api.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--forbid", nargs="*", default=list(HEAVY_MODULES))
+    args = parser.parse_args(argv)
+
+    best = min((profile(args.module) for _ in range(args.runs)), key=lambda p: p.total_us)
+
+    print(f"import {args.module}: {best.total_us / 1000:.1f} ms (melhor de {args.runs}), "
+          f"RSS máx {best.maxrss_kib / 1024:.1f} MiB, {len(best.modules)} módulos")
+
+    print(f"\n{'acumulado ms':>12}{'próprio ms':>12}  módulo")
+    for name, self_us, cum_us, _ in sorted(best.entries, key=lambda e: -e[2])[: args.top]:
+        print(f"{cum_us / 1000:>12.1f}{self_us / 1000:>12.1f}  {name}")
+
+    print(f"\n{'próprio ms':>12}  módulo")
+    for name, self_us, _, _ in sorted(best.entries, key=lambda e: -e[1])[: args.top]:
+        print(f"{self_us / 1000:>12.1f}  {name}")
+
+    failures = []
+    heavy = sorted({m.split(".")[0] for m in best.modules} & set(args.forbid))
+    if heavy:
+        failures.append(f"dependências pesadas no startup: {', '.join(heavy)}")
+    if args.budget_ms is not None and best.total_us / 1000 > args.budget_ms:
+        failures.append(f"total acima do orçamento de {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"\n✗ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+Micro-benchmarks dos hot paths do hedge.
+
+Cada caso roda N ticks sobre uma fixture fixa (benchmarks/fixtures.py) e
+reporta:
+
+• ns/tick .......  mediana e mínimo de `--repeat` execuções (GC desligado
+                   durante a medição, como no timeit)
+• blocks/tick ...  variação líquida de sys.getallocatedblocks() por tick
+                   (objetos que sobrevivem ao tick: crescimento de estado)
+• bytes/tick ....  variação líquida do tracemalloc por tick
+• peak KiB ......  pico do tracemalloc acima do início da execução
+
+Os resultados vão para `data/benchmarks/<UTC>.json`; `--compare` aponta
+um JSON anterior e marca regressões acima de `--threshold` (exit 1).
+
+    python -m benchmarks.run_benchmarks --ticks 20000
+    python -m benchmarks.run_benchmarks --compare data/benchmarks/20261017T120000Z.json
+"""
+import argparse
+import atexit
+import gc
+import json
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from adapters.hedge_result_store import HedgeResultStore
+from adapters.hedge_rollup_store import HedgeRollupStore
+from benchmarks.fixtures import (
+    BENCH_CONFIG,
+    HEDGE_INTERVAL,
+    LEDGER_SIZES,
+    START_PRICE,
+    make_ledger,
+    price_paths,
+)
+from core.hedge_state_machine import HedgeStateMachine
+from core.lp_curve import LPCurve
+from entities.hedge_result_entity import RESULT_FIELDS, HedgeResult
+
+RESULTS_DIR = Path("data/benchmarks")
+
+# setup() → (run, ticks); `run` executa `ticks` iterações do hot path
+Setup = Callable[[], Tuple[Callable[[], None], int]]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Setup
+
+
+# ---------------- helpers --------------------------------------------
+def _drive(coro):
+    """
+    Executa uma corrotina que não suspende (on_new_price) sem event loop,
+    para medir só o custo do tick.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("corrotina suspendeu durante o benchmark")
+
+
+def _machine() -> HedgeStateMachine:
+    cfg = BENCH_CONFIG
+    return HedgeStateMachine(
+        qty_token1=cfg.qty_token1,
+        min_price=cfg.min_price,
+        max_price=cfg.max_price,
+        total_usd_target=cfg.total_usd_target,
+        fee_apr_percent=cfg.fee_apr_percent,
+        # mesmo store do live: o append entra na medição
+        result_store=HedgeResultStore(chunk_size=10_000),
+    )
+
+
+def _timestamps(n: int) -> List[datetime]:
+    t0 = datetime(2024, 1, 1)
+    return [t0 + timedelta(seconds=HEDGE_INTERVAL * i) for i in range(n)]
+
+
+def _sample_result(blocks: int = 10) -> HedgeResult:
+    return HedgeResult(
+        time=datetime(2024, 1, 1),
+        close=START_PRICE,
+        quantity_token1=76.9,
+        quantity_token2=170.2,
+        value_token1_usd=130.73,
+        value_token2_usd=170.2,
+        total_value_usd=300.93,
+        delta_total=-6.1,
+        accumulated_fee=0.42,
+        short_action="increase",
+        short_value_usd=24.5,
+        short_pnl_usd=0.12,
+        total_accumulated=301.05,
+        total_accumulated_with_fee=301.47,
+        short_blocks=make_ledger(blocks).snapshot(),
+    )
+
+
+# ---------------- casos ----------------------------------------------
+def _on_new_price_case(name: str, prices: List[float]) -> Case:
+    def setup():
+        machine = _machine()
+        stamps = _timestamps(len(prices))
+        thr = BENCH_CONFIG.rebalance_threshold_usd
+
+        def run():
+            for price, ts in zip(prices, stamps):
+                _drive(machine.on_new_price(price, ts, thr, HEDGE_INTERVAL))
+        return run, len(prices)
+    return Case(f"on_new_price/{name}", setup)
+
+
+def _advance_case(name: str, prices: List[float]) -> Case:
+    def setup():
+        machine = _machine()
+        thr = BENCH_CONFIG.rebalance_threshold_usd
+
+        def run():
+            for price in prices:
+                machine._advance(price, thr, HEDGE_INTERVAL)
+        return run, len(prices)
+    return Case(f"advance/{name}", setup)
+
+
+def _curve_cases(prices: List[float]) -> List[Case]:
+    cfg = BENCH_CONFIG
+    curve = LPCurve(cfg.min_price, cfg.max_price)
+    L = curve.solve_liquidity(START_PRICE, cfg.total_usd_target)
+
+    def solve_setup():
+        def run():
+            for price in prices:
+                curve.solve_liquidity(price, cfg.total_usd_target)
+        return run, len(prices)
+
+    def state_setup():
+        def run():
+            for price in prices:
+                curve.state(L, price)
+        return run, len(prices)
+
+    return [Case("solve_liquidity", solve_setup), Case("lp_state", state_setup)]
+
+
+def _result_cases(n: int) -> List[Case]:
+    sample = _sample_result()
+    fields = {name: getattr(sample, name) for name in RESULT_FIELDS}
+
+    def build_setup():
+        def run():
+            for _ in range(n):
+                HedgeResult(**fields)
+        return run, n
+
+    def serialize_setup():
+        # tick com log: constrói e serializa uma vez (payload + logger)
+        def run():
+            for _ in range(n):
+                result = HedgeResult(**fields)
+                result.to_dict()
+                result.to_dict()
+        return run, n
+
+    def append_setup():
+        # substitui o antigo DataFrame append do streamer
+        store = HedgeResultStore(chunk_size=65_536)
+
+        def run():
+            for _ in range(n):
+                store.append(sample)
+        return run, n
+
+    def rollup_setup():
+        # append + agregados 1m / 15m / 1h / 1d (caminho da pool no serviço)
+        directory = Path(tempfile.mkdtemp(prefix="bench-rollups-"))
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        store = HedgeResultStore(chunk_size=65_536, rollups=HedgeRollupStore(directory))
+
+        def run():
+            for _ in range(n):
+                store.append(sample)
+        return run, n
+
+    return [
+        Case("hedge_result/build", build_setup),
+        Case("hedge_result/serialize", serialize_setup),
+        Case("result_store/append", append_setup),
+        Case("result_store/append+rollups", rollup_setup),
+    ]
+
+
+def _ledger_cases(prices: List[float]) -> List[Case]:
+    cases = []
+    for size in LEDGER_SIZES:
+        def pnl_setup(size=size):
+            ledger = make_ledger(size)
+
+            def run():
+                for price in prices:
+                    ledger.pnl(price)
+            return run, len(prices)
+
+        def cycle_setup(size=size):
+            ledger = make_ledger(size)
+
+            def run():
+                for price in prices:
+                    ledger.add(price, 5.0)
+                    ledger.reduce_lifo(5.0)
+            return run, len(prices)
+
+        def snapshot_setup(size=size):
+            ledger = make_ledger(size)
+
+            def run():
+                for price in prices:
+                    ledger.add(price, 5.0)
+                    ledger.snapshot_dicts()
+                    ledger.reduce_lifo(5.0)
+            return run, len(prices)
+
+        cases += [
+            Case(f"ledger/{size}/pnl", pnl_setup),
+            Case(f"ledger/{size}/add_reduce", cycle_setup),
+            Case(f"ledger/{size}/snapshot", snapshot_setup),
+        ]
+    return cases
+
+
+def build_cases(ticks: int) -> List[Case]:
+    paths = {name: path.tolist() for name, path in price_paths(ticks).items()}
+    cases: List[Case] = []
+    for name, prices in paths.items():
+        cases.append(_on_new_price_case(name, prices))
+        cases.append(_advance_case(name, prices))
+    cases += _curve_cases(paths["range_bound"])
+    cases += _result_cases(ticks)
+    cases += _ledger_cases(paths["range_bound"])
+    return cases
+
+
+# ---------------- medição --------------------------------------------
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        run, ticks = case.setup()
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter_ns()
+            run()
+            samples.append((time.perf_counter_ns() - t0) / ticks)
+        finally:
+            gc.enable()
+
+    run, ticks = case.setup()
+    gc.collect()
+    blocks0 = sys.getallocatedblocks()
+    run()
+    gc.collect()
+    blocks = (sys.getallocatedblocks() - blocks0) / ticks
+
+    run, ticks = case.setup()
+    gc.collect()
+    tracemalloc.start()
+    mem0, _ = tracemalloc.get_traced_memory()
+    run()
+    mem1, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ticks": ticks,
+        "ns_per_tick": statistics.median(samples),
+        "ns_per_tick_min": min(samples),
+        "blocks_per_tick": blocks,
+        "bytes_per_tick": (mem1 - mem0) / ticks,
+        "peak_kib": (peak - mem0) / 1024,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(results: Dict[str, Dict[str, float]], baseline: Optional[dict], threshold: float) -> int:
+    regressions = 0
+    header = f"{'caso':<28}{'ns/tick':>11}{'min':>11}{'blocks/tick':>13}{'bytes/tick':>12}{'peak KiB':>10}"
+    if baseline:
+        header += f"{'Δ ns':>9}"
+    print(header)
+    for name, row in results.items():
+        line = (
+            f"{name:<28}{row['ns_per_tick']:>11.1f}{row['ns_per_tick_min']:>11.1f}"
+            f"{row['blocks_per_tick']:>13.3f}{row['bytes_per_tick']:>12.1f}{row['peak_kib']:>10.1f}"
+        )
+        old = baseline.get(name) if baseline else None
+        if old:
+            change = row["ns_per_tick"] / old["ns_per_tick"] - 1
+            flag = " !" if change > threshold else ""
+            regressions += bool(flag)
+            line += f"{change:>+8.1%}{flag}"
+        print(line)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks dos hot paths do hedge")
+    parser.add_argument("--ticks", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default=None, help="regex sobre o nome do caso")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regressão tolerada em ns/tick")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.ticks)
+    if args.filter:
+        cases = [c for c in cases if re.search(args.filter, c.name)]
+
+    results = {case.name: measure(case, args.repeat) for case in cases}
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+    regressions = _print_table(results, baseline, args.threshold)
+
+    if not args.no_save:
+        now = datetime.now(timezone.utc)
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{now:%Y%m%dT%H%M%SZ}.json"
+        path.write_text(json.dumps({
+            "created": now.isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "ticks": args.ticks,
+            "repeat": args.repeat,
+            "results": results,
+        }, indent=2))
+        print(f"\nresultados salvos em {path}")
+
+    if regressions:
+        print(f"{regressions} caso(s) acima de {args.threshold:.0%} do baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
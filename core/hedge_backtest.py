@@ -0,0 +1,151 @@
+# core/hedge_backtest.py
+from typing import Dict, Optional
+
+import numpy as np
+
+from core.hedge_state_machine import HedgeStateMachine
+from entities.hedge_config_entity import HedgeConfig
+from entities.hedge_result_entity import ACTION_CODES, ACTIONS, RESULT_FIELDS
+
+FLOAT_FIELDS = (
+    "close",
+    "quantity_token1", "quantity_token2",
+    "value_token1_usd", "value_token2_usd",
+    "total_value_usd", "delta_total", "accumulated_fee",
+    "short_value_usd", "short_pnl_usd",
+    "total_accumulated", "total_accumulated_with_fee",
+)
+
+
+class BacktestResult:
+    """
+    Resultado colunar do backtest: mesmos campos do HedgeResult, um array
+    NumPy por campo.
+
+    • time ............  datetime64[ms]
+    • short_action ....  int8 (índice em ACTIONS)
+    • short_blocks ....  object; snapshot imutável do ShortBlockLedger — o
+                         mesmo objeto é reaproveitado enquanto o ledger não muda
+    • demais campos ...  float64 sem arredondamento
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["close"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def actions(self) -> np.ndarray:
+        return np.asarray(ACTIONS, dtype=object)[self.columns["short_action"]]
+
+    def order_indices(self) -> np.ndarray:
+        return np.flatnonzero(self.columns["short_action"])
+
+    def to_pandas(self):
+        import pandas as pd
+
+        df = pd.DataFrame(self.columns)
+        df["short_action"] = self.actions()
+        return df
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        data = dict(self.columns)
+        data["short_action"] = self.actions()
+        data["short_blocks"] = [
+            [{"price": p, "value": v} for p, v in blocks]
+            for blocks in self.columns["short_blocks"]
+        ]
+        return pa.table(data)
+
+
+def run_backtest(
+    config: HedgeConfig,
+    close: np.ndarray,
+    times: Optional[np.ndarray] = None,
+    hedge_interval: int = 60,
+) -> BacktestResult:
+    """
+    Reexecuta a máquina de estados sobre uma série histórica de preços.
+
+    Usa o mesmo núcleo síncrono (`HedgeStateMachine._advance`) do live,
+    então as ações são idênticas às de `on_new_price` tick a tick. A curva
+    da LP é avaliada de uma vez com `LPCurve.state_array`, e o loop só
+    grava em arrays pré-alocados (sem HedgeResult, sem corrotinas).
+
+    `times` em ms (close_time dos klines); se omitido, usa `hedge_interval`
+    segundos entre ticks a partir de 0.
+    """
+    if not 0 < config.min_price < config.max_price:
+        raise ValueError(f"Range inválido: min_price={config.min_price} max_price={config.max_price}")
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    n = len(close)
+    if times is None:
+        times = np.arange(n, dtype=np.int64) * (hedge_interval * 1000)
+
+    cols = {name: np.empty(n, dtype=np.float64) for name in FLOAT_FIELDS}
+    cols["close"][:] = close
+    actions = np.zeros(n, dtype=np.int8)
+    blocks_col = np.empty(n, dtype=object)
+
+    machine = HedgeStateMachine(
+        qty_token1=config.qty_token1,
+        min_price=config.min_price,
+        max_price=config.max_price,
+        total_usd_target=config.total_usd_target,
+        fee_apr_percent=config.fee_apr_percent,
+    )
+    if n:
+        machine._anchor(float(close[0]))
+        lp = machine.curve.state_array(machine.L, close)
+        cols["quantity_token1"][:] = lp.t1
+        cols["quantity_token2"][:] = lp.t2
+        cols["value_token1_usd"][:] = lp.v1
+        cols["value_token2_usd"][:] = lp.v2
+        cols["total_value_usd"][:] = lp.total
+        lp_rows = zip(lp.t1.tolist(), lp.t2.tolist(), lp.v1.tolist(), lp.v2.tolist(), lp.total.tolist())
+    else:
+        lp_rows = iter(())
+
+    delta_col = cols["delta_total"]
+    fee_col = cols["accumulated_fee"]
+    short_col = cols["short_value_usd"]
+    pnl_col = cols["short_pnl_usd"]
+
+    advance = machine._advance
+    threshold = config.rebalance_threshold_usd
+    blocks_snapshot = ()
+    short_value = 0.0
+
+    ledger = machine.short_blocks
+    delta_for = machine._delta_v1
+
+    for i, (price, lp_i) in enumerate(zip(close.tolist(), lp_rows)):
+        step = advance(price, threshold, hedge_interval, lp_i)
+        if step is None:
+            # dentro da banda de gatilho: nada mudou além da fee
+            delta_col[i] = delta_for(lp_i[2])
+            pnl_col[i] = ledger.pnl(price)
+        else:
+            _, delta_v1, pnl_total, action = step
+            if action != "hold":
+                actions[i] = ACTION_CODES[action]
+                blocks_snapshot = ledger.snapshot()
+                short_value = ledger.total_value
+            delta_col[i] = delta_v1
+            pnl_col[i] = pnl_total
+        fee_col[i] = machine.accumulated_fee
+        short_col[i] = short_value
+        blocks_col[i] = blocks_snapshot
+
+    cols["total_accumulated"][:] = cols["total_value_usd"] + pnl_col
+    cols["total_accumulated_with_fee"][:] = cols["total_accumulated"] + fee_col
+
+    cols["time"] = np.asarray(times, dtype=np.int64).astype("datetime64[ms]")
+    cols["short_action"] = actions
+    cols["short_blocks"] = blocks_col
+    return BacktestResult({name: cols[name] for name in RESULT_FIELDS})
@@ -0,0 +1,262 @@
+# core/hedge_replay.py
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.hedge_state_machine import HedgeStateMachine
+from entities.hedge_config_entity import HedgeConfig
+from entities.hedge_result_entity import ACTIONS
+
+if TYPE_CHECKING:  # os pedaços vêm do leitor de logs (adapters/hedge_log_reader.py)
+    from adapters.hedge_log_reader import ResultChunk, TradeChunk
+
+
+@dataclass
+class Divergence:
+    kind: str                   # "action" | "short_value" | "position"
+    time_ms: int
+    key: str                    # pool_id (action / short_value) ou símbolo (position)
+    price: float
+    recorded: object
+    simulated: object
+
+
+@dataclass
+class ReplayReport:
+    results: int = 0            # linhas "Hedge result" lidas
+    orders: int = 0             # ordens executadas no hedge_trades.log
+    skipped: int = 0            # resultados de pools sem config
+    malformed: int = 0
+    pools: Dict[str, dict] = field(default_factory=dict)
+    unknown_pools: Dict[str, str] = field(default_factory=dict)   # pool_id → símbolo
+    counts: Dict[str, int] = field(default_factory=dict)          # divergências por tipo
+    divergences: List[Divergence] = field(default_factory=list)   # até max_divergences
+    final_positions: Dict[str, dict] = field(default_factory=dict)
+    errors: List[dict] = field(default_factory=list)
+    partials: List[dict] = field(default_factory=list)
+    reconciles: List[dict] = field(default_factory=list)
+
+
+class _PoolReplay:
+    __slots__ = (
+        "pool_id", "symbol", "machine", "threshold", "interval", "target",
+        "ticks", "recorded", "simulated", "value_diverged", "first",
+    )
+
+    def __init__(self, config: HedgeConfig):
+        self.pool_id = config.pool_id or config.symbol.lower()
+        self.symbol = config.symbol.upper()
+        self.machine = HedgeStateMachine(
+            qty_token1=config.qty_token1,
+            min_price=config.min_price,
+            max_price=config.max_price,
+            total_usd_target=config.total_usd_target,
+            fee_apr_percent=config.fee_apr_percent,
+        )
+        self.threshold = config.rebalance_threshold_usd
+        self.interval = config.hedge_interval_seconds
+        self.target = 0.0               # contratos, como _target_qty no live
+        self.ticks = 0
+        self.recorded = dict.fromkeys(ACTIONS[1:], 0)
+        self.simulated = dict.fromkeys(ACTIONS[1:], 0)
+        self.value_diverged = False
+        self.first: Optional[Divergence] = None
+
+    def step(self, price: float) -> str:
+        machine = self.machine
+        step = machine._advance(price, self.threshold, self.interval)
+        action = "hold" if step is None else step[3]
+        # posição alvo: mesma regra de HedgeStateMachineWithExecution
+        if action == "open":
+            self.target = round(machine.short_blocks.total_value, 2) / price
+        elif action == "increase":
+            self.target += machine.short_blocks.last_value / price
+        elif action == "decrease":
+            self.target -= machine._last_decrease_usd / price
+        elif action == "close":
+            self.target = 0.0
+        return action
+
+
+class _SymbolOrders:
+    """Posição registrada de um símbolo: soma acumulada das ordens no tempo."""
+
+    __slots__ = ("times", "position", "last_action_ms", "diverged")
+
+    def __init__(self, times: np.ndarray, qty: np.ndarray):
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.position = np.cumsum(qty[order])
+        self.last_action_ms: Optional[int] = None
+        self.diverged = False
+
+    def at(self, time_ms: int) -> float:
+        i = int(np.searchsorted(self.times, time_ms, side="right"))
+        return float(self.position[i - 1]) if i else 0.0
+
+
+class HedgeReplay:
+    """
+    Reexecuta HedgeStateMachine sobre os resultados registrados no
+    hedge.log e compara com o que aconteceu.
+
+    • ações .........  cada linha "Hedge result" é um tick do live, e o
+                       mesmo preço na mesma ordem reproduz a ação (dentro
+                       da banda de gatilho a máquina só acumula fee, então
+                       logs sem esses ticks também servem): uma ação
+                       diferente da registrada é divergência
+    • short_value ...  valor do ledger simulado vs short_value_usd
+                       registrado (execuções parciais ajustam o ledger do
+                       live); reportado quando começa a divergir
+    • posição .......  por símbolo, Σ alvo das pools simuladas vs soma das
+                       ordens executadas no hedge_trades.log até o tick,
+                       checada antes de cada ação quando a anterior tem ao
+                       menos `settle_ms` (a ordem dela já voltou); acima de
+                       `position_tolerance_usd` em notional é divergência
+
+    A reexecução parte do zero: os logs precisam cobrir a vida da pool
+    desde a primeira âncora (o estado de um warm restart não é logado).
+    """
+
+    def __init__(
+        self,
+        configs: Iterable[HedgeConfig],
+        value_tolerance_usd: float = 0.01,
+        position_tolerance_usd: float = 5.0,
+        settle_ms: int = 5_000,
+        max_divergences: int = 1_000,
+    ):
+        self._pools: Dict[str, _PoolReplay] = {}
+        self._by_symbol: Dict[str, List[_PoolReplay]] = {}
+        for config in configs:
+            pool = _PoolReplay(config)
+            self._pools[pool.pool_id] = pool
+            self._by_symbol.setdefault(pool.symbol, []).append(pool)
+        self.value_tolerance_usd = value_tolerance_usd
+        self.position_tolerance_usd = position_tolerance_usd
+        self.settle_ms = settle_ms
+        self.max_divergences = max_divergences
+        self._orders: Optional[Dict[str, _SymbolOrders]] = None    # sem hedge_trades.log: sem posição
+        self.report = ReplayReport(counts=dict.fromkeys(("action", "short_value", "position"), 0))
+
+    # ---------------- entradas -----------------------------------
+    def load_trades(self, chunks: Iterable["TradeChunk"]) -> None:
+        """Ordens do hedge_trades.log (antes dos resultados)."""
+        times: Dict[str, List[np.ndarray]] = {}
+        qty: Dict[str, List[np.ndarray]] = {}
+        report = self.report
+        for chunk in chunks:
+            report.malformed += chunk.malformed
+            report.orders += len(chunk.qty)
+            report.errors.extend(chunk.errors)
+            report.partials.extend(chunk.partials)
+            report.reconciles.extend(chunk.reconciles)
+            for code, symbol in enumerate(chunk.symbols):
+                mask = chunk.symbol == code
+                times.setdefault(symbol, []).append(chunk.time_ms[mask])
+                qty.setdefault(symbol, []).append(chunk.qty[mask])
+        self._orders = {
+            symbol: _SymbolOrders(np.concatenate(times[symbol]), np.concatenate(qty[symbol]))
+            for symbol in times
+        }
+
+    def replay(self, chunk: "ResultChunk") -> None:
+        """Reexecuta um pedaço do hedge.log (pedaços em ordem de arquivo)."""
+        report = self.report
+        report.malformed += chunk.malformed
+        single = next(iter(self._pools.values())) if len(self._pools) == 1 else None
+        pools: List[Optional[_PoolReplay]] = []
+        for name, symbol in zip(chunk.pools, chunk.symbols):
+            # linhas sem pool_id (logs antigos) só com uma pool configurada
+            pool = self._pools.get(name) or (single if not name else None)
+            if pool is None:
+                report.unknown_pools[name] = symbol
+            pools.append(pool)
+
+        for time_ms, price, code, rec_code, rec_value in zip(
+            chunk.time_ms.tolist(), chunk.close.tolist(), chunk.pool.tolist(),
+            chunk.action.tolist(), chunk.short_value.tolist(),
+        ):
+            pool = pools[code]
+            if pool is None:
+                report.skipped += 1
+                continue
+            before = pool.target
+            action = pool.step(price)
+            recorded = ACTIONS[rec_code]
+            pool.ticks += 1
+            if recorded != "hold":
+                pool.recorded[recorded] += 1
+            if action != "hold":
+                pool.simulated[action] += 1
+            if action != recorded:
+                self._diverge(pool, Divergence("action", time_ms, pool.pool_id, price, recorded, action))
+
+            value = round(pool.machine.short_blocks.total_value, 2)
+            if abs(value - rec_value) > self.value_tolerance_usd:
+                if not pool.value_diverged:
+                    pool.value_diverged = True
+                    self._diverge(pool, Divergence("short_value", time_ms, pool.pool_id, price, rec_value, value))
+            else:
+                pool.value_diverged = False
+
+            if self._orders is not None and (action != "hold" or recorded != "hold"):
+                self._check_position(pool, time_ms, price, pool.target - before)
+        report.results += len(chunk)
+
+    # ---------------- comparação ---------------------------------
+    def _check_position(self, pool: _PoolReplay, time_ms: int, price: float, change: float) -> None:
+        orders = self._orders.get(pool.symbol)
+        if orders is None:
+            orders = self._orders[pool.symbol] = _SymbolOrders(np.zeros(0, np.int64), np.zeros(0))
+        last, orders.last_action_ms = orders.last_action_ms, time_ms
+        if last is not None and time_ms - last < self.settle_ms:
+            return
+        # antes desta ação: alvo das pools do símbolo sem a mudança dela
+        expected = self._expected(pool.symbol) - change
+        recorded = orders.at(time_ms)
+        if abs(expected - recorded) * price > self.position_tolerance_usd:
+            if not orders.diverged:
+                orders.diverged = True
+                self._diverge(None, Divergence(
+                    "position", time_ms, pool.symbol, price, round(recorded, 12), round(expected, 12),
+                ))
+        else:
+            orders.diverged = False
+
+    def _expected(self, symbol: str) -> float:
+        return sum(p.target for p in self._by_symbol[symbol])
+
+    def _diverge(self, pool: Optional[_PoolReplay], divergence: Divergence) -> None:
+        report = self.report
+        report.counts[divergence.kind] += 1
+        if pool is not None and pool.first is None:
+            pool.first = divergence
+        if len(report.divergences) < self.max_divergences:
+            report.divergences.append(divergence)
+
+    def finish(self) -> ReplayReport:
+        """Fecha o relatório: resumo por pool e posição final por símbolo."""
+        report = self.report
+        for pool in self._pools.values():
+            report.pools[pool.pool_id] = {
+                "symbol": pool.symbol,
+                "ticks": pool.ticks,
+                "recorded": pool.recorded,
+                "simulated": pool.simulated,
+                "target_qty": round(pool.target, 12),
+                "first_divergence": pool.first,
+            }
+        if self._orders is None:
+            return report
+        for symbol in self._by_symbol:
+            orders = self._orders.get(symbol)
+            recorded = float(orders.position[-1]) if orders is not None and len(orders.position) else 0.0
+            expected = self._expected(symbol)
+            report.final_positions[symbol] = {
+                "recorded_qty": round(recorded, 12),
+                "simulated_qty": round(expected, 12),
+                "drift": round(recorded - expected, 12),
+            }
+        return report
@@ -1,11 +1,17 @@
 # core/hedge_state_machine.py
-import math, copy
+import math
+from collections import deque
 from datetime import datetime
-from typing import List, Optional
+from typing import Optional, Tuple
 
-from scipy.optimize import minimize_scalar
+from core.lp_curve import LPCurve
+from core.ports import ResultSink, StateJournal
+from core.short_block_ledger import ShortBlockLedger
 from entities.hedge_result_entity import HedgeResult
 
+# resultados guardados em memória quando nenhum store é injetado
+DEFAULT_HISTORY = 10_000
+
 
 class HedgeStateMachine:
     """
@@ -20,8 +26,20 @@ class HedgeStateMachine:
     Ações emitidas:  hold | open | increase | decrease | close
     (A executora trata todas da mesma forma: open/ increase => open_short,
      decrease/close => reduce_short)
+
+    Banda de gatilho: após cada avaliação completa guarda-se o intervalo de
+    preço (_trigger_lo, _trigger_hi) em que nenhum ramo pode disparar.
+    Ticks dentro dele só acumulam fee: `on_new_price` devolve um resultado
+    `hold` montado com o estado da LP no preço e o snapshot em cache do
+    ledger, sem passar pela lógica de transição nem recalcular a banda.
+
+    Com um StateJournal (core/ports.py), o estado é restaurado do disco na construção
+    e cada transição (âncora, ações, fee) é registrada nele.
     """
 
+    # margem relativa aplicada à banda (absorve arredondamento da inversa)
+    TRIGGER_EPS = 1e-9
+
     # --------------------------------------------------------------
     def __init__(
         self,
@@ -30,6 +48,8 @@ class HedgeStateMachine:
         max_price: float,
         total_usd_target: float,
         fee_apr_percent: float = 0.0,
+        result_store: Optional[ResultSink] = None,
+        journal: Optional[StateJournal] = None,
     ):
         # parâmetros fixos da pool
         self.qty_token1 = qty_token1
@@ -42,7 +62,7 @@ class HedgeStateMachine:
         self.mode: Optional[str] = None            # None | 'down' | 'up'
         self.price_reference: Optional[float] = None
         self.value_token1_ref: Optional[float] = None
-        self.short_blocks: List[dict] = []
+        self.short_blocks = ShortBlockLedger()
         self.last_v1_for_delta: Optional[float] = None
         self._last_decrease_usd: float  = 0.0
         self._pending_close_usd: float = 0.0
@@ -50,42 +70,89 @@ class HedgeStateMachine:
         # fee/ métricas
         self.accumulated_fee = 0.0
         self.initial_total   = None
-        self.results = []
+        # histórico: o store injetado pelo serviço, ou um deque limitado
+        self.results: ResultSink = deque(maxlen=DEFAULT_HISTORY) if result_store is None else result_store
 
         # pré-cálculos da curva
-        self.sqrt_Pa = math.sqrt(self.min_price)
-        self.sqrt_Pb = math.sqrt(self.max_price)
+        self.curve   = LPCurve(self.min_price, self.max_price)
+        self.sqrt_Pa = self.curve.sqrt_Pa
+        self.sqrt_Pb = self.curve.sqrt_Pb
         self.sqrt_P  = None
-        self.L       = None                       # liquidez ajustada (solver)
+        self.L       = None                       # liquidez ajustada (forma fechada)
+
+        # estado da LP (e campos arredondados) no último preço avaliado
+        self._lp_price: Optional[float] = None
+        self._lp_cache: Optional[Tuple[Tuple[float, ...], Tuple[float, ...]]] = None
+
+        # banda de gatilho (vazia até a primeira avaliação)
+        self._trigger_lo = math.inf
+        self._trigger_hi = -math.inf
+        self._trigger_threshold: Optional[float] = None
+
+        # journal de estado (warm restart); a banda é recalculada no 1º tick
+        self.journal: Optional[StateJournal] = None
+        if journal is not None:
+            journal.attach(self)
 
     # ---------------- helpers -------------------------------------
     def _solve_liquidity(self, price: float) -> float:
         """Resolve L para que total USD da pool = target."""
-        sqrt_P = math.sqrt(price)
+        return self.curve.solve_liquidity(price, self.total_usd_target)
 
-        def err(L):
-            t1 = L * (1/ sqrt_P - 1/ self.sqrt_Pb)
-            t2 = L * (sqrt_P - self.sqrt_Pa)
-            return abs(t1*price + t2 - self.total_usd_target)
+    def _lp_state(self, price: float):
+        return self.curve.state(self.L, price)
 
-        res = minimize_scalar(err, bounds=(1e-8, 1e8), method="bounded")
-        return res.x
+    def _anchor(self, close_price: float) -> None:
+        """Primeira chamada → salva referência e resolve L."""
+        self.price_reference  = close_price
+        self.sqrt_P = math.sqrt(close_price)
+        self.L      = self._solve_liquidity(close_price)
+        _, _, self.value_token1_ref, _, _ = self._lp_state(close_price)
+        self._lp_price = None
 
-    def _lp_state(self, price: float):
-        sqrt_P = math.sqrt(price)
-        if price <= self.min_price:
-            t1 = self.L * (1/ self.sqrt_Pa - 1/ self.sqrt_Pb)
-            t2 = 0
-        elif price >= self.max_price:
-            t1 = 0
-            t2 = self.L * (self.sqrt_Pb - self.sqrt_Pa)
+    def _delta_v1(self, v1_usd: float) -> float:
+        """delta_total reportado no resultado (antes da transição)."""
+        if self.mode is None:
+            return v1_usd - self.value_token1_ref
+        if self.mode == "down":
+            return v1_usd - self.last_v1_for_delta
+        return 0
+
+    def _update_trigger_band(self, rebalance_threshold_usd: float) -> None:
+        """
+        Recalcula a faixa de preço em que o próximo tick é certamente `hold`.
+
+        Em v1 (Token1 USD) a região sem ação é:
+          • sem hedge ...  (ref − thr, ref + thr)
+          • down / up ...  (min(last, short) − thr, max(last, short) + thr)
+        e, com blocos abertos, o preço não pode cruzar `price_reference`.
+        Como v1 é decrescente no range, basta inverter os extremos; fora de
+        [min_price, max_price] sempre cai na avaliação completa.
+        """
+        self._trigger_threshold = rebalance_threshold_usd
+        if not self.curve.value1_monotonic:
+            self._trigger_lo, self._trigger_hi = math.inf, -math.inf
+            return
+
+        thr = rebalance_threshold_usd
+        if self.mode is None:
+            v_lo = self.value_token1_ref - thr
+            v_hi = self.value_token1_ref + thr
         else:
-            t1 = self.L * (1/ sqrt_P - 1/ self.sqrt_Pb)
-            t2 = self.L * (sqrt_P - self.sqrt_Pa)
+            short_value = self.short_blocks.total_value
+            v_lo = min(self.last_v1_for_delta, short_value) - thr
+            v_hi = max(self.last_v1_for_delta, short_value) + thr
 
-        v1 = t1 * price
-        v2 = t2
-        return t1, t2, v1, v2, v1 + v2
+        lo = self.curve.price_for_value1(self.L, v_hi)
+        hi = self.curve.price_for_value1(self.L, v_lo)
+        if self.short_blocks:
+            if self.mode == "down":
+                hi = min(hi, self.price_reference)
+            elif self.mode == "up":
+                lo = max(lo, self.price_reference)
+
+        self._trigger_lo = lo * (1 + self.TRIGGER_EPS)
+        self._trigger_hi = hi * (1 - self.TRIGGER_EPS)
 
     # ---------------- main ----------------------------------------
     async def on_new_price(
@@ -95,29 +162,100 @@ class HedgeStateMachine:
         rebalance_threshold_usd: float,
         hedge_interval: int,
     ) -> HedgeResult:
+        """
+        Processa um tick. Dentro da banda de gatilho o resultado é um `hold`
+        barato: só a fee foi acumulada e nenhuma transição foi avaliada.
+        """
+        step = self._advance(close_price, rebalance_threshold_usd, hedge_interval)
+        if step is None:
+            # mesmos valores que o backtest grava para o tick dentro da banda
+            lp, fields = self._lp_at(close_price)
+            delta_v1, pnl_total, action = self._delta_v1(lp[2]), self.short_blocks.pnl(close_price), "hold"
+        else:
+            lp, delta_v1, pnl_total, action = step
+            lp, fields = self._lp_at(close_price, lp)
+        total_usd = lp[4]
+        t1_r, t2_r, v1_r, v2_r, total_r = fields
+
+        # 3) resultado ------------------------------------------------
+        short_value  = self.short_blocks.total_value
+        total_accum  = total_usd + pnl_total
+        total_with_f = total_accum + self.accumulated_fee
+
+        res = HedgeResult(
+            time=timestamp,
+            close=close_price,
+            quantity_token1=t1_r,
+            quantity_token2=t2_r,
+            value_token1_usd=v1_r,
+            value_token2_usd=v2_r,
+            total_value_usd=total_r,
+            delta_total=round(delta_v1, 2),
+            accumulated_fee=round(self.accumulated_fee, 3),
+            short_action=action,
+            short_value_usd=round(short_value, 2),
+            short_pnl_usd=round(pnl_total, 2),
+            total_accumulated=round(total_accum, 2),
+            total_accumulated_with_fee=round(total_with_f, 2),
+            short_blocks=self.short_blocks.snapshot(),
+        )
+        self.results.append(res)
+        return res
+
+    def _lp_at(self, close_price: float, lp=None):
+        """(estado da LP, campos arredondados do resultado) no preço; preço repetido sai do cache."""
+        if close_price != self._lp_price:
+            if lp is None:
+                lp = self._lp_state(close_price)
+            t1, t2, v1_usd, v2_usd, total_usd = lp
+            self._lp_price = close_price
+            self._lp_cache = (
+                lp,
+                (round(t1, 4), round(t2, 4), round(v1_usd, 2), round(v2_usd, 2), round(total_usd, 2)),
+            )
+        return self._lp_cache
+
+    def _advance(
+        self,
+        close_price: float,
+        rebalance_threshold_usd: float,
+        hedge_interval: int,
+        lp_state: Optional[Tuple[float, float, float, float, float]] = None,
+    ):
+        """
+        Núcleo síncrono de `on_new_price` (sem construir HedgeResult).
+
+        Compartilhado pelo live e pelo backtest para garantir ações
+        idênticas. `lp_state` permite passar o estado da curva já
+        calculado em lote (LPCurve.state_array).
+
+        Retorna ((t1, t2, v1, v2, total), delta_v1, pnl_total, action), ou
+        None se o preço caiu dentro da banda de gatilho.
+        """
+        # atalho: dentro da banda nenhum ramo dispara → só fee
+        if (
+            self._trigger_lo < close_price < self._trigger_hi
+            and rebalance_threshold_usd == self._trigger_threshold
+        ):
+            self._accrue_fee(hedge_interval)
+            return None
 
         # 0) primeira chamada → salva referência
-        if self.price_reference is None:
-            self.price_reference  = close_price
-            self.sqrt_P = math.sqrt(close_price)
-            self.L      = self._solve_liquidity(close_price)
-            _, _, self.value_token1_ref, _, _ = self._lp_state(close_price)
+        anchored = self.price_reference is None
+        if anchored:
+            self._anchor(close_price)
 
         # 1) estado atual
-        t1, t2, v1_usd, v2_usd, total_usd = self._lp_state(close_price)
+        if lp_state is None:
+            lp_state = self._lp_state(close_price)
+        t1, t2, v1_usd, v2_usd, total_usd = lp_state
         if self.initial_total is None:
             self.initial_total = total_usd
 
-        # fee proporcional ao passo
-        if self.fee_apr_percent > 0:
-            step_factor = (self.fee_apr_percent / 100) / (525600 * 60 / hedge_interval)
-            self.accumulated_fee += self.initial_total * step_factor
+        self._accrue_fee(hedge_interval)
 
         action = "hold"
-        pnl_total = sum(
-            blk["value"] * ((blk["price"] - close_price) / blk["price"])
-            for blk in self.short_blocks
-        )
+        pnl_total = self.short_blocks.pnl(close_price)
 
         # 2) lógica de transição de estado --------------------------
         delta_v1 = 0
@@ -128,13 +266,15 @@ class HedgeStateMachine:
             # preço CAIU → Token1 USD aumentou
             if   v1_usd - self.value_token1_ref >= rebalance_threshold_usd:
                 self.mode = "down"
-                self.short_blocks = [{"price": close_price, "value": v1_usd}]
+                self.short_blocks.clear()
+                self.short_blocks.add(close_price, v1_usd)
                 self.last_v1_for_delta = v1_usd
                 action = "open"
             # preço SUBIU → Token1 USD diminuiu
             elif self.value_token1_ref - v1_usd >= rebalance_threshold_usd:
                 self.mode = "up"
-                self.short_blocks = [{"price": close_price, "value": v1_usd}]
+                self.short_blocks.clear()
+                self.short_blocks.add(close_price, v1_usd)
                 self.last_v1_for_delta = v1_usd
                 action = "open"
 
@@ -144,97 +284,62 @@ class HedgeStateMachine:
 
             # Se preço voltou para cima do reference → fecha tudo
             if close_price >= self.price_reference and self.short_blocks:
-                self._pending_close_usd = sum(b["value"] for b in self.short_blocks)
-                self.short_blocks.clear()
+                self._pending_close_usd = self.short_blocks.clear()
                 self.mode = None
                 action = "close"
             else:
                 delta = v1_usd - self.last_v1_for_delta
                 if delta >= rebalance_threshold_usd:
                     # increase
-                    added = v1_usd - sum(b["value"] for b in self.short_blocks)
+                    added = v1_usd - self.short_blocks.total_value
                     if added > rebalance_threshold_usd:
-                        self.short_blocks.append({"price": close_price, "value": added})
+                        self.short_blocks.add(close_price, added)
                         self.last_v1_for_delta = v1_usd
                         action = "increase"
                 elif delta <= -rebalance_threshold_usd:
                     # decrease
-                    reduction_needed = sum(b["value"] for b in self.short_blocks) - v1_usd
+                    reduction_needed = self.short_blocks.total_value - v1_usd
                     if reduction_needed > rebalance_threshold_usd:
                         self._last_decrease_usd = reduction_needed
                         self.last_v1_for_delta = v1_usd
                         action = "decrease"
-                        new_blocks = []
-                        for blk in reversed(self.short_blocks):
-                            if reduction_needed <= 0:
-                                new_blocks.insert(0, blk)
-                                continue
-                            if blk["value"] <= reduction_needed:
-                                reduction_needed -= blk["value"]
-                            else:
-                                blk["value"] -= reduction_needed
-                                reduction_needed = 0
-                                new_blocks.insert(0, blk)
-                        self.short_blocks = new_blocks
+                        self.short_blocks.reduce_lifo(reduction_needed)
 
         # --- hedge-UP ativo ----------------------------------------
         elif self.mode == "up":
             # Se preço voltou para baixo do reference → fecha tudo
             if close_price <= self.price_reference and self.short_blocks:
-                self._pending_close_usd = sum(b["value"] for b in self.short_blocks)
-                self.short_blocks.clear()
+                self._pending_close_usd = self.short_blocks.clear()
                 self.mode = None
                 action = "close"
             else:
                 delta = self.last_v1_for_delta - v1_usd  # invertido!
                 if delta >= rebalance_threshold_usd:
                     # DECREASE (token1 desceu → precisamos reduzir short)
-                    reduction_needed = sum(b["value"] for b in self.short_blocks) - v1_usd
+                    reduction_needed = self.short_blocks.total_value - v1_usd
                     if reduction_needed > rebalance_threshold_usd:
                         self._last_decrease_usd = reduction_needed
                         self.last_v1_for_delta = v1_usd
                         action = "decrease"
-                        new_blocks = []
-                        for blk in reversed(self.short_blocks):
-                            if reduction_needed <= 0:
-                                new_blocks.insert(0, blk)
-                                continue
-                            if blk["value"] <= reduction_needed:
-                                reduction_needed -= blk["value"]
-                            else:
-                                blk["value"] -= reduction_needed
-                                reduction_needed = 0
-                                new_blocks.insert(0, blk)
-                        self.short_blocks = new_blocks
+                        self.short_blocks.reduce_lifo(reduction_needed)
                 elif delta <= -rebalance_threshold_usd:
                     # INCREASE (token1 subiu de volta)
-                    added = v1_usd - sum(b["value"] for b in self.short_blocks)
+                    added = v1_usd - self.short_blocks.total_value
                     if added > rebalance_threshold_usd:
-                        self.short_blocks.append({"price": close_price, "value": added})
+                        self.short_blocks.add(close_price, added)
                         self.last_v1_for_delta = v1_usd
                         action = "increase"
 
-        # 3) resultado ------------------------------------------------
-        short_value  = sum(b["value"] for b in self.short_blocks)
-        total_accum  = total_usd + pnl_total
-        total_with_f = total_accum + self.accumulated_fee
+        if self.journal is not None and (anchored or action != "hold"):
+            self.journal.commit()
 
-        res = HedgeResult(
-            time=timestamp,
-            close=close_price,
-            quantity_token1=round(t1, 4),
-            quantity_token2=round(t2, 4),
-            value_token1_usd=round(v1_usd, 2),
-            value_token2_usd=round(v2_usd, 2),
-            total_value_usd=round(total_usd, 2),
-            delta_total=round(delta_v1, 2),
-            accumulated_fee=round(self.accumulated_fee, 3),
-            short_action=action,
-            short_value_usd=round(short_value, 2),
-            short_pnl_usd=round(pnl_total, 2),
-            total_accumulated=round(total_accum, 2),
-            total_accumulated_with_fee=round(total_with_f, 2),
-            short_blocks=copy.deepcopy(self.short_blocks),
-        )
-        self.results.append(res)
-        return res
+        self._update_trigger_band(rebalance_threshold_usd)
+        return lp_state, delta_v1, pnl_total, action
+
+    def _accrue_fee(self, hedge_interval: int) -> None:
+        """Fee proporcional ao passo."""
+        if self.fee_apr_percent > 0:
+            step_factor = (self.fee_apr_percent / 100) / (525600 * 60 / hedge_interval)
+            self.accumulated_fee += self.initial_total * step_factor
+            if self.journal is not None:
+                self.journal.fee(self.accumulated_fee)
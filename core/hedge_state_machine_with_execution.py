@@ -1,27 +1,93 @@
 # core/hedge_state_machine_with_execution.py
 import asyncio
+import math
+import time
 from datetime import datetime
+from typing import Optional
 
-from adapters.binance_short_manager import BinanceShortManager
 from core.hedge_state_machine import HedgeStateMachine
+from core.ports import (
+    PRIORITY_CLOSE, PRIORITY_OPEN, PRIORITY_REDUCE,
+    OrderExecutor, ResultSink, StateJournal, SymbolFilterSource,
+)
 from entities.hedge_config_entity import HedgeConfig
+from entities.symbol_filters_entity import SymbolFilters
+from infrastructure.broadcaster import broadcaster
 from infrastructure.logger_config import trade_logger
+from infrastructure.metrics import metrics
 from entities.hedge_result_entity import HedgeResult
 
 
 class HedgeStateMachineWithExecution(HedgeStateMachine):
-    def __init__(self, binance_manager: BinanceShortManager, config: HedgeConfig):
+    def __init__(
+        self,
+        binance_manager: OrderExecutor,
+        config: HedgeConfig,
+        result_store: Optional[ResultSink] = None,
+        journal: Optional[StateJournal] = None,
+        symbol_filters: Optional[SymbolFilterSource] = None,
+    ):
+        # posição em contratos: alvo (o que o ledger pediu) × executada.
+        # A diferença é o carry — resto abaixo do step, ordens abaixo do
+        # mínimo ou não executadas — e entra na próxima ordem (ou sai num
+        # hold, quando negociável: action "carry" no payload). O journal
+        # restaura as duas num warm restart (no super().__init__).
+        self._target_qty: Optional[float] = None
+        self._position_qty: Optional[float] = None
         super().__init__(
             qty_token1=config.qty_token1,
             min_price=config.min_price,
             max_price=config.max_price,
             total_usd_target=config.total_usd_target,
             fee_apr_percent=config.fee_apr_percent,
+            result_store=result_store,
+            journal=journal,
         )
         self.symbol = config.symbol
+        self.pool_id = config.pool_id or config.symbol.lower()
         self.manager = binance_manager
+        self.symbol_filters = symbol_filters
+        # casas decimais quando o símbolo não tem filtros em cache
         self.price_precision = 1
         self._execution_lock = asyncio.Lock()
+        self.timers = metrics.timers(self.pool_id, self.symbol)
+
+        # sem estado salvo (ou journal da versão 1): contratos do ledger
+        if self._target_qty is None:
+            self._target_qty = self.short_blocks.quantity
+        if self._position_qty is None:
+            self._position_qty = self._target_qty
+        self.last_price: Optional[float] = None
+
+    @property
+    def qty_carry(self) -> float:
+        """Contratos pendentes: > 0 falta vender, < 0 falta recomprar."""
+        return self._target_qty - self._position_qty
+
+    @property
+    def target_qty(self) -> float:
+        return self._target_qty
+
+    @property
+    def position_qty(self) -> float:
+        return self._position_qty
+
+    @property
+    def execution_lock(self) -> asyncio.Lock:
+        return self._execution_lock
+
+    def realign(self, position_qty: float) -> None:
+        """
+        Posição executada vinda da reconciliação com a exchange (ver
+        services/position_reconciler.py); chamar com o lock de execução.
+        """
+        self._position_qty = position_qty
+        if self.journal is not None:
+            self.journal.commit()
+
+    def _filters(self) -> SymbolFilters:
+        cached = self.symbol_filters.get(self.symbol) if self.symbol_filters else None
+        return cached or SymbolFilters.default(self.symbol, self.price_precision)
 
     async def on_new_price_and_execute(
         self,
@@ -29,52 +95,129 @@ class HedgeStateMachineWithExecution(HedgeStateMachine):
         timestamp: datetime,
         rebalance_threshold_usd: float,
         hedge_interval: int,
+        received_at: Optional[float] = None,
     ) -> HedgeResult:
+        """
+        `received_at` (perf_counter na recepção do tick) habilita a métrica
+        end_to_end: recepção → decisão (hold) ou recepção → ack da ordem.
+        """
         async with self._execution_lock:
+            self.last_price = close_price
+            t0 = time.perf_counter()
             result = await super().on_new_price(
                 close_price,
                 timestamp,
                 rebalance_threshold_usd,
                 hedge_interval,
             )
+            t1 = time.perf_counter()
+            self.timers.observe("on_new_price", t1 - t0)
 
             act = result.short_action
             if act == "hold":
-                return result  # nada a fazer
+                # inclui os ticks dentro da banda de gatilho; um carry adiado
+                # (fila cheia, abaixo do mínimo, ordem com erro) sai sozinho
+                # assim que for negociável e admitido
+                if self._target_qty == self._position_qty:
+                    if received_at is not None:
+                        self.timers.observe("end_to_end", t1 - received_at)
+                    return result
+                act = "carry"
 
-            # cálculo único de qty de acordo com a ação -------------------------
-            if act == "open":
-                qty = round(result.short_value_usd / close_price, self.price_precision)
+            # posição alvo de acordo com a ação -------------------------------
+            elif act == "open":
+                self._target_qty = result.short_value_usd / close_price
 
             elif act == "increase":
-                qty = round(result.short_blocks[-1]["value"] / close_price, self.price_precision)
+                self._target_qty += self.short_blocks.last_value / close_price
 
             elif act == "decrease":
-                qty = round(self._last_decrease_usd / close_price, self.price_precision)
+                self._target_qty -= self._last_decrease_usd / close_price
 
             elif act == "close":
-                qty = round(self._pending_close_usd / close_price, self.price_precision)
+                self._target_qty = 0.0
                 self._pending_close_usd = 0.0
 
+            # ordem = alvo − executado, truncada no step do símbolo; o que
+            # sobra (ou uma ordem abaixo de minQty / minNotional) fica no carry
+            filters = self._filters()
+            order_qty = filters.floor_qty(self._target_qty - self._position_qty)
+            sell = order_qty > 0
+            qty = abs(order_qty)
+            if not filters.tradable(qty, close_price, reduce=not sell):
+                qty = 0.0
+
+            # fechamentos e recompras maiores passam na frente na fila de
+            # ordens; aberturas esperam no carry enquanto ela estiver cheia
+            priority = PRIORITY_OPEN if sell else (PRIORITY_CLOSE if act == "close" else PRIORITY_REDUCE)
+            if qty > 0 and not self.manager.admits(priority):
+                qty = 0.0
+
+            if act == "carry" and qty == 0:
+                if received_at is not None:
+                    self.timers.observe("end_to_end", time.perf_counter() - received_at)
+                return result
+
+            t2 = time.perf_counter()
+            self.timers.observe("qty", t2 - t1)
+
             payload = {
                 "action": act,
                 "symbol": self.symbol,
                 "qty": qty,
                 "price": close_price,
-                "short_blocks": result.short_blocks,
+                "carry": round(self.qty_carry - math.copysign(qty, order_qty), 12),
+                "short_blocks": result.to_dict()["short_blocks"],
                 "timestamp": timestamp.isoformat(),
             }
 
             try:
-                if qty and qty > 0:
-                    if act in {"open", "increase"}:
-                        await self.manager.open_short(symbol=self.symbol, quantity=qty)
-                    elif act in {"decrease", "close"}:
-                        await self.manager.reduce_short(symbol=self.symbol, quantity=qty)
+                if qty > 0:
+                    notional = qty * close_price
+                    if sell:
+                        order = await self.manager.open_short(
+                            symbol=self.symbol, quantity=qty, priority=priority, notional=notional,
+                        )
+                    else:
+                        order = await self.manager.reduce_short(
+                            symbol=self.symbol, quantity=qty, priority=priority, notional=notional,
+                        )
+                    t3 = time.perf_counter()
+                    self.timers.observe("order_ack", t3 - t2)
+                    if received_at is not None:
+                        self.timers.observe("end_to_end", t3 - received_at)
+                    self._apply_fill(act, qty, sell, order, close_price, payload)
+                    broadcaster.publish(self.pool_id, "order", payload)
 
             except Exception as e:
+                # a posição executada não mudou: a quantidade segue no carry
                 payload["error"] = str(e)
                 payload["message"] = "Necessário intervenção manual."
                 trade_logger.error(payload)
+                broadcaster.publish(self.pool_id, "order", payload)
 
+            # alvo e posição executada (carry) após a ordem
+            if self.journal is not None:
+                self.journal.commit()
             return result
+
+    def _apply_fill(self, act: str, qty: float, sell: bool, order: dict, close_price: float, payload: dict):
+        """
+        Atualiza a posição executada e ajusta o ledger quando a ordem (ou a
+        parte rateada dela, no netting) não foi executada por inteiro.
+        """
+        filled = float(order.get("executedQty", qty)) if order else qty
+        self._position_qty += filled if sell else -filled
+        payload["executed_qty"] = filled
+        shortfall = qty - filled
+        if shortfall <= 1e-12:
+            return
+
+        if sell and act in {"open", "increase"}:
+            # o short real é menor → remove o excesso do bloco mais novo
+            self.short_blocks.reduce_lifo(shortfall * close_price)
+            self._target_qty -= shortfall
+            payload["message"] = "Execução parcial: ledger ajustado."
+        else:
+            payload["message"] = "Execução parcial: diferença segue no carry."
+        trade_logger.warning(payload)
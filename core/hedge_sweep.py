@@ -0,0 +1,191 @@
+# core/hedge_sweep.py
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.hedge_backtest import run_backtest
+from entities.hedge_config_entity import HedgeConfig
+
+SWEEP_PARAMS = (
+    "min_price", "max_price", "rebalance_threshold_usd",
+    "fee_apr_percent", "hedge_interval",
+)
+
+
+@dataclass(frozen=True)
+class SweepVariant:
+    config: HedgeConfig
+    hedge_interval: int = 60
+
+
+@dataclass(frozen=True)
+class SweepRow:
+    index: int
+    final_total_with_fee: float
+    orders: int
+    max_drawdown_usd: float
+    max_drawdown_pct: float
+
+
+# ---------------- geração de variantes ----------------------------
+# tentativas por variante em random_variants antes de desistir do range
+_MAX_DRAWS = 1_000
+
+
+def _valid_range(config: HedgeConfig, price: Optional[float] = None) -> bool:
+    """min < max e, com `price`, o preço de âncora dentro do range."""
+    if not 0 < config.min_price < config.max_price:
+        return False
+    return price is None or config.min_price <= price <= config.max_price
+
+
+def _variant(base: HedgeConfig, base_interval: int, params: Dict) -> SweepVariant:
+    params = dict(params)
+    interval = params.pop("hedge_interval", base_interval)
+    return SweepVariant(config=replace(base, **params), hedge_interval=int(interval))
+
+
+def grid_variants(
+    base: HedgeConfig,
+    base_interval: int = 60,
+    **grid: Sequence,
+) -> List[SweepVariant]:
+    """
+    Produto cartesiano: grid_variants(cfg, min_price=[...], hedge_interval=[...]).
+    Combinações com min_price >= max_price ficam de fora.
+    """
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Parâmetros não suportados no sweep: {sorted(unknown)}")
+    names = list(grid)
+    variants = (
+        _variant(base, base_interval, dict(zip(names, values)))
+        for values in itertools.product(*(grid[n] for n in names))
+    )
+    return [v for v in variants if _valid_range(v.config)]
+
+
+def random_variants(
+    base: HedgeConfig,
+    n: int,
+    base_interval: int = 60,
+    seed: Optional[int] = None,
+    **ranges: Tuple[float, float],
+) -> List[SweepVariant]:
+    """
+    Amostra uniforme: random_variants(cfg, 500, rebalance_threshold_usd=(1, 20)).
+    Sorteios com min_price >= max_price são refeitos.
+    """
+    unknown = set(ranges) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Parâmetros não suportados no sweep: {sorted(unknown)}")
+    rng = random.Random(seed)
+    variants = []
+    for _ in range(n):
+        for _ in range(_MAX_DRAWS):
+            variant = _variant(base, base_interval, {k: rng.uniform(lo, hi) for k, (lo, hi) in ranges.items()})
+            if _valid_range(variant.config):
+                break
+        else:
+            raise ValueError(f"Nenhum range válido (min_price < max_price) em {_MAX_DRAWS} sorteios")
+        variants.append(variant)
+    return variants
+
+
+# ---------------- worker ------------------------------------------
+_shm: Optional[shared_memory.SharedMemory] = None
+_close: Optional[np.ndarray] = None
+
+
+def _attach(shm_name: str, length: int) -> None:
+    """Initializer do worker: mapeia o array de preços sem copiá-lo."""
+    global _shm, _close
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _close = np.ndarray((length,), dtype=np.float64, buffer=_shm.buf)
+
+
+def _evaluate(batch: List[Tuple[int, SweepVariant]]) -> List[SweepRow]:
+    rows = []
+    for index, variant in batch:
+        res = run_backtest(variant.config, _close, hedge_interval=variant.hedge_interval)
+        equity = res["total_accumulated_with_fee"]
+        if len(equity):
+            peak = np.maximum.accumulate(equity)
+            drawdown = peak - equity
+            worst = int(np.argmax(drawdown))
+            dd_usd = float(drawdown[worst])
+            dd_pct = float(drawdown[worst] / peak[worst] * 100) if peak[worst] else 0.0
+            final = float(equity[-1])
+        else:
+            dd_usd = dd_pct = final = 0.0
+        rows.append(SweepRow(
+            index=index,
+            final_total_with_fee=final,
+            orders=len(res.order_indices()),
+            max_drawdown_usd=dd_usd,
+            max_drawdown_pct=dd_pct,
+        ))
+    return rows
+
+
+# ---------------- runner ------------------------------------------
+def run_sweep(
+    variants: Iterable[SweepVariant],
+    close: np.ndarray,
+    processes: Optional[int] = None,
+    batch_size: int = 8,
+):
+    """
+    Roda um backtest por variante num pool de processos e devolve um
+    DataFrame ordenado pelo `final_total_with_fee` (maior primeiro).
+
+    O histórico de preços vai para um bloco de shared memory criado uma
+    única vez; cada worker só recebe o nome do bloco, nunca o array.
+    As variantes seguem em lotes para amortizar o IPC por tarefa.
+    Variantes cujo range não contém o primeiro preço (a âncora) não são
+    avaliadas e ficam fora da tabela.
+    """
+    import pandas as pd
+
+    variants = list(variants)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    processes = processes or os.cpu_count() or 1
+
+    shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    try:
+        np.ndarray(close.shape, dtype=np.float64, buffer=shm.buf)[:] = close
+        anchor = float(close[0]) if len(close) else None
+        indexed = [(i, v) for i, v in enumerate(variants) if _valid_range(v.config, anchor)]
+        batches = [indexed[i:i + batch_size] for i in range(0, len(indexed), batch_size)]
+        rows: List[SweepRow] = []
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_attach,
+            initargs=(shm.name, len(close)),
+        ) as pool:
+            for batch_rows in pool.map(_evaluate, batches):
+                rows.extend(batch_rows)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    table = pd.DataFrame([
+        {
+            **{p: getattr(variants[r.index].config, p) for p in SWEEP_PARAMS if p != "hedge_interval"},
+            "hedge_interval": variants[r.index].hedge_interval,
+            "final_total_with_fee": r.final_total_with_fee,
+            "orders": r.orders,
+            "max_drawdown_usd": r.max_drawdown_usd,
+            "max_drawdown_pct": r.max_drawdown_pct,
+        }
+        for r in rows
+    ])
+    if table.empty:
+        return table
+    return table.sort_values("final_total_with_fee", ascending=False, ignore_index=True)
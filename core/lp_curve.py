@@ -0,0 +1,94 @@
+# core/lp_curve.py
+import math
+from typing import TYPE_CHECKING, NamedTuple, Tuple
+
+if TYPE_CHECKING:  # numpy só é carregado no caminho vetorizado (backtest)
+    import numpy as np
+
+
+class LPStateArrays(NamedTuple):
+    t1: "np.ndarray"
+    t2: "np.ndarray"
+    v1: "np.ndarray"
+    v2: "np.ndarray"
+    total: "np.ndarray"
+
+
+class LPCurve:
+    """
+    Matemática da liquidez concentrada (Uniswap v3) para o range [Pa, Pb].
+
+    • solve_liquidity ...  L em forma fechada p/ total USD = target
+    • state .............  (t1, t2, v1, v2, total) para um preço escalar
+    • state_array .......  mesmo cálculo, vetorizado sobre um array de preços
+    • price_for_value1 ..  inversa de v1(P) dentro do range
+
+    Fora do range o preço é "travado" em Pa/Pb: abaixo de Pa a pool fica
+    toda em Token1, acima de Pb toda em Token2.
+    """
+
+    def __init__(self, min_price: float, max_price: float):
+        if not 0 < min_price < max_price:
+            raise ValueError(f"Range inválido: min_price={min_price} max_price={max_price}")
+        self.min_price = min_price
+        self.max_price = max_price
+        self.sqrt_Pa = math.sqrt(min_price)
+        self.sqrt_Pb = math.sqrt(max_price)
+
+    # ---------------- liquidez ------------------------------------
+    def solve_liquidity(self, price: float, total_usd_target: float) -> float:
+        """
+        total = L·(1/√P − 1/√Pb)·P + L·(√P − √Pa)  →  L = total / (…)
+        """
+        sqrt_P = math.sqrt(price)
+        usd_per_L = (1 / sqrt_P - 1 / self.sqrt_Pb) * price + (sqrt_P - self.sqrt_Pa)
+        return total_usd_target / usd_per_L
+
+    # ---------------- estado escalar ------------------------------
+    def state(self, L: float, price: float) -> Tuple[float, float, float, float, float]:
+        sqrt_P = math.sqrt(min(max(price, self.min_price), self.max_price))
+        t1 = L * (1 / sqrt_P - 1 / self.sqrt_Pb)
+        t2 = L * (sqrt_P - self.sqrt_Pa)
+
+        v1 = t1 * price
+        v2 = t2
+        return t1, t2, v1, v2, v1 + v2
+
+    # ---------------- estado vetorizado ---------------------------
+    def state_array(self, L: float, prices) -> LPStateArrays:
+        """
+        Avalia a curva sobre um array de preços numa única chamada.
+        Resultado idêntico (bit a bit) a `state` elemento a elemento.
+        """
+        import numpy as np
+
+        prices = np.asarray(prices, dtype=np.float64)
+        sqrt_P = np.sqrt(np.clip(prices, self.min_price, self.max_price))
+        t1 = L * (1 / sqrt_P - 1 / self.sqrt_Pb)
+        t2 = L * (sqrt_P - self.sqrt_Pa)
+
+        v1 = t1 * prices
+        v2 = t2
+        return LPStateArrays(t1, t2, v1, v2, v1 + v2)
+
+    # ---------------- inversa de v1 -------------------------------
+    @property
+    def value1_monotonic(self) -> bool:
+        """
+        v1(P) = L·(√P − P/√Pb) só é decrescente em todo o range se Pa > Pb/4
+        (o máximo de v1 fica em P = Pb/4).
+        """
+        return 4 * self.min_price > self.max_price
+
+    def price_for_value1(self, L: float, value1: float) -> float:
+        """
+        Preço dentro de [Pa, Pb] cujo v1 = value1 (ramo decrescente).
+        Valores acima de v1(Pa) devolvem Pa; abaixo de 0 devolvem Pb.
+        """
+        if value1 <= 0:
+            return self.max_price
+        disc = 1 - 4 * value1 / (L * self.sqrt_Pb)
+        if disc <= 0:
+            return self.min_price
+        sqrt_P = self.sqrt_Pb / 2 * (1 + math.sqrt(disc))
+        return min(max(sqrt_P * sqrt_P, self.min_price), self.max_price)
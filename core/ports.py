@@ -0,0 +1,69 @@
+# core/ports.py
+from typing import TYPE_CHECKING, Any, Dict, Optional, Protocol
+
+if TYPE_CHECKING:
+    from entities.hedge_result_entity import HedgeResult
+    from entities.symbol_filters_entity import SymbolFilters
+
+# prioridade da ordem na fila (menor sai primeiro); dentro da mesma classe,
+# a de maior notional (adapters/order_scheduler.py)
+PRIORITY_CLOSE = 0          # fechamento total do short
+PRIORITY_REDUCE = 1         # decrease / recompra
+PRIORITY_OPEN = 2           # open / increase
+
+
+class ResultSink(Protocol):
+    """
+    Destino dos HedgeResult da máquina de estados.
+
+    Implementação do serviço: adapters/hedge_result_store.py (ring buffer
+    colunar + spill em disco). Sem store, a máquina usa um deque limitado.
+    """
+
+    def append(self, result: "HedgeResult") -> None: ...
+
+
+class StateJournal(Protocol):
+    """
+    Registro das transições da máquina para o warm restart.
+
+    Implementação do serviço: adapters/hedge_state_journal.py. O ledger
+    chama os `ledger_*` antes de cada mutação; a máquina chama `fee` a cada
+    acúmulo (o journal decide quando gravar) e `commit` após cada transição.
+    """
+
+    def attach(self, machine) -> bool: ...
+
+    def fee(self, accumulated_fee: float) -> None: ...
+
+    def commit(self) -> None: ...
+
+    def ledger_add(self, price: float, value: float) -> None: ...
+
+    def ledger_clear(self) -> None: ...
+
+    def ledger_reduce(self, amount: float) -> None: ...
+
+
+class OrderExecutor(Protocol):
+    """
+    Envio das ordens do short. Implementações do serviço:
+    adapters/netting_order_executor.py na frente de adapters/order_scheduler.py.
+    `admits` diz se a fila aceita agora uma ordem da prioridade.
+    """
+
+    def admits(self, priority: int) -> bool: ...
+
+    async def open_short(
+        self, *, symbol: str, quantity: float, priority: int = PRIORITY_OPEN, notional: float = 0.0
+    ) -> Dict[str, Any]: ...
+
+    async def reduce_short(
+        self, *, symbol: str, quantity: float, priority: int = PRIORITY_REDUCE, notional: float = 0.0
+    ) -> Dict[str, Any]: ...
+
+
+class SymbolFilterSource(Protocol):
+    """Filtros de ordem por símbolo (adapters/binance_symbol_filters.py); None se desconhecido."""
+
+    def get(self, symbol: str) -> Optional["SymbolFilters"]: ...
@@ -0,0 +1,142 @@
+# core/short_block_ledger.py
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class ShortBlock(NamedTuple):
+    price: float
+    value: float
+
+
+class ShortBlockLedger:
+    """
+    Ledger compacto dos blocos de short (preço de entrada, notional USD).
+
+    Guarda os blocos em dois `array('d')` paralelos e mantém os totais
+    incrementalmente, então nenhuma operação por tick percorre os blocos:
+
+    • total_value ........  Σ value
+    • _value_over_price ..  Σ value / price   → pnl(c) = Σv − c·Σ(v/p)
+
+    A redução é LIFO (os blocos mais recentes saem primeiro) e só mexe no
+    fim dos arrays. `snapshot()` devolve uma tupla imutável que fica em
+    cache até a próxima mutação.
+
+    Com `journal` definido, cada mutação (add / clear / reduce_lifo) é
+    registrada nele para o warm restart (StateJournal, core/ports.py).
+    """
+
+    __slots__ = (
+        "_prices", "_values", "total_value", "_value_over_price",
+        "_snapshot", "_dicts", "journal",
+    )
+
+    def __init__(self, blocks=()):
+        self._prices = array("d")
+        self._values = array("d")
+        self.total_value = 0.0
+        self._value_over_price = 0.0
+        self._snapshot: Optional[Tuple[ShortBlock, ...]] = None
+        self._dicts: Optional[List[Dict[str, float]]] = None
+        self.journal = None
+        for blk in blocks:
+            self.add(blk["price"], blk["value"])
+
+    # ---------------- leitura ------------------------------------
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __bool__(self) -> bool:
+        return len(self._values) > 0
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    @property
+    def last_value(self) -> float:
+        return self._values[-1]
+
+    @property
+    def quantity(self) -> float:
+        """Contratos em aberto: Σ value / price."""
+        return self._value_over_price
+
+    def pnl(self, close_price: float) -> float:
+        """PnL do short: Σ value · (price − close) / price."""
+        if not self._values:
+            return 0.0
+        return self.total_value - close_price * self._value_over_price
+
+    def snapshot(self) -> Tuple[ShortBlock, ...]:
+        if self._snapshot is None:
+            self._snapshot = tuple(map(ShortBlock, self._prices, self._values))
+        return self._snapshot
+
+    def snapshot_dicts(self) -> List[Dict[str, float]]:
+        """Mesmo formato do antigo `short_blocks` (lista de dicts)."""
+        if self._dicts is None:
+            self._dicts = [{"price": p, "value": v} for p, v in zip(self._prices, self._values)]
+        return self._dicts
+
+    # ---------------- mutação ------------------------------------
+    def _touch(self) -> None:
+        self._snapshot = None
+        self._dicts = None
+
+    def add(self, price: float, value: float) -> None:
+        if self.journal is not None:
+            self.journal.ledger_add(price, value)
+        self._prices.append(price)
+        self._values.append(value)
+        self.total_value += value
+        self._value_over_price += value / price
+        self._touch()
+
+    def clear(self) -> float:
+        """Zera o ledger e devolve o notional que estava aberto."""
+        if self.journal is not None:
+            self.journal.ledger_clear()
+        closed = self.total_value
+        del self._prices[:]
+        del self._values[:]
+        self.total_value = 0.0
+        self._value_over_price = 0.0
+        self._touch()
+        return closed
+
+    def reduce_lifo(self, amount: float) -> None:
+        """Remove `amount` USD de notional, começando pelo bloco mais novo."""
+        if self.journal is not None:
+            self.journal.ledger_reduce(amount)
+        prices, values = self._prices, self._values
+        while amount > 0 and values:
+            value = values[-1]
+            price = prices[-1]
+            if value <= amount:
+                amount -= value
+                values.pop()
+                prices.pop()
+                self.total_value -= value
+                self._value_over_price -= value / price
+            else:
+                values[-1] = value - amount
+                self.total_value -= amount
+                self._value_over_price -= amount / price
+                amount = 0
+        if len(values) <= 1:
+            # ressincroniza para não acumular erro de arredondamento
+            self.total_value = values[0] if values else 0.0
+            self._value_over_price = values[0] / prices[0] if values else 0.0
+        self._touch()
+
+    # ---------------- persistência -------------------------------
+    def dump(self) -> Tuple[array, array, float, float]:
+        """Arrays e totais exatos (os totais são incrementais, não Σ)."""
+        return self._prices, self._values, self.total_value, self._value_over_price
+
+    def load(self, prices: array, values: array, total_value: float, value_over_price: float) -> None:
+        self._prices = array("d", prices)
+        self._values = array("d", values)
+        self.total_value = total_value
+        self._value_over_price = value_over_price
+        self._touch()
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class HedgeConfig:
@@ -8,4 +9,6 @@ class HedgeConfig:
     max_price: float
     fee_apr_percent: float
     rebalance_threshold_usd: float
-    total_usd_target: float
\ No newline at end of file
+    total_usd_target: float
+    pool_id: Optional[str] = None
+    hedge_interval_seconds: float = 10
\ No newline at end of file
@@ -1,21 +1,102 @@
 from datetime import datetime
-from typing import List, Dict, Any
-from pydantic import BaseModel
-
-
-class HedgeResult(BaseModel):
-    time: datetime
-    close: float
-    quantity_token1: float
-    quantity_token2: float
-    value_token1_usd: float
-    value_token2_usd: float
-    total_value_usd: float
-    delta_total: float
-    accumulated_fee: float
-    short_action: str
-    short_value_usd: float
-    short_pnl_usd: float
-    total_accumulated: float
-    total_accumulated_with_fee: float
-    short_blocks: List[Dict[str, Any]]
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from core.short_block_ledger import ShortBlock
+
+ACTIONS = ("hold", "open", "increase", "decrease", "close")
+ACTION_CODES = {a: i for i, a in enumerate(ACTIONS)}
+
+# ordem dos campos do HedgeResult (também a das colunas do backtest)
+RESULT_FIELDS = (
+    "time", "close",
+    "quantity_token1", "quantity_token2",
+    "value_token1_usd", "value_token2_usd",
+    "total_value_usd", "delta_total", "accumulated_fee",
+    "short_action", "short_value_usd",
+    "short_pnl_usd", "total_accumulated",
+    "total_accumulated_with_fee", "short_blocks",
+)
+
+
+class HedgeResult:
+    """
+    Resultado de um tick, tipo interno do hot path (sem validação: os
+    valores vêm prontos da máquina de estados).
+
+    • __slots__ ......  sem __dict__ por instância
+    • short_blocks ...  o snapshot imutável do ShortBlockLedger (tupla de
+                        ShortBlock), compartilhado entre ticks enquanto o
+                        ledger não muda — sem cópia
+    • to_dict() ......  única serialização (formato do antigo pydantic
+                        `.dict()`), montada na primeira chamada e reusada
+
+    Pydantic fica só na borda da API: schemas/hedge_result_schema.py valida
+    as respostas de /history e /rollups; os eventos de stream (SSE /
+    WebSocket) saem direto do to_dict().
+    """
+
+    __slots__ = RESULT_FIELDS + ("_dict",)
+
+    def __init__(
+        self,
+        time: datetime,
+        close: float,
+        quantity_token1: float,
+        quantity_token2: float,
+        value_token1_usd: float,
+        value_token2_usd: float,
+        total_value_usd: float,
+        delta_total: float,
+        accumulated_fee: float,
+        short_action: str,
+        short_value_usd: float,
+        short_pnl_usd: float,
+        total_accumulated: float,
+        total_accumulated_with_fee: float,
+        short_blocks: Tuple["ShortBlock", ...],
+    ):
+        self.time = time
+        self.close = close
+        self.quantity_token1 = quantity_token1
+        self.quantity_token2 = quantity_token2
+        self.value_token1_usd = value_token1_usd
+        self.value_token2_usd = value_token2_usd
+        self.total_value_usd = total_value_usd
+        self.delta_total = delta_total
+        self.accumulated_fee = accumulated_fee
+        self.short_action = short_action
+        self.short_value_usd = short_value_usd
+        self.short_pnl_usd = short_pnl_usd
+        self.total_accumulated = total_accumulated
+        self.total_accumulated_with_fee = total_accumulated_with_fee
+        self.short_blocks = short_blocks
+        self._dict: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict com short_blocks como lista de {"price", "value"} (cacheado)."""
+        if self._dict is None:
+            self._dict = {
+                "time": self.time,
+                "close": self.close,
+                "quantity_token1": self.quantity_token1,
+                "quantity_token2": self.quantity_token2,
+                "value_token1_usd": self.value_token1_usd,
+                "value_token2_usd": self.value_token2_usd,
+                "total_value_usd": self.total_value_usd,
+                "delta_total": self.delta_total,
+                "accumulated_fee": self.accumulated_fee,
+                "short_action": self.short_action,
+                "short_value_usd": self.short_value_usd,
+                "short_pnl_usd": self.short_pnl_usd,
+                "total_accumulated": self.total_accumulated,
+                "total_accumulated_with_fee": self.total_accumulated_with_fee,
+                "short_blocks": [{"price": p, "value": v} for p, v in self.short_blocks],
+            }
+        return self._dict
+
+    def __repr__(self) -> str:
+        return (
+            f"HedgeResult(time={self.time!r}, close={self.close!r}, "
+            f"short_action={self.short_action!r}, short_blocks={len(self.short_blocks)})"
+        )
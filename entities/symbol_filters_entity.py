@@ -0,0 +1,66 @@
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+
+
+def _decimals(step: str) -> int:
+    """Casas decimais de um step da exchange ("0.001000" → 3)."""
+    exponent = Decimal(step).normalize().as_tuple().exponent
+    return max(-exponent, 0)
+
+
+@dataclass(frozen=True)
+class SymbolFilters:
+    """
+    Filtros de ordem de um símbolo de futures (exchangeInfo):
+
+    • step_size / min_qty / max_qty ..  MARKET_LOT_SIZE (ou LOT_SIZE)
+    • min_notional ...................  MIN_NOTIONAL (qty · preço)
+    • tick_size ......................  PRICE_FILTER
+    """
+
+    symbol: str
+    step_size: float
+    min_qty: float
+    max_qty: float
+    min_notional: float
+    tick_size: float
+    qty_decimals: int
+
+    @classmethod
+    def default(cls, symbol: str, qty_decimals: int = 1) -> "SymbolFilters":
+        """Sem metadados: só arredonda em `qty_decimals` (comportamento antigo)."""
+        step = 10.0 ** -qty_decimals
+        return cls(symbol, step, 0.0, math.inf, 0.0, 0.0, qty_decimals)
+
+    @classmethod
+    def from_exchange_info(cls, info: dict) -> "SymbolFilters":
+        filters = {f["filterType"]: f for f in info.get("filters", [])}
+        lot = filters.get("MARKET_LOT_SIZE") or filters.get("LOT_SIZE") or {}
+        step = lot.get("stepSize", "0.001")
+        notional = filters.get("MIN_NOTIONAL", {})
+        return cls(
+            symbol=info["symbol"],
+            step_size=float(step),
+            min_qty=float(lot.get("minQty", 0)),
+            max_qty=float(lot.get("maxQty", math.inf)),
+            min_notional=float(notional.get("notional", notional.get("minNotional", 0))),
+            tick_size=float(filters.get("PRICE_FILTER", {}).get("tickSize", 0)),
+            qty_decimals=_decimals(step),
+        )
+
+    def floor_qty(self, qty: float) -> float:
+        """Maior múltiplo de step_size ≤ |qty| (com o sinal de qty)."""
+        steps = math.floor(abs(qty) / self.step_size + 1e-9)
+        floored = round(min(steps * self.step_size, self.max_qty), self.qty_decimals)
+        return math.copysign(floored, qty) if floored else 0.0
+
+    def tradable(self, qty: float, price: float, reduce: bool = False) -> bool:
+        """
+        qty (já em múltiplos de step) passa nos filtros? Reduções não
+        checam min_notional (a exchange não aplica a ordens que só fecham).
+        """
+        qty = abs(qty)
+        if qty <= 0 or qty < self.min_qty:
+            return False
+        return reduce or qty * price >= self.min_notional
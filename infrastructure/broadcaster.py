@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Set
+
+import orjson
+
+EVENT_KINDS = frozenset({"result", "order"})
+
+
+class Subscription:
+    """
+    Fila limitada de um assinante. Os eventos chegam já serializados
+    (bytes JSON); `get` devolve None quando a assinatura foi encerrada.
+    """
+
+    __slots__ = (
+        "pool_id", "kinds", "min_interval", "queue",
+        "dropped", "downsampled", "lagging", "closed", "_last_result",
+    )
+
+    def __init__(self, pool_id: str, kinds: FrozenSet[str], maxsize: int, min_interval: float):
+        self.pool_id = pool_id
+        self.kinds = kinds
+        self.min_interval = min_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0          # eventos descartados por fila cheia
+        self.downsampled = 0      # results pulados por min_interval
+        self.lagging = 0          # descartes desde a última leitura
+        self.closed = False
+        self._last_result = 0.0
+
+    async def get(self) -> Optional[bytes]:
+        item = await self.queue.get()
+        self.lagging = 0
+        return item
+
+    def _offer(self, event: bytes) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # cliente lento: sai o evento mais antigo, entra o mais novo
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+            self.dropped += 1
+            self.lagging += 1
+
+    def _close(self) -> None:
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBroadcaster:
+    """
+    Fan-out dos eventos de cada pool (HedgeResult e ordens) para os
+    assinantes das rotas de WebSocket / SSE.
+
+    • publish ......  síncrono e sem await: nunca segura o loop de hedge.
+                      Sem assinantes na pool é só um dict lookup; com
+                      assinantes, o evento é serializado uma vez (orjson) e
+                      os mesmos bytes vão para todas as filas
+    • fila cheia ...  descarta o evento mais antigo (o cliente lento recebe
+                      uma amostra dos eventos); `seq` por pool permite ao
+                      cliente ver o buraco. Após `max_lag` descartes sem
+                      nenhuma leitura, a assinatura é encerrada
+    • min_interval ..  downsampling opcional de results por assinante
+                      (ordens sempre passam)
+
+    No modo com shards (services/shard_supervisor.py) o worker encaminha
+    os bytes das pools em `forwarded` para o supervisor (`forward`), que os
+    distribui com `fanout`; `on_watch` avisa o supervisor quando uma pool
+    ganha o primeiro assinante ou perde o último.
+    """
+
+    def __init__(self, max_lag: int = 1024):
+        self.max_lag = max_lag
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._seq: Dict[str, int] = {}
+        self.forwarded: Set[str] = set()
+        self.forward: Optional[Callable[[str, str, bytes], None]] = None
+        self.on_watch: Optional[Callable[[str, bool], None]] = None
+
+        # contadores
+        self.published = 0
+        self.dropped = 0          # de assinaturas já encerradas
+        self.disconnected = 0     # assinantes lentos encerrados
+
+    def subscribe(
+        self,
+        pool_id: str,
+        kinds: Iterable[str] = EVENT_KINDS,
+        maxsize: int = 256,
+        min_interval: float = 0.0,
+    ) -> Subscription:
+        kinds = frozenset(kinds) & EVENT_KINDS
+        sub = Subscription(pool_id, kinds or EVENT_KINDS, maxsize, min_interval)
+        subs = self._subscribers.setdefault(pool_id, set())
+        subs.add(sub)
+        if len(subs) == 1 and self.on_watch is not None:
+            self.on_watch(pool_id, True)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.pool_id)
+        if subs is None or sub not in subs:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[sub.pool_id]
+            if self.on_watch is not None:
+                self.on_watch(sub.pool_id, False)
+        self.dropped += sub.dropped
+
+    def has_subscribers(self, pool_id: str) -> bool:
+        return pool_id in self._subscribers
+
+    def publish(self, pool_id: str, kind: str, data: dict) -> None:
+        subs = self._subscribers.get(pool_id)
+        if not subs and pool_id not in self.forwarded:
+            return
+        seq = self._seq[pool_id] = self._seq.get(pool_id, 0) + 1
+        event = orjson.dumps(
+            {"type": kind, "pool_id": pool_id, "seq": seq, "data": data},
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+        self.published += 1
+        if pool_id in self.forwarded and self.forward is not None:
+            self.forward(pool_id, kind, event)
+        if subs:
+            self.fanout(pool_id, kind, event)
+
+    def fanout(self, pool_id: str, kind: str, event: bytes) -> None:
+        """Entrega um evento já serializado aos assinantes da pool."""
+        subs = self._subscribers.get(pool_id)
+        if not subs:
+            return
+        now = time.monotonic() if kind == "result" else 0.0
+        for sub in tuple(subs):
+            if kind not in sub.kinds:
+                continue
+            if now and sub.min_interval:
+                if now - sub._last_result < sub.min_interval:
+                    sub.downsampled += 1
+                    continue
+                sub._last_result = now
+            sub._offer(event)
+            if sub.lagging >= self.max_lag:
+                sub._close()
+                self.unsubscribe(sub)
+                self.disconnected += 1
+
+    def close_pool(self, pool_id: str) -> None:
+        """Encerra os assinantes de uma pool (ex.: pool parada)."""
+        for sub in tuple(self._subscribers.get(pool_id, ())):
+            sub._close()
+            self.unsubscribe(sub)
+
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+
+broadcaster = EventBroadcaster()
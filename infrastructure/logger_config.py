@@ -1,46 +1,88 @@
+import atexit
 import logging
-from pythonjsonlogger import jsonlogger
-from datetime import datetime
-import json
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
 
 # Diretório do log (opcional)
 LOG_FILE = "hedge.log"
 TRADE_LOG_FILE = "hedge_trades.log"
 
-class PrettyJsonFormatter(jsonlogger.JsonFormatter):
-    def __init__(self, *args, **kwargs):
-        kwargs["json_serializer"] = json.dumps  # força uso explícito do json
-        super().__init__(*args, **kwargs)
+# capacidade da fila do hedge_logger (acima disso os registros são descartados)
+HEDGE_LOG_QUEUE_SIZE = 10_000
+
+# atributos padrão do LogRecord (o resto veio de `extra=`)
+_RESERVED = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+
+def _dumps(obj, indent: bool = False) -> str:
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(obj, default=str, option=option).decode()
+
+
+class CompactJsonFormatter(logging.Formatter):
+    """
+    Uma linha JSON por registro: message, level, timestamp e os campos de
+    `extra=` (ou do dict passado como mensagem). datetimes viram ISO.
+    """
+
+    indent = False
 
     def format(self, record):
-        log_record = record.__dict__.copy()
+        log_record = {}
+        if isinstance(record.msg, dict):
+            log_record.update(record.msg)
+        else:
+            log_record["message"] = record.getMessage()
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                log_record[key] = value
+        if record.levelno >= logging.WARNING:
+            log_record["level"] = record.levelname
+        if record.exc_info:
+            log_record["exc_info"] = self.formatException(record.exc_info)
+        # hora do evento (a formatação roda depois, na thread do listener)
+        log_record["timestamp"] = datetime.fromtimestamp(record.created, timezone.utc).replace(tzinfo=None).isoformat()
+        return _dumps(log_record, indent=self.indent)
+
+
+class PrettyJsonFormatter(CompactJsonFormatter):
+    indent = True
 
-        # Converter datetime para ISO string
-        for key, value in log_record.items():
-            if hasattr(value, "isoformat"):
-                log_record[key] = value.isoformat()
 
-        log_record["timestamp"] = datetime.utcnow().isoformat()
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler que nunca bloqueia o event loop: com a fila cheia o
+    registro é descartado e contado em `dropped`. A formatação fica toda
+    na thread do listener (prepare não formata nem copia o record).
+    """
 
-        # Usar indentação amigável
-        return self.json_serializer(log_record, indent=2)
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
 
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BlockingSentinelListener(QueueListener):
+    """No stop, espera espaço na fila para o sentinel em vez de falhar."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
 
-class CompactJsonFormatter(jsonlogger.JsonFormatter):
-    def process_log_record(self, log_record):
-        log_record["timestamp"] = datetime.utcnow().isoformat()
-        for k, v in log_record.items():
-            if hasattr(v, "isoformat"):
-                log_record[k] = v.isoformat()
-        return super().process_log_record(log_record)
 
 # -------------------------------
-# Logger configurado
+# Handlers de saída (rodam na thread do QueueListener)
 # -------------------------------
-logger = logging.getLogger("hedge_logger")
-logger.setLevel(logging.INFO)
-logger.propagate = False  # evita logs duplicados
-
 # Console Handler (compacto)
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(CompactJsonFormatter())
@@ -49,19 +91,43 @@ console_handler.setFormatter(CompactJsonFormatter())
 file_handler = logging.FileHandler(LOG_FILE)
 file_handler.setFormatter(CompactJsonFormatter())
 
-# Adiciona ambos
+trade_file_handler = logging.FileHandler(TRADE_LOG_FILE)
+trade_file_handler.setFormatter(CompactJsonFormatter())
+
+# -------------------------------
+# Logger configurado
+# -------------------------------
+logger = logging.getLogger("hedge_logger")
+logger.setLevel(logging.INFO)
+logger.propagate = False  # evita logs duplicados
+
+# fila limitada: alto volume (um registro por tick), pode descartar
+hedge_log_queue: queue.Queue = queue.Queue(maxsize=HEDGE_LOG_QUEUE_SIZE)
+hedge_queue_handler = DroppingQueueHandler(hedge_log_queue)
+
 if not logger.hasHandlers():
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(hedge_queue_handler)
 
 # Logger para operações Binance
 trade_logger = logging.getLogger("hedge_trade_logger")
 trade_logger.setLevel(logging.INFO)
 trade_logger.propagate = False
 
-trade_log_file = "hedge_trades.log"
-trade_file_handler = logging.FileHandler(TRADE_LOG_FILE)
-trade_file_handler.setFormatter(CompactJsonFormatter())
+# fila sem limite: registros de trade nunca são descartados
+trade_log_queue: queue.Queue = queue.Queue()
+trade_queue_handler = DroppingQueueHandler(trade_log_queue)
 
 if not trade_logger.hasHandlers():
-    trade_logger.addHandler(trade_file_handler)
\ No newline at end of file
+    trade_logger.addHandler(trade_queue_handler)
+
+hedge_listener = BlockingSentinelListener(hedge_log_queue, console_handler, file_handler)
+trade_listener = BlockingSentinelListener(trade_log_queue, trade_file_handler)
+hedge_listener.start()
+trade_listener.start()
+
+
+@atexit.register
+def _stop_listeners():
+    # esvazia as filas antes de sair
+    hedge_listener.stop()
+    trade_listener.stop()
@@ -0,0 +1,122 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# limites dos buckets em segundos (50µs … ~52s, fator 2)
+LATENCY_BUCKETS = tuple(50e-6 * 2 ** i for i in range(21))
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class LatencyHistogram:
+    """Histograma de buckets fixos; `observe` é um bisect + 3 somas."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimativa pelo limite superior do bucket (p/ logs e testes)."""
+        if not self.count:
+            return 0.0
+        target, acc = q * self.count, 0
+        for bound, n in zip(LATENCY_BUCKETS, self.counts):
+            acc += n
+            if acc >= target:
+                return bound
+        return float("inf")
+
+
+class StageTimers:
+    """Histogramas de um (pool, symbol), resolvidos uma vez por estágio."""
+
+    __slots__ = ("_registry", "_labels", "_stages")
+
+    def __init__(self, registry: "MetricsRegistry", labels: Labels):
+        self._registry = registry
+        self._labels = labels
+        self._stages: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        hist = self._stages.get(stage)
+        if hist is None:
+            hist = self._stages[stage] = self._registry.histogram(stage, self._labels)
+        hist.observe(seconds)
+
+
+class MetricsRegistry:
+    """
+    Registro em memória de latências por estágio do hot path, exposto no
+    formato texto do Prometheus em `/metrics`.
+
+    Estágios: feed_lag, decode, dispatch, on_new_price, qty, order_ack,
+    exchange_roundtrip, end_to_end.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Labels], LatencyHistogram] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def histogram(self, stage: str, labels: Labels) -> LatencyHistogram:
+        key = (stage, labels)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = LatencyHistogram()
+        return hist
+
+    def timers(self, pool: str, symbol: str) -> StageTimers:
+        return StageTimers(self, (("pool", pool), ("symbol", symbol.upper())))
+
+    def merged(self, stage: str) -> LatencyHistogram:
+        """Soma dos histogramas de um estágio em todas as labels."""
+        total = LatencyHistogram()
+        for (name, _), hist in self._histograms.items():
+            if name != stage:
+                continue
+            total.counts = [a + b for a, b in zip(total.counts, hist.counts)]
+            total.sum += hist.sum
+            total.count += hist.count
+        return total
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Coletor chamado no scrape; devolve (nome, labels, valor)."""
+        self._collectors.append(collector)
+
+    # ---------------- exposição ----------------------------------
+    @staticmethod
+    def _fmt_labels(labels) -> str:
+        return ",".join(f'{k}="{v}"' for k, v in labels)
+
+    def render(self) -> str:
+        name = "hedge_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Latência por estágio do hot path de hedge.",
+            f"# TYPE {name} histogram",
+        ]
+        for (stage, labels), hist in sorted(self._histograms.items()):
+            base = self._fmt_labels((("stage", stage),) + labels)
+            acc = 0
+            for bound, n in zip(LATENCY_BUCKETS, hist.counts):
+                acc += n
+                lines.append(f'{name}_bucket{{{base},le="{bound:.6g}"}} {acc}')
+            lines.append(f'{name}_bucket{{{base},le="+Inf"}} {hist.count}')
+            lines.append(f"{name}_sum{{{base}}} {hist.sum:.9f}")
+            lines.append(f"{name}_count{{{base}}} {hist.count}")
+
+        for collector in self._collectors:
+            for sample_name, labels, value in collector():
+                if labels:
+                    sample_name += "{" + self._fmt_labels(sorted(labels.items())) + "}"
+                lines.append(f"{sample_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -5,5 +5,24 @@ load_dotenv(".env")
 class Settings:
     BINANCE_KEY = os.getenv("BINANCE_KEY")
     BINANCE_SECRET = os.getenv("BINANCE_SECRET")
+    RESULTS_DIR = os.getenv("HEDGE_RESULTS_DIR", "data/results")
+    STATE_DIR = os.getenv("HEDGE_STATE_DIR", "data/state")
+    # segmentos .npy do histórico por pool (65 536 linhas, ~7 MB cada); 0 = sem limite
+    RESULTS_MAX_SEGMENTS = int(os.getenv("HEDGE_RESULTS_MAX_SEGMENTS", "256"))
+    # endpoints alternativos (ex.: loadtest/fake_exchange.py); vazio = Binance
+    BINANCE_BASE_URL = os.getenv("BINANCE_BASE_URL")
+    BINANCE_STREAM_URL = os.getenv("BINANCE_STREAM_URL")
+    # feed de preços: "lean" (adapters/binance_price_feed.py) ou "python-binance"
+    MARKET_DATA_FEED = os.getenv("HEDGE_MARKET_DATA_FEED", "lean")
+    # kline_1m, markPrice, markPrice@1s, aggTrade ou bookTicker (só no feed lean)
+    PRICE_STREAM = os.getenv("HEDGE_PRICE_STREAM", "kline_1m")
+    PRICE_BATCH_MS = float(os.getenv("HEDGE_PRICE_BATCH_MS", "0"))
+    # > 0: supervisor + N processos worker (services/shard_supervisor.py)
+    SHARD_WORKERS = int(os.getenv("HEDGE_SHARD_WORKERS", "0"))
+    # posição real via user-data stream e drift por símbolo (services/position_reconciler.py);
+    # as ordens de correção automáticas só com HEDGE_RECONCILE_CORRECT=1
+    RECONCILE_POSITIONS = os.getenv("HEDGE_RECONCILE_POSITIONS", "1") != "0"
+    RECONCILE_CORRECT = os.getenv("HEDGE_RECONCILE_CORRECT", "0") == "1"
+    RECONCILE_TOLERANCE_USD = float(os.getenv("HEDGE_RECONCILE_TOLERANCE_USD", "5"))
 
 settings = Settings()
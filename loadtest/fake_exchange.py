@@ -0,0 +1,439 @@
+"""
+Exchange local para testes de carga (sem rede, sem chaves).
+
+Serve o subconjunto da API da Binance Futures que o serviço usa:
+
+• GET  /api/v3/ping, /api/v3/time ....  handshake do AsyncClient.create
+• GET  /fapi/v1/ping, /fapi/v1/time ..  keep-alive e relógio do client pool
+• GET  /fapi/v1/exchangeInfo .........  filtros de LOAD0USDT…LOAD<n-1>USDT
+                                        (step, minQty, minNotional, tick)
+• POST /fapi/v1/order ................  ordem a mercado, com latência,
+                                        jitter, rejeições e fills parciais;
+                                        quantidade fora do step (-1111) ou
+                                        abaixo do minNotional (-4164) é
+                                        rejeitada como na Binance
+• WS   /market/stream?streams=... ....  streams multiplexados (kline_*,
+                                        markPrice*, aggTrade), com preços
+                                        por GBM a `tick_rate` ticks/s/símbolo
+• WS   /public/stream?streams=... ....  bookTicker, idem
+• POST/PUT/DELETE /fapi/v1/listenKey .  user-data stream
+• GET  /fapi/v3/positionRisk .........  posição SHORT por símbolo
+• WS   /ws/<listenKey> ...............  ORDER_TRADE_UPDATE + ACCOUNT_UPDATE
+                                        a cada fill; com `lost_ack_rate` a
+                                        ordem executa mas a resposta é um
+                                        erro 503 (drift para reconciliar)
+• GET  /stats ........................  contadores da própria fake
+
+Limites de taxa em janelas fixas como na Binance (peso / min, ordens /
+10 s e / min): toda resposta REST traz X-MBX-USED-WEIGHT-1M e
+X-MBX-ORDER-COUNT-10S / -1M, e o excesso recebe 429 com Retry-After.
+
+Uso:
+    python -m loadtest.fake_exchange --port 8900 --tick-rate 200 --latency-ms 5
+
+e no serviço:
+    BINANCE_BASE_URL=http://127.0.0.1:8900 BINANCE_STREAM_URL=ws://127.0.0.1:8900
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Set
+
+import orjson
+from aiohttp import WSMsgType, web
+
+
+class FakeExchange:
+    def __init__(
+        self,
+        tick_rate: float = 100.0,
+        start_price: float = 1.7,
+        sigma: float = 0.0005,
+        drift: float = 0.0,
+        latency_ms: float = 5.0,
+        jitter_ms: float = 2.0,
+        reject_rate: float = 0.0,
+        partial_rate: float = 0.0,
+        seed: Optional[int] = None,
+        listed: int = 64,
+        step_size: str = "0.1",
+        min_notional: float = 0.0,
+        tick_size: str = "0.0001",
+        weight_limit: int = 2400,
+        order_limit_10s: int = 300,
+        order_limit_1m: int = 1200,
+        lost_ack_rate: float = 0.0,
+    ):
+        self.tick_rate = tick_rate
+        self.start_price = start_price
+        self.sigma = sigma              # desvio do log-retorno por tick
+        self.drift = drift              # média do log-retorno por tick
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.reject_rate = reject_rate
+        self.partial_rate = partial_rate
+        self.lost_ack_rate = lost_ack_rate
+        self.listed = listed
+        self.step_size = step_size
+        self.min_notional = min_notional
+        self.tick_size = tick_size
+        self._step_decimal = Decimal(step_size)
+        self._rng = random.Random(seed)
+        self._order_ids = itertools.count(1)
+        self.prices: Dict[str, float] = {}
+        self.short_positions: Dict[str, float] = {}
+        self._user_sockets: Set[web.WebSocketResponse] = set()
+        # (tipo, header, janela em s, limite) → [índice da janela, uso]
+        self.rate_limits = [
+            ("REQUEST_WEIGHT", "X-MBX-USED-WEIGHT-1M", 60, weight_limit),
+            ("ORDERS", "X-MBX-ORDER-COUNT-10S", 10, order_limit_10s),
+            ("ORDERS", "X-MBX-ORDER-COUNT-1M", 60, order_limit_1m),
+        ]
+        self._usage: Dict[str, List[int]] = {header: [0, 0] for _, header, _, _ in self.rate_limits}
+
+        # contadores
+        self.ticks_sent = 0
+        self.orders = 0
+        self.rejects = 0
+        self.partials = 0
+        self.connections = 0
+        self.throttled = 0
+        self.lost_acks = 0
+
+    # ---------------- preços -------------------------------------
+    def _step(self, symbol: str) -> float:
+        """Um passo de GBM: p ← p·exp(μ − σ²/2 + σ·Z)."""
+        price = self.prices.get(symbol, self.start_price)
+        z = self._rng.gauss(0.0, 1.0)
+        price *= math.exp(self.drift - 0.5 * self.sigma ** 2 + self.sigma * z)
+        self.prices[symbol] = price
+        return price
+
+    # ---------------- limites de taxa ----------------------------
+    def _consume(self, kind: str) -> Optional[float]:
+        """Conta uma unidade; devolve o Retry-After (s) se passou do limite."""
+        now = time.time()
+        retry_after = None
+        for limit_kind, header, seconds, limit in self.rate_limits:
+            if limit_kind != kind:
+                continue
+            window = int(now // seconds)
+            usage = self._usage[header]
+            if usage[0] != window:
+                usage[:] = [window, 0]
+            usage[1] += 1
+            if usage[1] > limit:
+                retry_after = max(retry_after or 0.0, (window + 1) * seconds - now)
+        return retry_after
+
+    def _usage_headers(self) -> Dict[str, str]:
+        now = time.time()
+        headers = {}
+        for _, header, seconds, _ in self.rate_limits:
+            window, used = self._usage[header]
+            headers[header] = str(used if window == int(now // seconds) else 0)
+        return headers
+
+    @web.middleware
+    async def _rate_limit(self, request: web.Request, handler) -> web.StreamResponse:
+        if not request.path.startswith(("/fapi/", "/api/")):
+            return await handler(request)
+        retry_after = self._consume("REQUEST_WEIGHT")
+        if request.method == "POST" and request.path == "/fapi/v1/order":
+            order_retry = self._consume("ORDERS")
+            if order_retry is not None:
+                retry_after = max(retry_after or 0.0, order_retry)
+        if retry_after is not None:
+            self.throttled += 1
+            response = web.json_response(
+                {"code": -1015, "msg": "Too many requests; current limit is exceeded."},
+                status=429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        else:
+            response = await handler(request)
+        response.headers.update(self._usage_headers())
+        return response
+
+    # ---------------- REST ---------------------------------------
+    async def ping(self, request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def server_time(self, request: web.Request) -> web.Response:
+        return web.json_response({"serverTime": int(time.time() * 1000)})
+
+    async def exchange_info(self, request: web.Request) -> web.Response:
+        symbols = [{
+            "symbol": f"LOAD{i}USDT",
+            "status": "TRADING",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": self.tick_size},
+                {"filterType": "LOT_SIZE", "stepSize": self.step_size,
+                 "minQty": self.step_size, "maxQty": "1000000"},
+                {"filterType": "MARKET_LOT_SIZE", "stepSize": self.step_size,
+                 "minQty": self.step_size, "maxQty": "100000"},
+                {"filterType": "MIN_NOTIONAL", "notional": str(self.min_notional)},
+            ],
+        } for i in range(self.listed)]
+        rate_limits = [{
+            "rateLimitType": kind,
+            "interval": "MINUTE" if seconds == 60 else "SECOND",
+            "intervalNum": 1 if seconds == 60 else seconds,
+            "limit": limit,
+        } for kind, _, seconds, limit in self.rate_limits]
+        return web.json_response({
+            "serverTime": int(time.time() * 1000),
+            "rateLimits": rate_limits,
+            "symbols": symbols,
+        })
+
+    async def order(self, request: web.Request) -> web.Response:
+        params = dict(request.query)
+        params.update(await request.post())
+
+        delay = max(self._rng.gauss(self.latency_ms, self.jitter_ms), 0.0) / 1000
+        await asyncio.sleep(delay)
+
+        self.orders += 1
+        if self._rng.random() < self.reject_rate:
+            self.rejects += 1
+            return web.json_response({"code": -2019, "msg": "Margin is insufficient."}, status=400)
+
+        symbol = params["symbol"].upper()
+        if Decimal(params["quantity"]) % self._step_decimal:
+            self.rejects += 1
+            return web.json_response({"code": -1111, "msg": "Precision is over the maximum defined for this asset."}, status=400)
+        qty = float(params["quantity"])
+        price = self.prices.get(symbol, self.start_price)
+        # BUY no lado SHORT só reduz: sem checagem de notional
+        if params.get("side") == "SELL" and qty * price < self.min_notional:
+            self.rejects += 1
+            return web.json_response({"code": -4164, "msg": f"Order's notional must be no smaller than {self.min_notional}."}, status=400)
+
+        side = params.get("side")
+        position = self.short_positions.get(symbol, 0.0)
+        if side == "BUY" and qty > position + 1e-9:
+            self.rejects += 1
+            return web.json_response({"code": -2022, "msg": "ReduceOnly Order is rejected."}, status=400)
+
+        executed = qty
+        if self._rng.random() < self.partial_rate:
+            self.partials += 1
+            step = float(self._step_decimal)
+            executed = round(math.floor(qty * self._rng.uniform(0.5, 1.0) / step) * step, 8)
+        order_id = next(self._order_ids)
+        position = round(position + (executed if side == "SELL" else -executed), 8)
+        self.short_positions[symbol] = position
+        self._push_fill(symbol, side, order_id, qty, executed, position, price)
+
+        if self._rng.random() < self.lost_ack_rate:
+            self.lost_acks += 1
+            return web.json_response({"code": -1001, "msg": "Internal error; unable to process your request."}, status=503)
+        return web.json_response({
+            "orderId": order_id,
+            "symbol": symbol,
+            "status": "FILLED" if executed == qty else "PARTIALLY_FILLED",
+            "side": side,
+            "positionSide": params.get("positionSide", "BOTH"),
+            "type": params.get("type", "MARKET"),
+            "origQty": str(qty),
+            "executedQty": str(executed),
+            "avgPrice": f"{price:.8f}",
+            "cumQuote": f"{executed * price:.8f}",
+            "updateTime": int(time.time() * 1000),
+        })
+
+    async def position_risk(self, request: web.Request) -> web.Response:
+        now_ms = int(time.time() * 1000)
+        return web.json_response([{
+            "symbol": symbol,
+            "positionSide": "SHORT",
+            "positionAmt": f"{-qty:.8f}",
+            "entryPrice": f"{self.prices.get(symbol, self.start_price):.8f}",
+            "updateTime": now_ms,
+        } for symbol, qty in self.short_positions.items()])
+
+    async def listen_key(self, request: web.Request) -> web.Response:
+        if request.method == "POST":
+            return web.json_response({"listenKey": f"fake{next(self._order_ids)}"})
+        return web.json_response({})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "ticks_sent": self.ticks_sent,
+            "orders": self.orders,
+            "rejects": self.rejects,
+            "partials": self.partials,
+            "connections": self.connections,
+            "throttled": self.throttled,
+            "lost_acks": self.lost_acks,
+            "short_positions": self.short_positions,
+            "symbols": len(self.prices),
+        })
+
+    # ---------------- websocket ----------------------------------
+    async def stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+
+        streams: List[str] = [s for s in request.query.get("streams", "").split("/") if s]
+        symbols = [(s, s.split("@")[0].upper(), s.split("@")[1].split("_")[0]) for s in streams]
+        sender = asyncio.create_task(self._feed(ws, symbols))
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+            self.connections -= 1
+        return ws
+
+    async def user_stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._user_sockets.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self._user_sockets.discard(ws)
+        return ws
+
+    def _push_fill(self, symbol, side, order_id, qty, executed, position, price) -> None:
+        if not self._user_sockets:
+            return
+        now_ms = int(time.time() * 1000)
+        order_update = orjson.dumps({
+            "e": "ORDER_TRADE_UPDATE", "E": now_ms, "T": now_ms,
+            "o": {
+                "s": symbol, "S": side, "o": "MARKET", "q": str(qty), "i": order_id,
+                "X": "FILLED" if executed == qty else "PARTIALLY_FILLED",
+                "l": str(executed), "z": str(executed), "L": f"{price:.8f}", "ps": "SHORT",
+            },
+        })
+        account_update = orjson.dumps({
+            "e": "ACCOUNT_UPDATE", "E": now_ms, "T": now_ms,
+            "a": {"m": "ORDER", "B": [], "P": [
+                {"s": symbol, "pa": f"{-position:.8f}", "ep": f"{price:.8f}", "ps": "SHORT"},
+            ]},
+        })
+        for ws in tuple(self._user_sockets):
+            asyncio.ensure_future(self._send_user(ws, order_update, account_update))
+
+    @staticmethod
+    async def _send_user(ws: web.WebSocketResponse, *events: bytes) -> None:
+        try:
+            for event in events:
+                await ws.send_bytes(event)
+        except ConnectionResetError:
+            pass
+
+    async def _feed(self, ws: web.WebSocketResponse, symbols) -> None:
+        try:
+            await self._send_ticks(ws, symbols)
+        except ConnectionResetError:
+            pass  # cliente fechou no meio de um envio
+
+    async def _send_ticks(self, ws: web.WebSocketResponse, symbols) -> None:
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.tick_rate
+        next_at = loop.time()
+        while not ws.closed:
+            now_ms = int(time.time() * 1000)
+            for stream, symbol, kind in symbols:
+                price = self._step(symbol)
+                await ws.send_bytes(orjson.dumps({
+                    "stream": stream,
+                    "data": self._payload(kind, symbol, price, now_ms),
+                }))
+                self.ticks_sent += 1
+            # atrasado não compensa em rajada: pula para o próximo período
+            next_at = max(next_at + period, loop.time())
+            await asyncio.sleep(next_at - loop.time())
+
+    @staticmethod
+    def _payload(kind: str, symbol: str, price: float, now_ms: int) -> dict:
+        if kind == "markPrice":
+            return {"e": "markPriceUpdate", "E": now_ms, "s": symbol, "p": f"{price:.8f}"}
+        if kind == "aggTrade":
+            return {"e": "aggTrade", "E": now_ms, "s": symbol, "p": f"{price:.8f}", "q": "1"}
+        if kind == "bookTicker":
+            spread = price * 0.0001
+            return {"e": "bookTicker", "E": now_ms, "s": symbol,
+                    "b": f"{price - spread:.8f}", "B": "10", "a": f"{price + spread:.8f}", "A": "10"}
+        return {
+            "e": "kline",
+            "E": now_ms,
+            "s": symbol,
+            "k": {"s": symbol, "i": "1m", "c": f"{price:.8f}", "x": False},
+        }
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._rate_limit])
+        app.router.add_get("/api/v3/ping", self.ping)
+        app.router.add_get("/api/v3/time", self.server_time)
+        app.router.add_get("/fapi/v1/ping", self.ping)
+        app.router.add_get("/fapi/v1/time", self.server_time)
+        app.router.add_get("/fapi/v1/exchangeInfo", self.exchange_info)
+        app.router.add_post("/fapi/v1/order", self.order)
+        app.router.add_get("/market/stream", self.stream)
+        app.router.add_get("/public/stream", self.stream)
+        app.router.add_get("/fapi/v3/positionRisk", self.position_risk)
+        app.router.add_route("*", "/fapi/v1/listenKey", self.listen_key)
+        app.router.add_get("/ws/{listen_key}", self.user_stream)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exchange fake para testes de carga")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--tick-rate", type=float, default=100.0, help="ticks/s por símbolo")
+    parser.add_argument("--start-price", type=float, default=1.7)
+    parser.add_argument("--sigma", type=float, default=0.0005, help="volatilidade por tick")
+    parser.add_argument("--drift", type=float, default=0.0, help="drift por tick")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    parser.add_argument("--partial-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--listed", type=int, default=64, help="símbolos LOAD<i>USDT no exchangeInfo")
+    parser.add_argument("--step-size", default="0.1")
+    parser.add_argument("--min-notional", type=float, default=0.0)
+    parser.add_argument("--weight-limit", type=int, default=2400, help="peso de requisição / min")
+    parser.add_argument("--order-limit-10s", type=int, default=300)
+    parser.add_argument("--order-limit-1m", type=int, default=1200)
+    parser.add_argument("--lost-ack-rate", type=float, default=0.0, help="ordens executadas com resposta de erro")
+    args = parser.parse_args()
+
+    exchange = FakeExchange(
+        tick_rate=args.tick_rate,
+        start_price=args.start_price,
+        sigma=args.sigma,
+        drift=args.drift,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        reject_rate=args.reject_rate,
+        partial_rate=args.partial_rate,
+        seed=args.seed,
+        listed=args.listed,
+        step_size=args.step_size,
+        min_notional=args.min_notional,
+        weight_limit=args.weight_limit,
+        order_limit_10s=args.order_limit_10s,
+        order_limit_1m=args.order_limit_1m,
+        lost_ack_rate=args.lost_ack_rate,
+    )
+    web.run_app(exchange.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
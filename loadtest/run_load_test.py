@@ -0,0 +1,240 @@
+"""
+Teste de carga do stack de execução completo contra a exchange fake.
+
+Sobe `loadtest.fake_exchange` num subprocesso, aponta o serviço para ela
+(BINANCE_BASE_URL / BINANCE_STREAM_URL), inicia N pools via
+`start_hedge_execution` — hub, streamers, máquina de estados, netting e
+BinanceShortManager reais — e ao fim reporta vazão e latências por estágio.
+
+    python -m loadtest.run_load_test --pools 50 --symbols 10 --tick-rate 200 --duration 30
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+# latências reportadas (histogramas de infrastructure.metrics)
+REPORT_STAGES = (
+    "feed_lag", "decode", "dispatch", "on_new_price",
+    "qty", "order_queue", "exchange_roundtrip", "order_ack", "end_to_end",
+)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga contra a exchange fake")
+    parser.add_argument("--pools", type=int, default=20)
+    parser.add_argument("--symbols", type=int, default=5, help="símbolos distintos (pools dividem)")
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos de medição")
+    parser.add_argument("--tick-rate", type=float, default=100.0, help="ticks/s por símbolo")
+    parser.add_argument("--hedge-interval", type=float, default=0.01, help="intervalo de hedge por pool (s)")
+    parser.add_argument("--threshold", type=float, default=1.0, help="rebalance_threshold_usd")
+    parser.add_argument("--sigma", type=float, default=0.0005)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    parser.add_argument("--partial-rate", type=float, default=0.0)
+    parser.add_argument("--start-price", type=float, default=1.7)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--shards", type=int, default=0, help="workers do modo com shards (0 = um processo)")
+    parser.add_argument("--feed", choices=("lean", "python-binance"), default="lean")
+    parser.add_argument("--stream", default="kline_1m", help="stream de preço do feed lean")
+    parser.add_argument("--batch-ms", type=float, default=0.0, help="micro-batch do feed lean")
+    parser.add_argument("--step-size", default="0.1", help="stepSize dos símbolos na fake")
+    parser.add_argument("--min-notional", type=float, default=0.0)
+    parser.add_argument("--lost-ack-rate", type=float, default=0.0, help="ordens executadas com resposta de erro")
+    parser.add_argument("--order-limit-10s", type=int, default=300, help="limite de ordens / 10 s na fake")
+    parser.add_argument("--reconcile", action="store_true", help="liga as ordens de correção do PositionReconciler")
+    return parser.parse_args(argv)
+
+
+async def _start_exchange(args: argparse.Namespace) -> asyncio.subprocess.Process:
+    cmd = [
+        sys.executable, "-m", "loadtest.fake_exchange",
+        "--port", str(args.port),
+        "--tick-rate", str(args.tick_rate),
+        "--start-price", str(args.start_price),
+        "--sigma", str(args.sigma),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--reject-rate", str(args.reject_rate),
+        "--partial-rate", str(args.partial_rate),
+        "--listed", str(max(args.symbols, 1)),
+        "--step-size", args.step_size,
+        "--min-notional", str(args.min_notional),
+        "--order-limit-10s", str(args.order_limit_10s),
+        "--lost-ack-rate", str(args.lost_ack_rate),
+    ]
+    if args.seed is not None:
+        cmd += ["--seed", str(args.seed)]
+    proc = await asyncio.create_subprocess_exec(*cmd)
+
+    # espera o servidor aceitar conexões
+    url = f"http://127.0.0.1:{args.port}/api/v3/ping"
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        return proc
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("exchange fake não respondeu")
+
+
+async def _exchange_stats(port: int) -> dict:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"http://127.0.0.1:{port}/stats") as resp:
+            return await resp.json()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # o serviço lê as settings no import: configura o ambiente antes
+    os.environ["BINANCE_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["BINANCE_STREAM_URL"] = f"ws://127.0.0.1:{args.port}"
+    os.environ.setdefault("BINANCE_KEY", "loadtest")
+    os.environ.setdefault("BINANCE_SECRET", "loadtest")
+    workdir = Path(tempfile.mkdtemp(prefix="hedge-loadtest-"))
+    os.environ["HEDGE_RESULTS_DIR"] = str(workdir / "results")
+    os.environ["HEDGE_STATE_DIR"] = str(workdir / "state")
+    os.environ["HEDGE_MARKET_DATA_FEED"] = args.feed
+    os.environ["HEDGE_PRICE_STREAM"] = args.stream
+    os.environ["HEDGE_PRICE_BATCH_MS"] = str(args.batch_ms)
+    os.environ["HEDGE_SHARD_WORKERS"] = str(args.shards)
+    os.environ["HEDGE_RECONCILE_CORRECT"] = "1" if args.reconcile else "0"
+
+    from entities.hedge_config_entity import HedgeConfig
+    from infrastructure.logger_config import console_handler, hedge_listener
+    from infrastructure.metrics import metrics
+    from services import hedge_backend as service
+
+    # um registro por tick no console derrubaria a medição
+    console_handler.setLevel(logging.WARNING)
+    hedge_listener.respect_handler_level = True
+
+    proc = await _start_exchange(args)
+    try:
+        await service.startup()
+        p = args.start_price
+        for i in range(args.pools):
+            await service.start_hedge_execution(HedgeConfig(
+                symbol=f"LOAD{i % args.symbols}USDT",
+                qty_token1=100.0,
+                min_price=p * 0.85,
+                max_price=p * 1.15,
+                fee_apr_percent=100.0,
+                rebalance_threshold_usd=args.threshold,
+                total_usd_target=300.0,
+                pool_id=f"load-{i}",
+                hedge_interval_seconds=args.hedge_interval,
+            ))
+
+        # aquecimento: conexões abertas e primeiro tick em todas as pools
+        await asyncio.sleep(1.0)
+        received0, execs0, _ = await _counters(service)
+        orders0 = (await _exchange_stats(args.port))["orders"]
+        started = time.perf_counter()
+
+        await asyncio.sleep(args.duration)
+
+        elapsed = time.perf_counter() - started
+        received, execs, stats = await _counters(service)
+        received -= received0
+        execs -= execs0
+        exchange = await _exchange_stats(args.port)
+        drift = _position_drift(service, exchange.pop("short_positions", {}))
+        if service.SHARDED:
+            histograms = await service.supervisor.merged(REPORT_STAGES)
+        else:
+            histograms = {stage: metrics.merged(stage) for stage in REPORT_STAGES}
+    finally:
+        await service.stop_hedge_execution()
+        await service.shutdown()
+        proc.terminate()
+        await proc.wait()
+
+    return {
+        "pools": args.pools,
+        "symbols": args.symbols,
+        "shards": args.shards,
+        "elapsed_s": round(elapsed, 2),
+        "ticks_per_s": round(received / elapsed, 1),
+        "executions_per_s": round(execs / elapsed, 1),
+        "orders_per_s": round((exchange["orders"] - orders0) / elapsed, 1),
+        "dropped": sum(s["dropped"] for s in stats),
+        "coalesced": sum(s["coalesced"] for s in stats),
+        "exchange": exchange,
+        "drift": drift,
+        "latency_ms": {
+            stage: {
+                "count": hist.count,
+                "p50": hist.quantile(0.50) * 1000,
+                "p99": hist.quantile(0.99) * 1000,
+                "mean": hist.sum / hist.count * 1000 if hist.count else 0.0,
+            }
+            for stage, hist in histograms.items()
+        },
+    }
+
+
+def _position_drift(service, short_positions: dict) -> dict:
+    """Posição SHORT na fake − soma das posições executadas das pools."""
+    if service.SHARDED:
+        return {}
+    from services import hedge_executor_service as local
+
+    believed: dict = {}
+    for pool in local.pools.values():
+        symbol = pool.config.symbol.upper()
+        believed[symbol] = believed.get(symbol, 0.0) + pool.hedge.position_qty
+    return {
+        symbol: round(short_positions.get(symbol, 0.0) - qty, 8)
+        for symbol, qty in sorted(believed.items())
+    }
+
+
+async def _counters(service):
+    """(ticks recebidos pelos feeds, execuções, stats por pool)."""
+    if not service.SHARDED:
+        from services import hedge_executor_service as local
+
+        stats = [pool.streamer.stats() for pool in local.pools.values()]
+        return local.hub.received, sum(s["executions"] for s in stats), stats
+
+    received, stats = 0, []
+    for shard in await service.supervisor.collect_summaries():
+        ticks = [summary["ticks"] for summary in shard.values()]
+        # o feed é um por worker: hub_received se repete em cada pool
+        received += max((t.get("hub_received", 0) for t in ticks), default=0)
+        stats += ticks
+    return received, sum(s["executions"] for s in stats), stats
+
+
+def _print_report(report: dict) -> None:
+    print(f"\npools={report['pools']} símbolos={report['symbols']} shards={report['shards']} duração={report['elapsed_s']}s")
+    print(f"ticks/s ........ {report['ticks_per_s']}")
+    print(f"execuções/s .... {report['executions_per_s']}")
+    print(f"ordens/s ....... {report['orders_per_s']}")
+    print(f"dropped/coalesced {report['dropped']}/{report['coalesced']}")
+    print(f"exchange ....... {report['exchange']}")
+    if report["drift"]:
+        print(f"drift posição .. {report['drift']}")
+    print(f"\n{'estágio':<20}{'n':>10}{'p50 ms':>10}{'p99 ms':>10}{'média ms':>10}")
+    for stage, row in report["latency_ms"].items():
+        print(f"{stage:<20}{row['count']:>10}{row['p50']:>10.3f}{row['p99']:>10.3f}{row['mean']:>10.3f}")
+
+
+def main(argv=None) -> None:
+    _print_report(asyncio.run(run(_parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Replay de incidentes: reexecuta a máquina de estados sobre o hedge.log e
+o hedge_trades.log de produção e reporta onde o simulado e o registrado
+divergem (ação, valor do short, posição por símbolo).
+
+Os logs são lidos em pedaços de `--chunk-mb`, decodificados em paralelo
+(`--processes`) e consumidos em ordem por um gerador: a memória não
+depende do tamanho dos arquivos. `--config` é um JSON com a config de uma
+pool ou uma lista delas (mesmos campos do POST /hedge/start).
+
+    python -m replay.run_replay hedge.log hedge_trades.log --config pools.json
+    python -m replay.run_replay hedge.log --config pool.json --json report.json
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from adapters.hedge_log_reader import DEFAULT_CHUNK_BYTES, iter_chunks, parse_result_chunk, parse_trade_chunk
+from core.hedge_replay import HedgeReplay
+from entities.hedge_config_entity import HedgeConfig
+from schemas.hedge_config_schema import HedgeConfigSchema
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay do hedge.log / hedge_trades.log na máquina de estados")
+    parser.add_argument("hedge_log", type=Path)
+    parser.add_argument("trades_log", type=Path, nargs="?", default=None)
+    parser.add_argument("--config", type=Path, required=True, help="JSON: config de uma pool ou lista")
+    parser.add_argument("--processes", type=int, default=None, help="workers de parse (padrão: CPUs)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / 2**20)
+    parser.add_argument("--settle-ms", type=int, default=5_000, help="espera pela ordem antes de checar a posição")
+    parser.add_argument("--position-tolerance", type=float, default=5.0, help="USD de diferença tolerada na posição")
+    parser.add_argument("--value-tolerance", type=float, default=0.01, help="USD de diferença tolerada no short_value")
+    parser.add_argument("--max-divergences", type=int, default=1_000, help="divergências guardadas no relatório")
+    parser.add_argument("--show", type=int, default=20, help="divergências impressas")
+    parser.add_argument("--json", type=Path, default=None, help="grava o relatório completo")
+    return parser.parse_args(argv)
+
+
+def load_configs(path: Path) -> List[HedgeConfig]:
+    data = json.loads(path.read_text())
+    items = data if isinstance(data, list) else [data]
+    return [HedgeConfig(**HedgeConfigSchema(**item).dict()) for item in items]
+
+
+def run(args: argparse.Namespace) -> dict:
+    replay = HedgeReplay(
+        load_configs(args.config),
+        value_tolerance_usd=args.value_tolerance,
+        position_tolerance_usd=args.position_tolerance,
+        settle_ms=args.settle_ms,
+        max_divergences=args.max_divergences,
+    )
+    chunk_bytes = int(args.chunk_mb * 2**20)
+    started = time.perf_counter()
+    if args.trades_log is not None:
+        replay.load_trades(iter_chunks(args.trades_log, parse_trade_chunk, args.processes, chunk_bytes))
+    for chunk in iter_chunks(args.hedge_log, parse_result_chunk, args.processes, chunk_bytes):
+        replay.replay(chunk)
+    report = replay.finish()
+    elapsed = time.perf_counter() - started
+
+    size = args.hedge_log.stat().st_size + (args.trades_log.stat().st_size if args.trades_log else 0)
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "mb_per_s": round(size / 2**20 / elapsed, 1) if elapsed else 0.0,
+        **asdict(report),
+    }
+
+
+def _when(time_ms: int) -> str:
+    return (_EPOCH + timedelta(milliseconds=time_ms)).isoformat(timespec="milliseconds")
+
+
+def _print_report(report: dict, show: int) -> None:
+    print(f"\nresultados={report['results']} ordens={report['orders']} duração={report['elapsed_s']}s ({report['mb_per_s']} MB/s)")
+    print(f"divergências .. {report['counts']}")
+    if report["skipped"]:
+        print(f"sem config .... {report['skipped']} resultados de {report['unknown_pools']}")
+    if report["malformed"]:
+        print(f"malformadas ... {report['malformed']}")
+    print(
+        f"falhas ........ {len(report['errors'])}  parciais {len(report['partials'])}"
+        f"  reconciliações {len(report['reconciles'])}"
+    )
+
+    print(f"\n{'pool':<24}{'ticks':>10}  {'ações registradas / simuladas':<56}primeira divergência")
+    for pool_id, row in report["pools"].items():
+        actions = " ".join(f"{a}={row['recorded'][a]}/{row['simulated'][a]}" for a in row["recorded"])
+        first = row["first_divergence"]
+        where = f"{first['kind']} @ {_when(first['time_ms'])}" if first else "-"
+        print(f"{pool_id:<24}{row['ticks']:>10}  {actions:<56}{where}")
+
+    if report["final_positions"]:
+        print(f"\n{'símbolo':<24}{'registrado':>16}{'simulado':>16}{'drift':>16}")
+        for symbol, row in sorted(report["final_positions"].items()):
+            print(f"{symbol:<24}{row['recorded_qty']:>16.6f}{row['simulated_qty']:>16.6f}{row['drift']:>16.6f}")
+
+    if report["divergences"] and show:
+        print(f"\n{'hora':<26}{'tipo':<13}{'pool / símbolo':<24}{'preço':>12}  registrado → simulado")
+        for d in report["divergences"][:show]:
+            print(f"{_when(d['time_ms']):<26}{d['kind']:<13}{d['key']:<24}{d['price']:>12.6g}  {d['recorded']} → {d['simulated']}")
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    report = run(args)
+    _print_report(report, args.show)
+    if args.json is not None:
+        args.json.write_text(json.dumps(report, indent=2, default=str))
+    sys.exit(1 if any(report["counts"].values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
-from fastapi import APIRouter
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query
 from schemas.hedge_config_schema import HedgeConfigSchema
+from schemas.hedge_result_schema import HedgeHistorySchema, HedgeRollupsSchema
 from entities.hedge_config_entity import HedgeConfig
-from services.hedge_executor_service import start_hedge_execution, stop_hedge_execution, hedge_task
+from services.hedge_backend import (
+    start_hedge_execution,
+    stop_hedge_execution,
+    hedge_status as pools_status,
+    pool_stats,
+    get_hedge_history,
+    get_hedge_rollups,
+)
 
 router = APIRouter()
 
 @router.post("/hedge/start", tags=["hedge"])
 async def start_hedge(config: HedgeConfigSchema):
     config_entity = HedgeConfig(**config.dict())
-    await start_hedge_execution(config_entity)
-    return {"status": "Hedge execution started or already running"}
+    pool_id = await start_hedge_execution(config_entity)
+    return {"pool_id": pool_id, "status": "Hedge execution started or already running"}
 
 @router.post("/hedge/stop", tags=["hedge"])
 async def stop_hedge():
@@ -18,5 +29,40 @@ async def stop_hedge():
 
 @router.get("/hedge/status", tags=["hedge"])
 async def hedge_status():
-    running = hedge_task is not None and not hedge_task.done()
-    return {"running": running}
\ No newline at end of file
+    pools = pools_status()
+    return {"running": any(pools.values()), "pools": pools}
+
+@router.post("/hedge/{pool_id}/stop", tags=["hedge"])
+async def stop_pool(pool_id: str):
+    await stop_hedge_execution(pool_id)
+    return {"pool_id": pool_id, "status": "Hedge execution stopped"}
+
+@router.get("/hedge/{pool_id}/status", tags=["hedge"])
+async def pool_status(pool_id: str):
+    return {
+        "pool_id": pool_id,
+        "running": pools_status(pool_id)[pool_id],
+        "ticks": pool_stats(pool_id),
+    }
+
+@router.get("/hedge/{pool_id}/history", tags=["hedge"], response_model=HedgeHistorySchema)
+async def hedge_history(
+    pool_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=100_000),
+    cursor: Optional[str] = Query(None, pattern=r"^\d+-\d+$", description="next_cursor da página anterior"),
+):
+    page = await get_hedge_history(pool_id, start=start, end=end, limit=limit, cursor=cursor)
+    return {"pool_id": pool_id, **page}
+
+@router.get("/hedge/{pool_id}/rollups", tags=["hedge"], response_model=HedgeRollupsSchema)
+async def hedge_rollups(
+    pool_id: str,
+    resolution: Literal["1m", "15m", "1h", "1d"] = "1h",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=100_000),
+):
+    rollups = await get_hedge_rollups(pool_id, resolution=resolution, start=start, end=end, limit=limit)
+    return {"pool_id": pool_id, **rollups}
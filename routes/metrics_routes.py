@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services.hedge_backend import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", tags=["metrics"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(await render_metrics(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,78 @@
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from infrastructure.broadcaster import EVENT_KINDS, broadcaster
+
+router = APIRouter()
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _kinds(types: Optional[str]) -> List[str]:
+    return [t for t in (types or "").split(",") if t] or list(EVENT_KINDS)
+
+
+@router.get("/hedge/{pool_id}/events", tags=["stream"])
+async def hedge_events(
+    pool_id: str,
+    types: Optional[str] = Query(None, description="result,order (padrão: ambos)"),
+    min_interval_ms: float = Query(0, ge=0, description="downsampling dos results"),
+    queue_size: int = Query(256, ge=1, le=10_000),
+):
+    """Server-Sent Events com os results e as ordens da pool."""
+    sub = broadcaster.subscribe(pool_id, _kinds(types), queue_size, min_interval_ms / 1000)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield b"data: " + event + b"\n\n"
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/hedge/{pool_id}/ws")
+async def hedge_ws(
+    websocket: WebSocket,
+    pool_id: str,
+    types: Optional[str] = None,
+    min_interval_ms: float = 0,
+    queue_size: int = 256,
+):
+    """WebSocket com os mesmos eventos do SSE (um JSON por mensagem)."""
+    await websocket.accept()
+    sub = broadcaster.subscribe(pool_id, _kinds(types), max(queue_size, 1), max(min_interval_ms, 0) / 1000)
+    # o cliente não envia nada; o receive só serve para notar o disconnect
+    closed = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.create_task(sub.get())
+            done, _ = await asyncio.wait({getter, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed in done:
+                getter.cancel()
+                return
+            event = getter.result()
+            if event is None:
+                await websocket.close(code=1001)
+                return
+            await websocket.send_text(event.decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        closed.cancel()
+        broadcaster.unsubscribe(sub)
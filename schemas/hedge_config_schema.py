@@ -1,6 +1,9 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 class HedgeConfigSchema(BaseModel):
+    pool_id: Optional[str] = Field(None, example="virtual-pool-1")
     symbol: str = Field(..., example="VIRTUALUSDT")
     qty_token1: float = Field(..., example=76.9)
     total_usd_target: float = Field(..., example=300.9)
@@ -8,3 +11,4 @@ class HedgeConfigSchema(BaseModel):
     max_price: float = Field(..., example=1.84)
     fee_apr_percent: float = Field(..., example=600.0)
     rebalance_threshold_usd: float = Field(..., example=6.0)
+    hedge_interval_seconds: float = Field(10, gt=0, example=10)
\ No newline at end of file
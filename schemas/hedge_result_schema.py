@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+class HedgeResultRowSchema(BaseModel):
+    # linha do histórico (adapters/hedge_result_store.py): short_blocks é a quantidade de blocos
+    time: datetime
+    close: float
+    quantity_token1: float
+    quantity_token2: float
+    value_token1_usd: float
+    value_token2_usd: float
+    total_value_usd: float
+    delta_total: float
+    accumulated_fee: float
+    short_action: Literal["hold", "open", "increase", "decrease", "close"]
+    short_value_usd: float
+    short_pnl_usd: float
+    total_accumulated: float
+    total_accumulated_with_fee: float
+    short_blocks: int
+
+class HedgeHistorySchema(BaseModel):
+    pool_id: str
+    results: List[HedgeResultRowSchema]
+    next_cursor: Optional[str] = Field(None, example="1767225600000-3")
+
+class HedgeRollupBucketSchema(BaseModel):
+    # bucket de adapters/hedge_rollup_store.py (ROLLUP_DTYPE)
+    start: datetime
+    ticks: int
+    price_open: float
+    price_high: float
+    price_low: float
+    price_close: float
+    value_open: float
+    value_high: float
+    value_low: float
+    value_close: float
+    fees: float
+    accumulated_fee: float
+    total_accumulated_with_fee: float
+    short_pnl_usd: float
+    short_value_usd: float
+    opens: int
+    increases: int
+    decreases: int
+    closes: int
+
+class HedgeRollupsSchema(BaseModel):
+    pool_id: str
+    resolution: Literal["1m", "15m", "1h", "1d"]
+    buckets: List[HedgeRollupBucketSchema]
@@ -0,0 +1,15 @@
+from pathlib import Path
+from typing import Union
+
+from adapters.kline_file_loader import load_klines
+from core.hedge_backtest import BacktestResult, run_backtest
+from entities.hedge_config_entity import HedgeConfig
+
+
+def run_backtest_from_file(
+    path: Union[str, Path],
+    config: HedgeConfig,
+    hedge_interval: int = 60,
+) -> BacktestResult:
+    times, close = load_klines(path)
+    return run_backtest(config, close, times=times, hedge_interval=hedge_interval)
@@ -0,0 +1,42 @@
+"""
+Onde as pools rodam, visto pelas rotas: no próprio processo da API
+(hedge_executor_service) ou, com HEDGE_SHARD_WORKERS > 0, nos workers do
+ShardSupervisor. As duas implementações têm a mesma interface.
+"""
+from infrastructure.metrics import metrics
+from infrastructure.settings import settings
+
+SHARDED = settings.SHARD_WORKERS > 0
+
+if SHARDED:
+    from services.shard_supervisor import supervisor
+
+    start_hedge_execution = supervisor.start_hedge_execution
+    stop_hedge_execution = supervisor.stop_hedge_execution
+    hedge_status = supervisor.hedge_status
+    pool_stats = supervisor.pool_stats
+    get_hedge_history = supervisor.get_hedge_history
+    get_hedge_rollups = supervisor.get_hedge_rollups
+    render_metrics = supervisor.render_metrics
+else:
+    from services.hedge_executor_service import (  # noqa: F401
+        get_hedge_history,
+        get_hedge_rollups,
+        hedge_status,
+        pool_stats,
+        start_hedge_execution,
+        stop_hedge_execution,
+    )
+
+    async def render_metrics() -> str:
+        return metrics.render()
+
+
+async def startup() -> None:
+    if SHARDED:
+        await supervisor.start()
+
+
+async def shutdown() -> None:
+    if SHARDED:
+        await supervisor.stop()
@@ -1,44 +1,324 @@
 import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from adapters.binance_client_pool import BinanceClientPool
 from adapters.binance_short_manager import BinanceShortManager
 from adapters.binance_candle_streamer import BinanceCandleStreamer
+from adapters.binance_market_data_hub import BinanceMarketDataHub
+from adapters.binance_price_feed import BinancePriceFeed
+from adapters.binance_symbol_filters import SymbolFilterCache
+from adapters.binance_user_stream import BinanceUserStream
+from adapters.hedge_state_journal import HedgeStateJournal
+from adapters.netting_order_executor import NettingOrderExecutor
+from adapters.order_scheduler import DEFAULT_RATE_LIMITS, OrderScheduler
 from core.hedge_state_machine_with_execution import HedgeStateMachineWithExecution
+from infrastructure.broadcaster import broadcaster
+from infrastructure.logger_config import hedge_queue_handler, logger
+from infrastructure.metrics import metrics
 from infrastructure.settings import settings
+from services.position_reconciler import PositionReconciler
 from entities.hedge_config_entity import HedgeConfig
 
-hedge_task = None
-streamer: BinanceCandleStreamer = None
-manager: BinanceShortManager = None
 
-async def start_hedge_execution(config: HedgeConfig):
-    global hedge_task, streamer, manager
+@dataclass
+class HedgePool:
+    pool_id: str
+    config: HedgeConfig
+    hedge: HedgeStateMachineWithExecution
+    streamer: Optional[BinanceCandleStreamer] = None
+    task: Optional[asyncio.Task] = None
 
-    if hedge_task and not hedge_task.done():
-        return
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+# registro de pools (pool_id → HedgePool); todas compartilham um feed de
+# preços (um multiplex socket; settings.MARKET_DATA_FEED escolhe o feed
+# lean ou o hub do python-binance) e um BinanceShortManager, atrás de um
+# NettingOrderExecutor que consolida as ordens do mesmo símbolo e de um
+# OrderScheduler que as envia por prioridade dentro dos limites de taxa
+# da conta (divididos entre os workers no modo com shards). O
+# PositionReconciler compara a posição real (user-data stream) com a das
+# pools — inclusive as paradas que ainda têm short — e, com
+# HEDGE_RECONCILE_CORRECT=1, envia as ordens de correção. Manager
+# e o cache de filtros de símbolo (step / minNotional) usado no sizing
+# usam o mesmo AsyncClient (sessão aquecida) do client_pool, assim como o
+# user-data stream e o hub do python-binance
+pools: Dict[str, HedgePool] = {}
+client_pool: Optional[BinanceClientPool] = None
+symbol_filters: Optional[SymbolFilterCache] = None
+hub: Optional[Union[BinancePriceFeed, BinanceMarketDataHub]] = None
+manager: Optional[BinanceShortManager] = None
+scheduler: Optional[OrderScheduler] = None
+executor: Optional[NettingOrderExecutor] = None
+user_stream: Optional[BinanceUserStream] = None
+reconciler: Optional[PositionReconciler] = None
+
+
+def _pool_id(config: HedgeConfig) -> str:
+    return config.pool_id or config.symbol.lower()
+
+def _holds_position(pool: HedgePool) -> bool:
+    # pool parada não fecha o short: a posição dela segue sendo do serviço
+    # e entra na reconciliação até a pool zerar (ou voltar a rodar)
+    return pool.running or bool(pool.hedge.position_qty or pool.hedge.target_qty)
+
+def _machines(symbol: str) -> List[HedgeStateMachineWithExecution]:
+    return [p.hedge for p in pools.values() if p.config.symbol.upper() == symbol and _holds_position(p)]
+
+def _symbols() -> List[str]:
+    return sorted({p.config.symbol.upper() for p in pools.values() if _holds_position(p)})
 
-    manager = BinanceShortManager(settings.BINANCE_KEY, settings.BINANCE_SECRET)
-    await manager.__aenter__()
+async def start_hedge_execution(config: HedgeConfig) -> str:
+    global client_pool, symbol_filters, hub, manager, scheduler, executor, user_stream, reconciler
 
-    hedge = HedgeStateMachineWithExecution(binance_manager=manager, config=config)
+    pool_id = _pool_id(config)
+    pool = pools.get(pool_id)
+    if pool and pool.running:
+        return pool_id
+
+    if client_pool is None:
+        client_pool = BinanceClientPool(settings.BINANCE_KEY, settings.BINANCE_SECRET)
+    if symbol_filters is None:
+        symbol_filters = SymbolFilterCache(client_pool)
+        await symbol_filters.start()
+    if manager is None:
+        manager = BinanceShortManager(
+            settings.BINANCE_KEY,
+            settings.BINANCE_SECRET,
+            client_pool=client_pool,
+        )
+        await manager.__aenter__()
+        scheduler = OrderScheduler(
+            manager,
+            rate_limits=symbol_filters.rate_limits or DEFAULT_RATE_LIMITS,
+            share=1.0 / max(settings.SHARD_WORKERS, 1),
+        )
+        executor = NettingOrderExecutor(scheduler, symbol_filters=symbol_filters)
+        if settings.RECONCILE_POSITIONS:
+            user_stream = BinanceUserStream(client_pool)
+            reconciler = PositionReconciler(
+                user_stream,
+                scheduler,
+                machines=_machines,
+                symbols=_symbols,
+                symbol_filters=symbol_filters,
+                tolerance_usd=settings.RECONCILE_TOLERANCE_USD,
+                correct=settings.RECONCILE_CORRECT,
+            )
+            await user_stream.start()
+            await reconciler.start()
+    if hub is None:
+        if settings.MARKET_DATA_FEED == "python-binance":
+            hub = BinanceMarketDataHub(client_pool=client_pool)
+        else:
+            hub = BinancePriceFeed(settings.PRICE_STREAM, batch_ms=settings.PRICE_BATCH_MS)
+
+    # numpy entra aqui, na primeira pool, e não no import da API
+    from adapters.hedge_result_store import HedgeResultStore
+    from adapters.hedge_rollup_store import HedgeRollupStore
+
+    if pool is not None:
+        # pool parada com short: o journal dela ainda está aberto
+        _close_journal(pool)
+
+    results_dir = Path(settings.RESULTS_DIR) / pool_id
+    store = HedgeResultStore(
+        results_dir,
+        max_segments=settings.RESULTS_MAX_SEGMENTS or None,
+        rollups=HedgeRollupStore(results_dir / "rollups"),
+    )
+    # warm restart: snapshot + cauda do journal, se a pool já rodou antes
+    journal = HedgeStateJournal(Path(settings.STATE_DIR) / pool_id)
+    hedge = HedgeStateMachineWithExecution(
+        binance_manager=executor,
+        config=config,
+        result_store=store,
+        journal=journal,
+        symbol_filters=symbol_filters,
+    )
+    if hedge.price_reference is not None:
+        logger.info({
+            "message": "Estado da pool restaurado",
+            "pool_id": pool_id,
+            "mode": hedge.mode,
+            "short_blocks": len(hedge.short_blocks),
+            "journal_records": journal.restored_records,
+            "restore_ms": round(journal.restore_ms, 3),
+        })
 
     streamer = BinanceCandleStreamer(
         symbol=config.symbol,
         hedge_simulator=hedge,
-        rebalance_threshold_usd=config.rebalance_threshold_usd
+        rebalance_threshold_usd=config.rebalance_threshold_usd,
+        hub=hub,
+        hedge_interval_seconds=config.hedge_interval_seconds,
+    )
+
+    pools[pool_id] = HedgePool(
+        pool_id=pool_id,
+        config=config,
+        hedge=hedge,
+        streamer=streamer,
+        task=asyncio.create_task(streamer.start()),
     )
+    return pool_id
 
-    hedge_task = asyncio.create_task(streamer.start())
+async def _stop_pool(pool: HedgePool):
+    if pool.streamer:
+        await pool.streamer.stop()
+        pool.streamer = None
 
-async def stop_hedge_execution():
-    global hedge_task, streamer, manager
+    if pool.task:
+        await asyncio.gather(pool.task, return_exceptions=True)
+        pool.task = None
 
-    if streamer:
-        await streamer.stop()
-        streamer = None
+    pool.hedge.results.flush()
+    # com short aberto a pool segue na reconciliação: o journal fica aberto
+    # para gravar os realinhamentos e fecha no restart ou no shutdown
+    if not _holds_position(pool):
+        _close_journal(pool)
+    # encerra os streams da pool (clientes SSE reconectam sozinhos)
+    broadcaster.close_pool(pool.pool_id)
 
-    if hedge_task:
-        hedge_task.cancel()
-        hedge_task = None
+def _close_journal(pool: HedgePool) -> None:
+    if pool.hedge.journal is not None:
+        pool.hedge.journal.close()
+
+async def stop_hedge_execution(pool_id: Optional[str] = None):
+    """Para uma pool específica ou, sem pool_id, todas."""
+    global client_pool, symbol_filters, hub, manager, scheduler, executor, user_stream, reconciler
+
+    targets = [pools[pool_id]] if pool_id in pools else ([] if pool_id else list(pools.values()))
+    for pool in targets:
+        await _stop_pool(pool)
+
+    if any(p.running for p in pools.values()):
+        return
+
+    if hub:
+        await hub.stop()
+        hub = None
+
+    if reconciler is not None:
+        await reconciler.stop()
+        await user_stream.stop()
+        reconciler = None
+        user_stream = None
+    # sem reconciliação, nada mais realinha as pools paradas
+    for pool in pools.values():
+        _close_journal(pool)
 
     if manager:
+        await scheduler.stop()
         await manager.__aexit__()
         manager = None
+        scheduler = None
+        executor = None
+
+    if symbol_filters is not None:
+        await symbol_filters.stop()
+        symbol_filters = None
+
+    # hub, manager e filtros já devolveram o client: a sessão foi fechada
+    client_pool = None
+
+def hedge_status(pool_id: Optional[str] = None) -> Dict[str, bool]:
+    if pool_id is not None:
+        pool = pools.get(pool_id)
+        return {pool_id: bool(pool and pool.running)}
+    return {pid: pool.running for pid, pool in pools.items()}
+
+def pool_stats(pool_id: str) -> Dict[str, int]:
+    """Contadores de ticks do consumidor da pool + do hub compartilhado."""
+    pool = pools.get(pool_id)
+    stats = pool.streamer.stats() if pool and pool.streamer else {}
+    if hub is not None:
+        stats.update(hub_received=hub.received, hub_unrouted=hub.unrouted)
+    stats["hedge_log_dropped"] = hedge_queue_handler.dropped
+    return stats
+
+def _collect_counters():
+    """Contadores expostos em /metrics junto com os histogramas."""
+    for pid, pool in pools.items():
+        labels = {"pool": pid, "symbol": pool.config.symbol.upper()}
+        yield "hedge_pool_running", labels, int(pool.running)
+        yield "hedge_qty_carry", labels, round(pool.hedge.qty_carry, 12)
+        if pool.streamer:
+            for name, value in pool.streamer.stats().items():
+                yield f"hedge_ticks_{name}_total", labels, value
+    if hub is not None:
+        yield "hedge_hub_received_total", {}, hub.received
+        yield "hedge_hub_unrouted_total", {}, hub.unrouted
+    if client_pool is not None and client_pool.client is not None:
+        yield "hedge_exchange_time_offset_ms", {}, round(client_pool.time_offset_ms, 3)
+        yield "hedge_exchange_rtt_seconds", {}, round(client_pool.last_rtt, 6)
+        yield "hedge_exchange_keepalive_errors_total", {}, client_pool.keepalive_errors
+    if scheduler is not None:
+        yield "hedge_order_queue_depth", {}, scheduler.depth
+        yield "hedge_orders_sent_total", {}, scheduler.sent
+        yield "hedge_orders_throttled_total", {}, scheduler.throttled
+        yield "hedge_orders_deferred_total", {}, scheduler.deferred
+        for header, tokens in scheduler.tokens().items():
+            yield "hedge_rate_limit_tokens", {"limit": header.lower()}, round(tokens, 3)
+    if reconciler is not None:
+        for symbol, drift in reconciler.drift.items():
+            yield "hedge_position_drift", {"symbol": symbol}, round(drift, 12)
+        for symbol, qty in user_stream.positions.items():
+            yield "hedge_exchange_short_qty", {"symbol": symbol}, qty
+        yield "hedge_user_stream_synced", {}, int(user_stream.synced)
+        yield "hedge_user_stream_reconnects_total", {}, user_stream.reconnects
+        yield "hedge_reconcile_corrections_total", {}, reconciler.corrections
+        yield "hedge_reconcile_errors_total", {}, reconciler.correction_errors
+    if symbol_filters is not None:
+        yield "hedge_symbol_filters_loaded", {}, len(symbol_filters)
+        yield "hedge_symbol_filters_refresh_errors_total", {}, symbol_filters.refresh_errors
+    yield "hedge_log_dropped_total", {}, hedge_queue_handler.dropped
+    yield "hedge_stream_subscribers", {}, broadcaster.subscriber_count()
+    yield "hedge_stream_events_total", {}, broadcaster.published
+    yield "hedge_stream_disconnected_total", {}, broadcaster.disconnected
+
+metrics.add_collector(_collect_counters)
+
+async def get_hedge_history(
+    pool_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 1000,
+    cursor: Optional[str] = None,
+) -> dict:
+    """
+    Uma página do histórico; `next_cursor` vai no `cursor` da próxima
+    chamada, None quando não há mais linhas.
+    """
+    pool = pools.get(pool_id)
+    if pool is None:
+        return {"results": [], "next_cursor": None}
+    rows, next_cursor = pool.hedge.results.page(start=start, end=end, limit=limit, cursor=cursor)
+    return {"results": pool.hedge.results.to_records(rows), "next_cursor": next_cursor}
+
+async def get_hedge_rollups(
+    pool_id: str,
+    resolution: str = "1h",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 1000,
+) -> dict:
+    """Buckets agregados (1m / 15m / 1h / 1d) da pool entre start e end (os `limit` mais novos)."""
+    pool = pools.get(pool_id)
+    if pool is None or pool.hedge.results.rollups is None:
+        return {"resolution": resolution, "buckets": []}
+    from adapters.hedge_result_store import to_epoch_ms
+
+    rollups = pool.hedge.results.rollups
+    rows = rollups.query(
+        resolution,
+        start_ms=to_epoch_ms(start) if start else None,
+        end_ms=to_epoch_ms(end) if end else None,
+        limit=limit,
+    )
+    return {"resolution": resolution, "buckets": rollups.to_records(rows)}
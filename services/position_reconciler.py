@@ -0,0 +1,214 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set
+
+from adapters.binance_symbol_filters import SymbolFilterCache
+from adapters.binance_user_stream import BinanceUserStream
+from adapters.order_scheduler import OrderScheduler
+from core.ports import PRIORITY_OPEN, PRIORITY_REDUCE
+from entities.symbol_filters_entity import SymbolFilters
+from infrastructure.logger_config import trade_logger
+
+if TYPE_CHECKING:
+    from core.hedge_state_machine_with_execution import HedgeStateMachineWithExecution
+
+
+class PositionReconciler:
+    """
+    Compara a posição real de cada símbolo (BinanceUserStream) com a soma
+    das posições executadas das pools do símbolo e corrige a diferença.
+
+    • gatilho .......  cada mudança de posição no user-data stream agenda
+                       uma checagem do símbolo após `grace` s; uma varredura
+                       a cada `interval` s cobre o resto (ordens que
+                       falharam sem evento nenhum)
+    • drift .........  real − Σ executado, medido com os locks de execução
+                       das pools do símbolo (sem ordem em voo); abaixo de
+                       `tolerance_usd` (em notional) é só métrica. Só
+                       conta se persistir por `grace` s — o ack REST e o
+                       evento do stream não chegam juntos
+    • correção ......  ainda com os locks, envia pelo OrderScheduler a ordem
+                       Σ alvo − real (truncada no step) e realinha as
+                       posições executadas das pools com a real; o resto
+                       abaixo do step fica no carry, rateado pelo alvo de
+                       cada pool. Com `correct=False` o drift persistente
+                       só é registrado (uma vez por episódio) e medido
+
+    O lado SHORT dos símbolos com pools é considerado todo do serviço.
+    """
+
+    def __init__(
+        self,
+        user_stream: BinanceUserStream,
+        scheduler: OrderScheduler,
+        machines: Callable[[str], List["HedgeStateMachineWithExecution"]],
+        symbols: Callable[[], List[str]],
+        symbol_filters: Optional[SymbolFilterCache] = None,
+        tolerance_usd: float = 5.0,
+        grace: float = 2.0,
+        interval: float = 5.0,
+        correct: bool = True,
+    ):
+        self.user_stream = user_stream
+        self.scheduler = scheduler
+        self.machines = machines
+        self.symbols = symbols
+        self.symbol_filters = symbol_filters
+        self.tolerance_usd = tolerance_usd
+        self.grace = grace
+        self.interval = interval
+        self.correct = correct
+
+        self.drift: Dict[str, float] = {}           # símbolo → contratos
+        self._since: Dict[str, float] = {}          # drift acima da tolerância desde
+        self._reported: Set[str] = set()            # drift já registrado (sem correção)
+        self._scheduled: Dict[str, asyncio.TimerHandle] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # contadores
+        self.corrections = 0
+        self.correction_errors = 0
+
+    # ---------------- ciclo de vida ------------------------------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self.user_stream.listeners.append(self._on_position)
+        self._task = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self.user_stream.listeners.remove(self._on_position)
+        self._task.cancel()
+        for handle in self._scheduled.values():
+            handle.cancel()
+        self._scheduled.clear()
+        tasks = [self._task, *self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    # ---------------- gatilhos -----------------------------------
+    def _on_position(self, symbol: str) -> None:
+        self._schedule(symbol, self.grace)
+
+    def _schedule(self, symbol: str, delay: float) -> None:
+        if symbol in self._scheduled:
+            return
+        self._scheduled[symbol] = asyncio.get_running_loop().call_later(delay, self._fire, symbol)
+
+    def _fire(self, symbol: str) -> None:
+        self._scheduled.pop(symbol, None)
+        if symbol not in self._running:
+            task = self._running[symbol] = asyncio.create_task(self.reconcile(symbol))
+            task.add_done_callback(lambda _: self._running.pop(symbol, None))
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for symbol in self.symbols():
+                self._fire(symbol)
+
+    # ---------------- reconciliação ------------------------------
+    async def reconcile(self, symbol: str) -> None:
+        machines = self.machines(symbol)
+        if not machines or not self.user_stream.synced:
+            return
+        # com os locks, nenhuma pool do símbolo tem ordem em voo
+        locks = [m.execution_lock for m in machines]
+        for lock in locks:
+            await lock.acquire()
+        try:
+            drift = self._measure(symbol, machines)
+            price = next((m.last_price for m in machines if m.last_price), None)
+            if price is None or abs(drift) * price <= self.tolerance_usd:
+                self._since.pop(symbol, None)
+                self._reported.discard(symbol)
+                return
+            since = self._since.setdefault(symbol, time.monotonic())
+            if time.monotonic() - since < self.grace:
+                self._schedule(symbol, self.grace)
+                return
+            if not self.correct:
+                self._report(symbol, machines, drift, price)
+                return
+            await self._correct(symbol, machines, price)
+            self._since.pop(symbol, None)
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def _measure(self, symbol: str, machines: List["HedgeStateMachineWithExecution"]) -> float:
+        real = self.user_stream.positions.get(symbol, 0.0)
+        drift = real - sum(m.position_qty for m in machines)
+        self.drift[symbol] = drift
+        return drift
+
+    def _report(self, symbol: str, machines: List["HedgeStateMachineWithExecution"], drift: float, price: float) -> None:
+        if symbol in self._reported:
+            return
+        self._reported.add(symbol)
+        trade_logger.warning({
+            "action": "drift",
+            "symbol": symbol,
+            "real_qty": self.user_stream.positions.get(symbol, 0.0),
+            "believed_qty": sum(m.position_qty for m in machines),
+            "drift": drift,
+            "price": price,
+            "message": "Posição diverge da exchange; correção automática desligada.",
+        })
+
+    async def _correct(self, symbol: str, machines: List["HedgeStateMachineWithExecution"], price: float) -> None:
+        believed = sum(m.position_qty for m in machines)
+        drift = self._measure(symbol, machines)
+        real = believed + drift
+        target = sum(m.target_qty for m in machines)
+
+        filters = (self.symbol_filters.get(symbol) if self.symbol_filters is not None else None) \
+            or SymbolFilters.default(symbol)
+        order_qty = filters.floor_qty(target - real)
+        sell = order_qty > 0
+        qty = abs(order_qty)
+        payload = {
+            "action": "reconcile",
+            "symbol": symbol,
+            "real_qty": real,
+            "believed_qty": believed,
+            "target_qty": target,
+            "drift": drift,
+            "qty": qty if filters.tradable(qty, price, reduce=not sell) else 0.0,
+            "price": price,
+        }
+
+        filled = 0.0
+        if payload["qty"] > 0:
+            try:
+                if sell:
+                    order = await self.scheduler.open_short(
+                        symbol=symbol, quantity=qty, priority=PRIORITY_OPEN, notional=qty * price,
+                    )
+                else:
+                    order = await self.scheduler.reduce_short(
+                        symbol=symbol, quantity=qty, priority=PRIORITY_REDUCE, notional=qty * price,
+                    )
+                filled = float(order.get("executedQty", qty)) if order else qty
+            except Exception as e:
+                # as posições são realinhadas com a real mesmo assim: o
+                # carry das pools leva a diferença para as próximas ordens
+                self.correction_errors += 1
+                payload["error"] = str(e)
+        real += filled if sell else -filled
+        payload["executed_qty"] = filled
+
+        # posição executada de cada pool = alvo − sua parte do resto
+        residual = target - real
+        for m in machines:
+            weight = m.target_qty / target if target else 1.0 / len(machines)
+            m.realign(m.target_qty - residual * weight)
+        self.drift[symbol] = 0.0
+        self.corrections += 1
+        payload["message"] = "Posição reconciliada com a exchange."
+        trade_logger.warning(payload)
@@ -0,0 +1,379 @@
+import asyncio
+import itertools
+import multiprocessing
+import re
+import zlib
+from datetime import datetime
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from entities.hedge_config_entity import HedgeConfig
+from infrastructure.broadcaster import broadcaster
+from infrastructure.logger_config import logger
+from infrastructure.metrics import LatencyHistogram, metrics
+from infrastructure.settings import settings
+from services import shard_worker
+
+_SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([^}]*)\})? (.*)$")
+
+
+class _Shard:
+    """Estado do supervisor para um worker."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn: Optional[Connection] = None
+        self.pid: Optional[int] = None
+        self.ready: Optional[asyncio.Future] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.configs: Dict[str, HedgeConfig] = {}       # pools atribuídas
+        self.summaries: Dict[str, dict] = {}
+        self.restarts = 0
+
+
+class ShardSupervisor:
+    """
+    Modo com shards: o processo da API fica só com as rotas e distribui as
+    pools entre `workers` processos (services/shard_worker.py), cada um com
+    seu event loop, feed de preços e client Binance.
+
+    • atribuição ....  crc32(símbolo) % workers — estável entre processos
+                       (hash() do Python muda a cada interpretador); pools do
+                       mesmo símbolo caem no mesmo worker e dividem o stream
+    • IPC ...........  um multiprocessing.Pipe por worker, lido pelo event
+                       loop (add_reader), sem threads; comandos com req_id e
+                       Future, resumos por pool a cada segundo, eventos de
+                       WebSocket / SSE só das pools com assinantes
+    • falhas ........  EOF no pipe = worker morto: as requisições pendentes
+                       falham, o worker é recriado após `restart_delay` e
+                       recebe de novo as pools atribuídas — o estado volta
+                       pelo journal (adapters/hedge_state_journal.py)
+
+    Mesma interface do hedge_executor_service (ver services/hedge_backend.py).
+    """
+
+    def __init__(self, workers: int, restart_delay: float = 1.0, request_timeout: float = 30.0):
+        self.workers = workers
+        self.restart_delay = restart_delay
+        self.request_timeout = request_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._shards = [_Shard(i) for i in range(workers)]
+        self._owner: Dict[str, int] = {}       # pool_id → shard
+        self._ids = itertools.count(1)
+        self._stopping = False
+
+    # ---------------- ciclo de vida ------------------------------
+    async def start(self) -> None:
+        self._stopping = False
+        broadcaster.on_watch = self._watch
+        await asyncio.gather(*(self._spawn(shard) for shard in self._shards))
+        logger.info({
+            "message": "Workers de shard iniciados",
+            "workers": self.workers,
+            "pids": [shard.pid for shard in self._shards],
+        })
+
+    async def stop(self) -> None:
+        self._stopping = True
+        broadcaster.on_watch = None
+        for shard in self._shards:
+            if shard.conn is not None:
+                try:
+                    await self._request(shard, "shutdown")
+                except Exception:
+                    pass
+        for shard in self._shards:
+            if shard.process is not None:
+                await asyncio.to_thread(shard.process.join, 10)
+                if shard.process.is_alive():
+                    shard.process.kill()
+            self._close(shard)
+
+    async def _spawn(self, shard: _Shard) -> None:
+        loop = asyncio.get_running_loop()
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=shard_worker.run,
+            args=(shard.index, child),
+            name=f"hedge-shard-{shard.index}",
+            daemon=True,
+        )
+        shard.ready = loop.create_future()
+        shard.conn = parent
+        loop.add_reader(parent.fileno(), self._on_readable, shard)
+        try:
+            await asyncio.to_thread(process.start)
+            # só o worker fica com a ponta dele: assim a morte vira EOF aqui
+            child.close()
+            shard.process = process
+            await asyncio.wait_for(shard.ready, self.request_timeout)
+        except BaseException:
+            # worker que não ficou pronto não pode sobrar vivo ao lado do
+            # próximo spawn: fecha o pipe antes (sem EOF → _restart) e mata
+            child.close()
+            self._close(shard)
+            if process.is_alive():
+                process.kill()
+                await asyncio.to_thread(process.join, 5)
+            raise
+
+        # (re)carrega as pools atribuídas e os streams assistidos
+        for config in list(shard.configs.values()):
+            await self._request(shard, "start", config)
+            if broadcaster.has_subscribers(config.pool_id or config.symbol.lower()):
+                self._notify(shard, "watch", (config.pool_id or config.symbol.lower(), True))
+
+    def _close(self, shard: _Shard) -> None:
+        if shard.conn is not None:
+            asyncio.get_running_loop().remove_reader(shard.conn.fileno())
+            shard.conn.close()
+            shard.conn = None
+        for future in shard.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"worker {shard.index} encerrado"))
+        shard.pending.clear()
+
+    async def _restart(self, shard: _Shard) -> None:
+        exitcode = shard.process.exitcode if shard.process else None
+        self._close(shard)
+        if self._stopping:
+            return
+        shard.restarts += 1
+        logger.error({
+            "message": "Worker de shard morreu; reiniciando",
+            "shard": shard.index,
+            "pid": shard.pid,
+            "exitcode": exitcode,
+            "pools": len(shard.configs),
+        })
+        await asyncio.sleep(self.restart_delay)
+        try:
+            await self._spawn(shard)
+        except Exception as e:
+            logger.error(f"Falha ao reiniciar o worker {shard.index}: {e}")
+            self._close(shard)
+            asyncio.get_running_loop().call_later(
+                self.restart_delay, lambda: asyncio.ensure_future(self._restart(shard))
+            )
+
+    # ---------------- IPC ----------------------------------------
+    def _on_readable(self, shard: _Shard) -> None:
+        try:
+            while shard.conn is not None and shard.conn.poll():
+                self._on_message(shard, shard.conn.recv())
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(shard.conn.fileno())
+            asyncio.ensure_future(self._restart(shard))
+
+    def _on_message(self, shard: _Shard, message: tuple) -> None:
+        kind = message[0]
+        if kind == "event":
+            _, pool_id, event_kind, event = message
+            broadcaster.fanout(pool_id, event_kind, event)
+        elif kind == "summary":
+            shard.summaries = message[2]
+        elif kind == "reply":
+            _, req_id, result, error = message
+            future = shard.pending.pop(req_id, None)
+            if future is not None and not future.done():
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(RuntimeError(error))
+        elif kind == "ready":
+            shard.pid = message[2]
+            if not shard.ready.done():
+                shard.ready.set_result(None)
+
+    async def _request(self, shard: _Shard, command: str, args: Any = None) -> Any:
+        if shard.conn is None:
+            raise ConnectionError(f"worker {shard.index} indisponível")
+        req_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        shard.pending[req_id] = future
+        shard.conn.send((req_id, command, args))
+        try:
+            return await asyncio.wait_for(future, self.request_timeout)
+        finally:
+            shard.pending.pop(req_id, None)
+
+    def _notify(self, shard: _Shard, command: str, args: Any = None) -> None:
+        if shard.conn is not None:
+            shard.conn.send((0, command, args))
+
+    def _watch(self, pool_id: str, watching: bool) -> None:
+        index = self._owner.get(pool_id)
+        if index is not None:
+            self._notify(self._shards[index], "watch", (pool_id, watching))
+
+    # ---------------- atribuição ---------------------------------
+    def shard_for(self, symbol: str) -> int:
+        return zlib.crc32(symbol.upper().encode()) % self.workers
+
+    def _pool_shard(self, pool_id: str) -> Optional[_Shard]:
+        index = self._owner.get(pool_id)
+        return None if index is None else self._shards[index]
+
+    # ---------------- interface do serviço -----------------------
+    async def start_hedge_execution(self, config: HedgeConfig) -> str:
+        pool_id = config.pool_id or config.symbol.lower()
+        shard = self._pool_shard(pool_id) or self._shards[self.shard_for(config.symbol)]
+        result = await self._request(shard, "start", config)
+        self._owner[pool_id] = shard.index
+        shard.configs[pool_id] = config
+        if broadcaster.has_subscribers(pool_id):
+            self._notify(shard, "watch", (pool_id, True))
+        return result
+
+    async def stop_hedge_execution(self, pool_id: Optional[str] = None) -> None:
+        if pool_id is not None:
+            shard = self._pool_shard(pool_id)
+            if shard is None:
+                return
+            await self._request(shard, "stop", pool_id)
+            shard.configs.pop(pool_id, None)
+            broadcaster.close_pool(pool_id)
+            return
+        await asyncio.gather(*(self._request(s, "stop") for s in self._shards if s.conn is not None))
+        for shard in self._shards:
+            for pid in shard.configs:
+                broadcaster.close_pool(pid)
+            shard.configs.clear()
+
+    def hedge_status(self, pool_id: Optional[str] = None) -> Dict[str, bool]:
+        # como no modo de um processo: toda pool já iniciada, parada = False
+        status = {}
+        for pid, index in self._owner.items():
+            shard = self._shards[index]
+            # worker morto: o último resumo dele não vale mais
+            status[pid] = (
+                pid in shard.configs
+                and shard.conn is not None
+                and shard.summaries.get(pid, {}).get("running", True)
+            )
+        if pool_id is not None:
+            return {pool_id: status.get(pool_id, False)}
+        return status
+
+    def pool_stats(self, pool_id: str) -> Dict[str, Any]:
+        shard = self._pool_shard(pool_id)
+        if shard is None:
+            return {}
+        summary = shard.summaries.get(pool_id, {})
+        stats = dict(summary.get("ticks", {}))
+        stats.update(shard=shard.index, shard_restarts=shard.restarts)
+        if summary.get("last_result"):
+            stats["last_result"] = summary["last_result"]
+        return stats
+
+    async def get_hedge_history(
+        self,
+        pool_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        shard = self._pool_shard(pool_id)
+        if shard is None:
+            return {"results": [], "next_cursor": None}
+        return await self._request(shard, "history", {
+            "pool_id": pool_id, "start": start, "end": end, "limit": limit, "cursor": cursor,
+        })
+
+    async def get_hedge_rollups(
+        self,
+        pool_id: str,
+        resolution: str = "1h",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000,
+    ) -> dict:
+        shard = self._pool_shard(pool_id)
+        if shard is None:
+            return {"resolution": resolution, "buckets": []}
+        return await self._request(shard, "rollups", {
+            "pool_id": pool_id, "resolution": resolution, "start": start, "end": end, "limit": limit,
+        })
+
+    # ---------------- métricas -----------------------------------
+    async def render_metrics(self) -> str:
+        """Métricas do supervisor + as de cada worker com a label shard."""
+        live = [s for s in self._shards if s.conn is not None]
+        texts = await asyncio.gather(*(self._request(s, "metrics") for s in live), return_exceptions=True)
+        parts = [(None, metrics.render())]
+        parts += [(shard.index, text) for shard, text in zip(live, texts) if isinstance(text, str)]
+        return self._merge(parts)
+
+    def _collect_counters(self):
+        for shard in self._shards:
+            labels = {"shard": str(shard.index)}
+            yield "hedge_shard_up", labels, int(shard.conn is not None)
+            yield "hedge_shard_pools", labels, len(shard.configs)
+            yield "hedge_shard_restarts_total", labels, shard.restarts
+        yield "hedge_stream_subscribers", {}, broadcaster.subscriber_count()
+        yield "hedge_stream_disconnected_total", {}, broadcaster.disconnected
+
+    @staticmethod
+    def _merge(parts: List[Tuple[Optional[int], str]]) -> str:
+        """
+        Junta as exposições por família: um HELP / TYPE por família e todas
+        as amostras dela em sequência (o formato texto exige o grupo
+        contíguo). Amostras de worker ganham a label shard.
+        """
+        meta: Dict[str, Dict[str, str]] = {}        # família → HELP / TYPE
+        kinds: Dict[str, str] = {}
+        samples: Dict[str, List[str]] = {}
+        for index, text in parts:
+            for line in text.splitlines():
+                if line.startswith("#"):
+                    fields = line.split(" ", 3)
+                    if len(fields) == 4 and fields[1] in ("HELP", "TYPE"):
+                        meta.setdefault(fields[2], {}).setdefault(fields[1], line)
+                        if fields[1] == "TYPE":
+                            kinds[fields[2]] = fields[3]
+                    continue
+                match = _SAMPLE.match(line)
+                if match is None:
+                    continue
+                name, _, labels, value = match.groups()
+                if index is not None:
+                    labels = f'shard="{index}"' + (f",{labels}" if labels else "")
+                family = name
+                for suffix in ("_bucket", "_sum", "_count"):
+                    if name.endswith(suffix) and kinds.get(name[:-len(suffix)]) == "histogram":
+                        family = name[:-len(suffix)]
+                        break
+                samples.setdefault(family, []).append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+
+        lines = []
+        for family, rows in samples.items():
+            lines += [meta[family][k] for k in ("HELP", "TYPE") if k in meta.get(family, {})]
+            lines += rows
+        return "\n".join(lines) + "\n"
+
+    async def merged(self, stages: Iterable[str]) -> Dict[str, LatencyHistogram]:
+        """Histogramas de estágio somados em todos os workers."""
+        stages = list(stages)
+        totals = {stage: LatencyHistogram() for stage in stages}
+        replies: List[dict] = await asyncio.gather(
+            *(self._request(s, "histograms", stages) for s in self._shards if s.conn is not None)
+        )
+        for reply in replies:
+            for stage, (counts, total, count) in reply.items():
+                hist = totals[stage]
+                hist.counts = [a + b for a, b in zip(hist.counts, counts)]
+                hist.sum += total
+                hist.count += count
+        return totals
+
+    async def collect_summaries(self) -> List[Dict[str, dict]]:
+        """Resumos atuais (não os do último segundo), um dict por worker."""
+        return await asyncio.gather(
+            *(self._request(s, "summary") for s in self._shards if s.conn is not None)
+        )
+
+
+supervisor = ShardSupervisor(max(settings.SHARD_WORKERS, 1))
+metrics.add_collector(supervisor._collect_counters)
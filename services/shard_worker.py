@@ -0,0 +1,159 @@
+"""
+Processo worker do modo com shards (ver services/shard_supervisor.py).
+
+Roda o hedge_executor_service completo — feed de preços, client Binance,
+pools — no seu próprio event loop e atende comandos do supervisor pelo
+Pipe (multiprocessing.Connection, mensagens pickle):
+
+    supervisor → worker   (req_id, comando, args); req_id 0 = sem resposta
+    worker → supervisor   ("ready", shard, pid)
+                          ("reply", req_id, resultado, erro)
+                          ("summary", shard, {pool_id: resumo})  a cada 1 s
+                          ("event", pool_id, tipo, bytes)        pools assistidas
+
+Comandos: start, stop, history, rollups, watch, summary, metrics,
+histograms, shutdown.
+Os comandos são executados em ordem, um por vez.
+"""
+import asyncio
+import os
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Optional
+
+SUMMARY_INTERVAL = 1.0
+
+
+def run(shard: int, conn: Connection) -> None:
+    """Entrada do processo (multiprocessing, start method spawn)."""
+    try:
+        asyncio.run(ShardWorker(shard, conn).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardWorker:
+    def __init__(self, shard: int, conn: Connection):
+        self.shard = shard
+        self.conn = conn
+        self._commands: Optional[asyncio.Queue] = None
+        self._done: Optional[asyncio.Event] = None
+
+    async def serve(self) -> None:
+        from infrastructure.broadcaster import broadcaster
+
+        loop = asyncio.get_running_loop()
+        self._commands = asyncio.Queue()
+        self._done = asyncio.Event()
+        broadcaster.forward = self._forward
+
+        loop.add_reader(self.conn.fileno(), self._on_readable)
+        tasks = [
+            asyncio.create_task(self._run_commands()),
+            asyncio.create_task(self._send_summaries()),
+        ]
+        self.conn.send(("ready", self.shard, os.getpid()))
+        try:
+            await self._done.wait()
+        finally:
+            loop.remove_reader(self.conn.fileno())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            from services import hedge_executor_service as service
+
+            await service.stop_hedge_execution()
+            self.conn.close()
+
+    # ---------------- IPC ----------------------------------------
+    def _on_readable(self) -> None:
+        try:
+            while self.conn.poll():
+                self._commands.put_nowait(self.conn.recv())
+        except (EOFError, OSError):
+            # supervisor saiu: o worker encerra junto
+            self._done.set()
+
+    def _send(self, message: tuple) -> None:
+        try:
+            self.conn.send(message)
+        except (BrokenPipeError, OSError):
+            self._done.set()
+
+    def _forward(self, pool_id: str, kind: str, event: bytes) -> None:
+        self._send(("event", pool_id, kind, event))
+
+    async def _run_commands(self) -> None:
+        while True:
+            req_id, command, args = await self._commands.get()
+            try:
+                result, error = await self._dispatch(command, args), None
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+            if req_id:
+                self._send(("reply", req_id, result, error))
+            if command == "shutdown":
+                self._done.set()
+                return
+
+    async def _dispatch(self, command: str, args: Any) -> Any:
+        from infrastructure.broadcaster import broadcaster
+        from infrastructure.metrics import metrics
+        from services import hedge_executor_service as service
+
+        if command == "start":
+            return await service.start_hedge_execution(args)
+        if command == "stop":
+            await service.stop_hedge_execution(args)
+            return None
+        if command == "history":
+            return await service.get_hedge_history(**args)
+        if command == "rollups":
+            return await service.get_hedge_rollups(**args)
+        if command == "watch":
+            pool_id, watching = args
+            if watching:
+                broadcaster.forwarded.add(pool_id)
+            else:
+                broadcaster.forwarded.discard(pool_id)
+            return None
+        if command == "summary":
+            return self._summary()
+        if command == "metrics":
+            return metrics.render()
+        if command == "histograms":
+            return {
+                stage: (hist.counts, hist.sum, hist.count)
+                for stage in args
+                for hist in [metrics.merged(stage)]
+            }
+        if command == "shutdown":
+            await service.stop_hedge_execution()
+            return None
+        raise ValueError(f"comando desconhecido: {command}")
+
+    # ---------------- resumos ------------------------------------
+    @staticmethod
+    def _summary() -> Dict[str, dict]:
+        from services import hedge_executor_service as service
+
+        summary = {}
+        for pool_id, pool in service.pools.items():
+            last = pool.streamer.last_result if pool.streamer else None
+            summary[pool_id] = {
+                "running": pool.running,
+                "symbol": pool.config.symbol,
+                "ticks": service.pool_stats(pool_id),
+                "last_result": None if last is None else {
+                    "time": last.time.isoformat(),
+                    "close": last.close,
+                    "short_action": last.short_action,
+                    "short_value_usd": last.short_value_usd,
+                    "total_accumulated_with_fee": last.total_accumulated_with_fee,
+                },
+            }
+        return summary
+
+    async def _send_summaries(self) -> None:
+        while True:
+            await asyncio.sleep(SUMMARY_INTERVAL)
+            self._send(("summary", self.shard, self._summary()))